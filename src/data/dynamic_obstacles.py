@@ -1,32 +1,43 @@
 # src/data/dynamic_obstacles.py
 # existing DynamicObstacles kept, plus moving obstacle helpers
+from math import lcm
+
+import numpy as np
 
 class DynamicObstacles:
     def __init__(self, schedules=None):
         self.schedules = schedules or []
+        # first schedule wins for a repeated id, as the old linear scan did
+        self._by_id = {}
+        for s in self.schedules:
+            self._by_id.setdefault(s["id"], s)
+        self.timeline = OccupancyTimeline([
+            MovingObstacle(s["trajectory"], start=s.get("start", 0), loop=False, obs_id=i)
+            for i, s in self._by_id.items()
+        ])
 
     @classmethod
     def load_from_list(cls, schedules):
         return cls(schedules)
 
     def position_at(self, obs_id, t):
-       for s in self.schedules:
-            if s["id"] == obs_id:
-              traj = s["trajectory"]
-              start = s.get("start",0)
-              idx = t - start
-              if 0 <= idx < len(traj):
-                return tuple(traj[idx])   
-       return None
-
+        s = self._by_id.get(obs_id)
+        if s is None:
+            return None
+        traj = s["trajectory"]
+        idx = t - s.get("start", 0)
+        if 0 <= idx < len(traj):
+            return tuple(traj[idx])
+        return None
 
     def occupied_at(self, t):
-        occ = set()
-        for s in self.schedules:
-            pos = self.position_at(s["id"], t)
-            if pos:
-                occ.add(tuple(pos))
-        return occ
+        return self.timeline.occupied_at(t)
+
+    def changes(self, t):
+        return self.timeline.changes(t)
+
+    def changes_ids(self, t):
+        return self.timeline.changes_ids(t)
 
 
 # ---------------- moving obstacle helper classes ----------------
@@ -59,6 +70,11 @@ class MovingObstacleManager:
     def __init__(self, obstacles=None):
         # obstacles: list of MovingObstacle
         self.obstacles = obstacles or []
+        self.timeline = OccupancyTimeline(self.obstacles)
+
+    def rebuild_timeline(self):
+        """Call after editing self.obstacles in place."""
+        self.timeline = OccupancyTimeline(self.obstacles)
 
     @classmethod
     def load_from_list(cls, schedule_list):
@@ -77,10 +93,123 @@ class MovingObstacleManager:
         return cls(obs)
 
     def occupied_at(self, t):
-        occ = set()
-        for o in self.obstacles:
-            p = o.position_at(t)
-            if p:
-                occ.add(tuple(p))
-        return occ
+        return self.timeline.occupied_at(t)
+
+    def changes(self, t):
+        return self.timeline.changes(t)
+
+    def changes_ids(self, t):
+        return self.timeline.changes_ids(t)
+
+    def moved(self, t, a, b):
+        return self.timeline.moved(t, a, b)
+
+    def cycle(self):
+        return obstacle_cycle(self.obstacles)
+
+
+def obstacle_cycle(obstacles):
+    """
+    (settle, period): from timestep `settle` on, occupancy repeats
+    every `period` steps. Looping obstacles repeat with their
+    trajectory length; one-shot obstacles are gone after their run.
+    """
+    settle, period = 0, 1
+    for o in obstacles:
+        n = len(o.trajectory)
+        if n == 0:
+            continue
+        if o.loop:
+            settle = max(settle, o.start)
+            period = lcm(period, n)
+        else:
+            settle = max(settle, o.start + n)
+    return settle, period
+
+
+class OccupancyTimeline:
+    """
+    Occupied cells per timestep, straight from per-obstacle phase arrays.
+
+    Every trajectory is packed into one flat array of cell ids
+    ((r - r0) * width + (c - c0)) with each obstacle's offset, length,
+    start and loop flag beside it, as in lockstep._MoverTable. A timestep
+    is one numpy pass over the obstacles (index t - start, folded by the
+    trajectory length for looping ones), so nothing is stored per step
+    and there is no hyperperiod to enumerate.
+
+    occupied_ids(t) / changes_ids(t) give sorted int64 id arrays;
+    occupied_at(t) / changes(t) give the same as frozensets of (r, c).
+    The last few timesteps are memoised, since callers ask for t and the
+    delta into t together.
+    """
+
+    MEMO = 4
+
+    def __init__(self, obstacles):
+        self.obstacles = obstacles
+        self.settle, self.period = obstacle_cycle(obstacles)
+        trajs = [[tuple(p) for p in o.trajectory] for o in obstacles]
+        pts = np.array([p for traj in trajs for p in traj], dtype=np.int64).reshape(-1, 2)
+        self.r0, self.c0 = pts.min(axis=0) if len(pts) else (0, 0)
+        self.width = int(pts[:, 1].max() - self.c0 + 1) if len(pts) else 1
+        ids = (pts[:, 0] - self.r0) * self.width + (pts[:, 1] - self.c0)
+        self.cells = np.append(ids, 0)
+        self.length = np.array([len(traj) for traj in trajs], dtype=np.int64)
+        self.off = np.cumsum(self.length) - self.length
+        self.start = np.array([o.start for o in obstacles], dtype=np.int64)
+        self.loop = np.array([bool(o.loop) for o in obstacles], dtype=bool)
+        self._ids = {}
+        self._sets = {}
+
+    def positions(self, t):
+        """Cell id of every obstacle at timestep t, -1 where it is off the map."""
+        idx = t - self.start
+        ok = (idx >= 0) & (self.length > 0) & (self.loop | (idx < self.length))
+        idx = np.where(self.loop, idx % np.maximum(self.length, 1), np.where(ok, idx, 0))
+        return np.where(ok, self.cells[self.off + idx], -1)
+
+    def occupied_ids(self, t):
+        ids = self._ids.get(t)
+        if ids is None:
+            pos = self.positions(t)
+            ids = np.unique(pos[pos >= 0])
+            if len(self._ids) >= self.MEMO:
+                self._ids.pop(next(iter(self._ids)))
+            self._ids[t] = ids
+        return ids
+
+    def changes_ids(self, t):
+        """(added, removed) id arrays going from timestep t-1 to t."""
+        a, b = self.occupied_ids(t - 1), self.occupied_ids(t)
+        return np.setdiff1d(b, a, assume_unique=True), np.setdiff1d(a, b, assume_unique=True)
+
+    def cell_id(self, cell):
+        """Id of an (r, c) cell, or -1 if no trajectory could reach it."""
+        r, c = cell[0] - self.r0, cell[1] - self.c0
+        return r * self.width + c if r >= 0 and 0 <= c < self.width else -1
+
+    def moved(self, t, a, b):
+        """Whether some obstacle goes from cell a at timestep t to cell b at t + 1."""
+        ia, ib = self.cell_id(a), self.cell_id(b)
+        if ia < 0 or ib < 0:
+            return False
+        return bool(np.any((self.positions(t) == ia) & (self.positions(t + 1) == ib)))
+
+    def coords(self, ids):
+        r, c = np.divmod(ids, self.width)
+        return frozenset(zip((r + self.r0).tolist(), (c + self.c0).tolist()))
+
+    def occupied_at(self, t):
+        cells = self._sets.get(t)
+        if cells is None:
+            cells = self.coords(self.occupied_ids(t))
+            if len(self._sets) >= self.MEMO:
+                self._sets.pop(next(iter(self._sets)))
+            self._sets[t] = cells
+        return cells
 
+    def changes(self, t):
+        """(added, removed) cells going from timestep t-1 to t."""
+        added, removed = self.changes_ids(t)
+        return self.coords(added), self.coords(removed)
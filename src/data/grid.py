@@ -1,26 +1,109 @@
 # src/data/grid.py
+from collections import deque
+from collections.abc import Set
+from types import MappingProxyType
+
+import numpy as np
+
+
+class ChangeLog:
+    """
+    Recent single-cell changes as (version, cell), so caches keyed on the
+    grid version can tell which cells moved instead of dropping everything.
+    """
+
+    def __init__(self, maxlen=4096):
+        self.entries = deque(maxlen=maxlen)
+        # changes after `floor` are all still in the log
+        self.floor = 0
+
+    def record(self, version, cell):
+        if len(self.entries) == self.entries.maxlen:
+            self.floor = self.entries[0][0]
+        self.entries.append((version, cell))
+
+    def reset(self, version):
+        """A bulk change: nothing before `version` can be answered any more."""
+        self.entries.clear()
+        self.floor = version
+
+    def since(self, version):
+        """Cells changed after `version`, or None if the log doesn't go back that far."""
+        if version < self.floor:
+            return None
+        cells = set()
+        for v, cell in reversed(self.entries):
+            if v <= version:
+                break
+            cells.add(cell)
+        return cells
+
+
+class CellSet(Set):
+    """Read-only view of a set of (r, c) cells."""
+
+    __slots__ = ("_cells",)
+
+    def __init__(self, cells):
+        self._cells = cells
+
+    def __contains__(self, cell):
+        return cell in self._cells
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __repr__(self):
+        return f"CellSet({self._cells!r})"
+
 
 class Grid:
     def __init__(self, rows, cols):
         self.rows = rows
         self.cols = cols
-        self.obstacles = set()
-        self.costs = {}
+        # written only through add_obstacle / add_cost / ..., so every
+        # change bumps the version caches are keyed on
+        self._obstacles = set()
+        self._costs = {}
+        # refuel stations, (r, c) cells where a vehicle fills its tank
+        self.stations = set()
+        # bumped on every obstacle / cost change, for caches keyed on the map
+        self.version = 0
+        self.changes = ChangeLog()
 
     def in_bounds(self, x, y):
         return 0 <= x < self.rows and 0 <= y < self.cols
 
+    @property
+    def obstacles(self):
+        # read-only: edit through add_obstacle / remove_obstacle
+        return CellSet(self._obstacles)
+
+    @property
+    def costs(self):
+        # read-only: edit through add_cost
+        return MappingProxyType(self._costs)
+
     def is_obstacle(self, x, y):
-        return (x, y) in self.obstacles
+        return (x, y) in self._obstacles
 
     def add_obstacle(self, x, y):
-        self.obstacles.add((x, y))
+        self._obstacles.add((x, y))
+        self._changed(x, y)
 
     def add_cost(self, x, y, cost):
-        self.costs[(x, y)] = cost
+        self._costs[(x, y)] = cost
+        self._changed(x, y)
 
     def get_cost(self, x, y):
-        return self.costs.get((x, y), 1)  # default = 1
+        return self._costs.get((x, y), 1)  # default = 1
+
+    def add_station(self, x, y):
+        self.stations.add((x, y))
+        self._changed(x, y)
 
     def neighbors(self, x, y):
         directions = [(1,0), (-1,0), (0,1), (0,-1)]
@@ -31,7 +114,22 @@ class Grid:
                 result.append((nx, ny))
         return result
     def remove_obstacle(self, x, y):
-        self.obstacles.discard((x, y))
+        self._obstacles.discard((x, y))
+        self._changed(x, y)
+
+    def _changed(self, x, y):
+        self.version += 1
+        self.changes.record(self.version, (x, y))
+
+    def changed_since(self, version):
+        """Cells changed after `version`, or None if that is too far back to tell."""
+        return self.changes.since(version)
+
+    def __getstate__(self):
+        # the ArrayGrid copy searches keep (see search_core.as_array_grid) is rebuilt on demand
+        state = self.__dict__.copy()
+        state.pop("_array_grid", None)
+        return state
 
     @property
     def width(self):
@@ -40,3 +138,198 @@ class Grid:
     @property
     def height(self):
         return self.rows
+
+
+# ---------------- compact array-backed grid ----------------
+# neighbour order matches Grid.neighbors: down, up, right, left
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class ArrayGrid:
+    """
+    Grid with the same API as Grid, backed by flat numpy arrays.
+
+    Cells live in a padded row-major layout: one ring of blocked border
+    cells surrounds the map, so a flat index i has neighbours
+    i + offset for offset in self.offsets and never needs a bounds check.
+    mask  : uint8, 1 = blocked (border cells are always blocked)
+    cost  : uint16, cost of entering the cell (default 1)
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        self.size = (rows + 2) * self.stride
+        self.mask = np.zeros(self.size, dtype=np.uint8)
+        self.cost = np.ones(self.size, dtype=np.uint16)
+        m = self.mask.reshape(rows + 2, self.stride)
+        m[0, :] = m[-1, :] = 1
+        m[:, 0] = m[:, -1] = 1
+        w = self.stride
+        self.offsets = (w, -w, 1, -1)
+        # refuel stations as (r, c), like Grid.stations
+        self.stations = set()
+        # bumped on every obstacle / cost change, for caches keyed on the map
+        self.version = 0
+        self.changes = ChangeLog()
+
+    @classmethod
+    def from_grid(cls, grid):
+        g = cls(grid.rows, grid.cols)
+        g.add_obstacles(grid.obstacles)
+        for (x, y), c in grid.costs.items():
+            g.add_cost(x, y, c)
+        g.stations = set(getattr(grid, "stations", ()))
+        return g
+
+    # ---- index helpers ----
+    def index(self, x, y):
+        return (x + 1) * self.stride + y + 1
+
+    def coord(self, i):
+        x, y = divmod(i, self.stride)
+        return (x - 1, y - 1)
+
+    # ---- Grid API ----
+    def in_bounds(self, x, y):
+        return 0 <= x < self.rows and 0 <= y < self.cols
+
+    def is_obstacle(self, x, y):
+        return self.in_bounds(x, y) and bool(self.mask[self.index(x, y)])
+
+    def add_obstacle(self, x, y):
+        if self.in_bounds(x, y):
+            self.mask[self.index(x, y)] = 1
+            self._changed(x, y)
+
+    def remove_obstacle(self, x, y):
+        if self.in_bounds(x, y):
+            self.mask[self.index(x, y)] = 0
+            self._changed(x, y)
+
+    def add_cost(self, x, y, cost):
+        if self.in_bounds(x, y):
+            self.cost[self.index(x, y)] = cost
+            self._changed(x, y)
+
+    def add_station(self, x, y):
+        if self.in_bounds(x, y):
+            self.stations.add((x, y))
+            self._changed(x, y)
+
+    def _changed(self, x, y):
+        self.version += 1
+        self.changes.record(self.version, (x, y))
+
+    def changed_since(self, version):
+        """Cells changed after `version`, or None if that is too far back to tell."""
+        return self.changes.since(version)
+
+    def get_cost(self, x, y):
+        if not self.in_bounds(x, y):
+            return 1
+        return int(self.cost[self.index(x, y)])
+
+    def neighbors(self, x, y):
+        result = []
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if self.in_bounds(nx, ny) and not self.mask[self.index(nx, ny)]:
+                result.append((nx, ny))
+        return result
+
+    @property
+    def width(self):
+        return self.cols
+
+    @property
+    def height(self):
+        return self.rows
+
+    @property
+    def obstacles(self):
+        # snapshot as a set of (r, c), for code written against Grid
+        rs, cs = np.nonzero(self.obstacle_view())
+        return set(zip(rs.tolist(), cs.tolist()))
+
+    @property
+    def costs(self):
+        # snapshot of non-default terrain costs, like Grid.costs
+        view = self.cost_view()
+        rs, cs = np.nonzero(view != 1)
+        return {(r, c): int(view[r, c]) for r, c in zip(rs.tolist(), cs.tolist())}
+
+    def unit_cost(self):
+        """True when every cell costs exactly 1 (plain BFS is then optimal)."""
+        return self.cost_range() == (1, 1)
+
+    def cost_range(self):
+        """(min, max) entry cost over the map, recomputed only when the version moves."""
+        cached = getattr(self, "_cost_range", None)
+        if cached is None or cached[0] != self.version:
+            view = self.cost_view()
+            lo, hi = (int(view.min()), int(view.max())) if view.size else (1, 1)
+            cached = self._cost_range = (self.version, lo, hi)
+        return cached[1], cached[2]
+
+    # ---- bulk mutation ----
+    def _flat(self, cells):
+        cells = np.asarray(list(cells) if not isinstance(cells, np.ndarray) else cells,
+                           dtype=np.int64).reshape(-1, 2)
+        rs, cs = cells[:, 0], cells[:, 1]
+        ok = (rs >= 0) & (rs < self.rows) & (cs >= 0) & (cs < self.cols)
+        return (rs[ok] + 1) * self.stride + cs[ok] + 1
+
+    def add_obstacles(self, cells):
+        self.mask[self._flat(cells)] = 1
+        self._bulk_changed()
+
+    def remove_obstacles(self, cells):
+        self.mask[self._flat(cells)] = 0
+        self._bulk_changed()
+
+    def set_obstacle_mask(self, blocked):
+        """blocked: (rows, cols) array-like, nonzero = obstacle"""
+        self.obstacle_view()[:] = np.asarray(blocked, dtype=bool)
+        self._bulk_changed()
+
+    def set_costs(self, costs):
+        """costs: (rows, cols) array-like of entry costs"""
+        self.cost_view()[:] = costs
+        self._bulk_changed()
+
+    def touch(self):
+        """Bump the version after writing through obstacle_view()/cost_view()."""
+        self._bulk_changed()
+
+    def _bulk_changed(self):
+        # too many cells to log one by one
+        self.version += 1
+        self.changes.reset(self.version)
+
+    # ---- zero-copy views ----
+    def obstacle_view(self):
+        """(rows, cols) view of the obstacle mask; writes go to the grid"""
+        return self.mask.reshape(self.rows + 2, self.stride)[1:-1, 1:-1]
+
+    def cost_view(self):
+        """(rows, cols) view of the cost array; writes go to the grid"""
+        return self.cost.reshape(self.rows + 2, self.stride)[1:-1, 1:-1]
+
+    def __getstate__(self):
+        # search scratch space / jump tables are per process, don't ship them to workers
+        state = self.__dict__.copy()
+        state.pop("_search_ws", None)
+        state.pop("_search_ws_back", None)
+        state.pop("_fuel_near", None)
+        state.pop("_jump_table", None)
+        return state
+
+    def buffers(self):
+        """
+        Flat (mask, cost) memoryviews over the padded arrays.
+        Indexing a memoryview gives plain ints, which is what the
+        pure-Python search loops want.
+        """
+        return memoryview(self.mask), memoryview(self.cost)
@@ -0,0 +1,69 @@
+# src/experiments/bench_flow_field.py
+# vehicles returning to one depot: one astar each vs one flow field, and
+# flow-field repair vs rebuild while movers change the map
+import argparse
+import time
+
+from src.data.dynamic_obstacles import MovingObstacleManager
+from src.experiments.bench_one_to_many import free_cells
+from src.models.astar import astar
+from src.models.flow_field import FlowField
+from src.preprocessing.map_generator import KINDS, generate, generate_schedule
+
+
+def compare(name, grid, depot, vehicles, movers, ticks):
+    t0 = time.perf_counter()
+    single = [astar(grid, v, depot)[1] for v in vehicles]
+    astar_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    field = FlowField(grid, depot)
+    steps = [field.next_step(v) for v in vehicles]
+    build_s = time.perf_counter() - t0
+    assert [field.cost_to_go(v) for v in vehicles] == single
+    assert all(s is not None or v == depot or c == float("inf") for s, v, c in zip(steps, vehicles, single))
+
+    # movers written into the grid tick by tick, the field repaired from the deltas
+    repair_s = 0.0
+    for t in range(ticks):
+        added, removed = movers.changes(t)
+        added = added - {depot}
+        grid.remove_obstacles(removed)
+        grid.add_obstacles(added)
+        t0 = time.perf_counter()
+        field.update(added | removed)
+        repair_s += time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fresh = FlowField(grid, depot)
+    rebuild_s = time.perf_counter() - t0
+    assert fresh.dist == field.dist
+    # put the map back for the next row
+    grid.remove_obstacles(movers.occupied_at(ticks - 1) - {depot})
+    n = len(vehicles)
+    print(f"{name:>16} {n:>8} | {astar_s * 1e3:>9.1f} {build_s * 1e3:>9.1f} {astar_s / build_s:>7.1f}x | "
+          f"{repair_s / ticks * 1e3:>9.2f} {rebuild_s * 1e3:>9.1f} {field.nbytes() // 1024:>7}")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--kinds", nargs="*", choices=KINDS, default=["terrain", "urban"])
+    p.add_argument("--sizes", nargs="*", type=int, default=[200])
+    p.add_argument("--vehicles", nargs="*", type=int, default=[20, 100])
+    p.add_argument("--movers", type=int, default=50)
+    p.add_argument("--ticks", type=int, default=100)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    print(f"{'map':>16} {'vehicles':>8} | {'astar ms':>9} {'field ms':>9} {'speedup':>8} | "
+          f"{'repair ms':>9} {'rebuild':>9} {'KiB':>7}")
+    for kind in args.kinds:
+        for n in args.sizes:
+            grid, _, _ = generate(kind, n, seed=args.seed)
+            for k in args.vehicles:
+                cells = free_cells(grid, k + 1, args.seed)
+                movers = MovingObstacleManager.load_from_list(
+                    generate_schedule(grid, args.movers, seed=args.seed, avoid=cells))
+                compare(f"{kind} {n}", grid, cells[0], cells[1:], movers, args.ticks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# src/experiments/bench_landmarks.py
+# node expansions of astar: manhattan vs ALT landmarks
+import argparse
+import random
+import time
+
+import numpy as np
+
+from src.data.grid import ArrayGrid
+from src.preprocessing.map_loader import load_map_from_file
+from src.models.astar import astar
+from src.models.landmarks import Landmarks
+
+
+def weighted_grid(rows, cols, density=0.25, max_cost=9, seed=0):
+    """Random obstacles plus random terrain costs 1..max_cost."""
+    rng = np.random.default_rng(seed)
+    g = ArrayGrid(rows, cols)
+    g.set_obstacle_mask(rng.random((rows, cols)) < density)
+    g.set_costs(rng.integers(1, max_cost + 1, size=(rows, cols)))
+    return g
+
+
+def random_pairs(grid, n, seed=0):
+    rnd = random.Random(seed)
+    free = np.argwhere(grid.obstacle_view() == 0)
+    return [(tuple(free[rnd.randrange(len(free))].tolist()),
+             tuple(free[rnd.randrange(len(free))].tolist())) for _ in range(n)]
+
+
+def compare(name, grid, pairs, k):
+    t0 = time.perf_counter()
+    lm = Landmarks.build(grid, k=k)
+    build_s = time.perf_counter() - t0
+    nodes = {"manhattan": 0, "alt": 0}
+    secs = {"manhattan": 0.0, "alt": 0.0}
+    for s, t in pairs:
+        for label, h in (("manhattan", None), ("alt", lm)):
+            t0 = time.perf_counter()
+            _, _, n = astar(grid, s, t, heuristic=h)
+            secs[label] += time.perf_counter() - t0
+            nodes[label] += n
+    ratio = nodes["manhattan"] / max(nodes["alt"], 1)
+    print(f"{name:>22} | {nodes['manhattan']:>10} {nodes['alt']:>10} {ratio:>6.2f}x | "
+          f"{secs['manhattan']:>7.3f}s {secs['alt']:>7.3f}s | build {build_s:.2f}s "
+          f"{lm.nbytes / 1e6:.1f} MB")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--maps", nargs="*", default=["maps/small.txt", "maps/medium.txt",
+                                                  "maps/large.txt", "maps/dynamic.txt"])
+    p.add_argument("--sizes", nargs="*", type=int, default=[200, 500])
+    p.add_argument("--landmarks", type=int, default=8)
+    p.add_argument("--queries", type=int, default=20)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    print(f"{'map':>22} | {'manhattan':>10} {'alt':>10} {'saved':>7} | time (manhattan, alt)")
+    for m in args.maps:
+        grid, _, _ = load_map_from_file(m, compact=True)
+        compare(m, grid, random_pairs(grid, args.queries, args.seed), args.landmarks)
+    for n in args.sizes:
+        grid = weighted_grid(n, n, seed=args.seed)
+        compare(f"generated {n}x{n}", grid, random_pairs(grid, args.queries, args.seed), args.landmarks)
+
+
+if __name__ == "__main__":
+    main()
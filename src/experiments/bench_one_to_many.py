@@ -0,0 +1,58 @@
+# src/experiments/bench_one_to_many.py
+# queries per second: one astar call per target vs one shared sweep
+import argparse
+import random
+import time
+
+import numpy as np
+
+from src.models.astar import astar
+from src.models.one_to_many import many_to_one, one_to_many
+from src.preprocessing.map_generator import KINDS, generate
+
+
+def free_cells(grid, n, seed=0):
+    rnd = random.Random(seed)
+    free = np.argwhere(grid.obstacle_view() == 0)
+    return [tuple(free[rnd.randrange(len(free))].tolist()) for _ in range(n)]
+
+
+def compare(name, grid, depot, targets):
+    t0 = time.perf_counter()
+    single = [astar(grid, depot, t)[1] for t in targets]
+    single_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    tree = one_to_many(grid, depot, targets)
+    for t in targets:
+        tree.path(t)
+    out_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    back = many_to_one(grid, targets, depot)
+    for t in targets:
+        back.path(t)
+    in_s = time.perf_counter() - t0
+    assert [tree.cost(t) for t in targets] == single
+    n = len(targets)
+    print(f"{name:>16} {n:>6} | {n / single_s:>10.0f} {n / out_s:>10.0f} {n / in_s:>10.0f} | "
+          f"{single_s / out_s:>7.1f}x")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--kinds", nargs="*", choices=KINDS, default=["terrain", "urban"])
+    p.add_argument("--sizes", nargs="*", type=int, default=[200])
+    p.add_argument("--targets", nargs="*", type=int, default=[100, 1000])
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    print(f"{'map':>16} {'queries':>6} | {'astar q/s':>10} {'1->many':>10} {'many->1':>10} | speedup")
+    for kind in args.kinds:
+        for n in args.sizes:
+            grid, _, _ = generate(kind, n, seed=args.seed)
+            for k in args.targets:
+                cells = free_cells(grid, k + 1, args.seed)
+                compare(f"{kind} {n}", grid, cells[0], cells[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# src/experiments/benchmark.py
+# timing suite on generated maps: warmup + repeats, nodes/sec, peak memory,
+# compared against a stored baseline
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.data.dynamic_obstacles import MovingObstacleManager
+from src.models.astar import astar
+from src.models.bfs import bfs
+from src.models.bidirectional import bi_astar, bi_ucs
+from src.models.replanner import Replanner
+from src.models.ucs import ucs
+from src.preprocessing.map_generator import KINDS, generate, generate_schedule
+
+PLANNERS = {"bfs": bfs, "ucs": ucs, "astar": astar, "bi_ucs": bi_ucs, "bi_astar": bi_astar}
+ALGOS = ("bfs", "ucs", "astar", "bi_ucs", "bi_astar", "replanner")
+# bidirectional planner -> the one-way planner it is compared with
+BIDIRECTIONAL = {"bi_ucs": "ucs", "bi_astar": "astar"}
+
+
+def replan_episode(grid, start, goal, schedule, max_steps=None):
+    """
+    Agent walks its astar path while the movers in `schedule` enter and
+    leave the grid; Replanner repairs the path when it is hit. max_steps
+    defaults to rows * cols, enough to cross any map however long the
+    detours get. Returns (path walked, cost, nodes, replans), cost is inf
+    if the goal wasn't reached.
+    """
+    movers = MovingObstacleManager.load_from_list(schedule)
+    repl = Replanner(grid)
+    path, cost, nodes, _ = repl.plan_path(start, goal, "astar")
+    if max_steps is None:
+        max_steps = grid.rows * grid.cols
+    pos, walked, replans = start, [start], 0
+    for t in range(max_steps):
+        if pos == goal or not path:
+            break
+        added, removed = movers.changes(t)
+        added = added - {pos}
+        if added or removed:
+            grid.add_obstacles(added)
+            grid.remove_obstacles(removed)
+        new, _, n, _ = repl.replan_if_needed(path, pos, goal, "astar", changed=added | removed)
+        if new is not path:
+            replans += 1
+            nodes += n or 0
+        path = new
+        if len(path) < 2:
+            break
+        pos = path[1]
+        path = path[1:]
+        walked.append(pos)
+    cost = sum(grid.get_cost(*p) for p in walked[1:]) if pos == goal else float("inf")
+    return walked, cost, nodes, replans
+
+
+def _case(grid, start, goal, algo, schedule):
+    if algo == "replanner":
+        # movers are written into the grid; put the mask back afterwards
+        saved = grid.mask.copy()
+        _, cost, nodes, _ = replan_episode(grid, start, goal, schedule)
+        grid.mask[:] = saved
+        grid.touch()
+        return cost, nodes
+    _, cost, nodes = PLANNERS[algo](grid, start, goal)
+    return cost, nodes
+
+
+def measure(grid, start, goal, algo, warmup=1, repeats=3, schedule=(), memory=True):
+    """
+    Median/min wall time over `repeats` runs after `warmup` runs. With
+    memory=True one more run is traced for the peak Python/numpy
+    allocation; search buffers kept on the grid from the warmup don't
+    count, so this is the steady-state peak of one query.
+    """
+    for _ in range(warmup):
+        _case(grid, start, goal, algo, schedule)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        cost, nodes = _case(grid, start, goal, algo, schedule)
+        times.append(time.perf_counter() - t0)
+    peak = None
+    if memory:
+        # tracing slows every allocation down a lot, so it gets its own run
+        tracemalloc.start()
+        _case(grid, start, goal, algo, schedule)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    med = statistics.median(times)
+    return {
+        "median_s": med,
+        "min_s": min(times),
+        "nodes": nodes,
+        "nodes_per_s": nodes / med if med > 0 else 0.0,
+        "peak_mb": peak / 1e6 if peak is not None else None,
+        "cost": cost if cost != float("inf") else None,
+    }
+
+
+def run_suite(kinds, sizes, algos, seed=0, warmup=1, repeats=3, movers=None, memory=True, progress=print):
+    """Results keyed "kind/size/algo", generated maps are seeded so every run
+    of the suite sees the same inputs."""
+    results = {}
+    for kind in kinds:
+        for n in sizes:
+            grid, start, goal = generate(kind, n, seed=seed)
+            schedule = generate_schedule(grid, movers if movers is not None else max(n // 10, 5),
+                                         seed=seed, avoid=(start, goal)) if "replanner" in algos else ()
+            for algo in algos:
+                key = f"{kind}/{n}/{algo}"
+                results[key] = r = measure(grid, start, goal, algo, warmup, repeats, schedule, memory)
+                if progress:
+                    mb = f"{r['peak_mb']:>8.1f} MB" if memory else ""
+                    progress(f"{key:>24} {r['median_s'] * 1e3:>10.1f} ms {r['nodes']:>10} nodes "
+                             f"{r['nodes_per_s']:>12.0f} nodes/s {mb}")
+    return results
+
+
+def savings(results):
+    """
+    Lines comparing each bidirectional run with its one-way counterpart
+    on the same map: expansions and median time as a share of one-way.
+    """
+    lines = []
+    for key, r in results.items():
+        kind, n, algo = key.split("/")
+        base = results.get(f"{kind}/{n}/{BIDIRECTIONAL.get(algo)}")
+        if base is None or not base["nodes"]:
+            continue
+        lines.append(f"{key:>24} {r['nodes'] / base['nodes'] * 100:>6.1f}% of {base['nodes']} {BIDIRECTIONAL[algo]} "
+                     f"expansions, {r['median_s'] / max(base['median_s'], 1e-12) * 100:>6.1f}% of its time")
+    return lines
+
+
+def unreached(results):
+    """Messages for the cases whose goal was never reached."""
+    return [f"{key}: goal not reached" for key, r in results.items() if r["cost"] is None]
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Regressions against a baseline dict of the same shape: slower median or
+    more peak memory than (1 + tolerance) x baseline, or a different node
+    count / cost (the search itself changed). A case that didn't reach its
+    goal (cost None) is always reported. Returns a list of messages.
+    """
+    found = unreached(results)
+    for key, r in results.items():
+        b = baseline.get(key)
+        if b is None:
+            continue
+        if r["median_s"] > b["median_s"] * (1 + tolerance):
+            found.append(f"{key}: time {b['median_s'] * 1e3:.1f} -> {r['median_s'] * 1e3:.1f} ms "
+                         f"(+{(r['median_s'] / b['median_s'] - 1) * 100:.0f}%)")
+        if r["peak_mb"] is not None and b["peak_mb"] is not None \
+                and r["peak_mb"] > b["peak_mb"] * (1 + tolerance) + 0.1:
+            found.append(f"{key}: peak memory {b['peak_mb']:.1f} -> {r['peak_mb']:.1f} MB")
+        if r["nodes"] != b["nodes"] or r["cost"] != b["cost"]:
+            found.append(f"{key}: nodes/cost {b['nodes']}/{b['cost']} -> {r['nodes']}/{r['cost']}")
+    return found
+
+
+def main():
+    p = argparse.ArgumentParser(description="benchmark planners on generated maps")
+    p.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    p.add_argument("--sizes", nargs="+", type=int, default=[100, 200])
+    p.add_argument("--algos", nargs="+", choices=ALGOS, default=list(ALGOS))
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--warmup", type=int, default=1)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--movers", type=int, default=None, help="movers for the replanner episode (default: size // 10)")
+    p.add_argument("--no_memory", action="store_true", help="skip the (slow) traced peak-memory run")
+    p.add_argument("--baseline", default="benchmarks/baseline.json")
+    p.add_argument("--save", action="store_true", help="store these results as the new baseline")
+    p.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = p.parse_args()
+
+    results = run_suite(args.kinds, args.sizes, args.algos, seed=args.seed, warmup=args.warmup,
+                        repeats=args.repeats, movers=args.movers, memory=not args.no_memory)
+    for line in savings(results):
+        print(line)
+    base = Path(args.baseline)
+    if args.save:
+        failed = unreached(results)
+        for msg in failed:
+            print("FAILED", msg)
+        if failed:
+            sys.exit("not saving a baseline with failed cases")
+        base.parent.mkdir(parents=True, exist_ok=True)
+        old = json.loads(base.read_text()) if base.exists() else {}
+        old.update(results)
+        base.write_text(json.dumps(old, indent=1, sort_keys=True))
+        print(f"baseline saved to {base}")
+        return
+    if not base.exists():
+        print(f"no baseline at {base}, run with --save to store one")
+        return
+    regressions = compare(results, json.loads(base.read_text()), args.tolerance)
+    for msg in regressions:
+        print("REGRESSION", msg)
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions against {base}")
+
+
+if __name__ == "__main__":
+    main()
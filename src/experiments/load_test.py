@@ -0,0 +1,119 @@
+# src/experiments/load_test.py
+# load generator for the planning service: concurrent clients, p50/p99
+# latency and queries per second
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from src.preprocessing.map_generator import KINDS, generate
+from src.service.client import PlanningClient
+from src.service.server import PlanningService
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    k = min(int(q / 100 * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[k]
+
+
+async def run_load(client_factory, name, free, queries=2000, clients=16, algo="astar", hot=0.3, hot_pairs=20,
+                   update_every=0, seed=0):
+    """
+    `clients` connections send `queries` plan requests between them, each
+    waiting for its answer before the next. A `hot` share of the queries
+    repeat one of hot_pairs fixed pairs (what coalescing is for); with
+    update_every, every N-th query is preceded by an obstacle toggle.
+    Returns a dict of latency percentiles (ms), qps and failures.
+    """
+    rnd = random.Random(seed)
+    hot_set = [(rnd.choice(free), rnd.choice(free)) for _ in range(hot_pairs)]
+    todo = [rnd.choice(hot_set) if rnd.random() < hot else (rnd.choice(free), rnd.choice(free))
+            for _ in range(queries)]
+    latencies, failed = [], 0
+    sent = 0
+    conns = [await client_factory() for _ in range(clients)]
+
+    async def worker(client):
+        nonlocal sent, failed
+        while sent < len(todo):
+            k = sent
+            sent += 1
+            if update_every and k % update_every == 0:
+                await client.update(name, add=[rnd.choice(free)], remove=[rnd.choice(free)])
+            s, t = todo[k]
+            t0 = time.perf_counter()
+            res = await client.plan(name, s, t, algo=algo)
+            latencies.append(time.perf_counter() - t0)
+            if not res.get("ok"):
+                failed += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(c) for c in conns))
+    wall = time.perf_counter() - t0
+    stats = await conns[0].request("stats")
+    for c in conns:
+        await c.close()
+    lat = sorted(latencies)
+    return {"queries": len(lat), "qps": len(lat) / wall, "p50_ms": percentile(lat, 50) * 1e3,
+            "p99_ms": percentile(lat, 99) * 1e3, "max_ms": lat[-1] * 1e3 if lat else float("nan"),
+            "failed": failed, "counts": stats.get("counts", {})}
+
+
+async def main_async(args):
+    svc = None
+    if args.spawn:
+        # server in this process (its planners still run in worker processes)
+        svc = PlanningService(workers=args.workers)
+        host, port = await svc.start()
+        unix = None
+    else:
+        host, port, unix = args.host, args.port, args.unix
+
+    async def factory():
+        return await PlanningClient.connect(host, port, unix=unix)
+
+    grid, _, _ = generate(args.kind, args.size, seed=args.seed)
+    free = [tuple(c) for c in np.argwhere(grid.obstacle_view() == 0).tolist()]
+    name = f"{args.kind}{args.size}"
+    c = await factory()
+    await c.request("load", name=name, kind=args.kind, size=args.size, seed=args.seed)
+    await c.close()
+
+    print(f"{'clients':>7} {'queries':>7} | {'qps':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} | "
+          f"{'coalesced':>9} {'batches':>7} {'failed':>6}")
+    for n in args.clients:
+        r = await run_load(factory, name, free, queries=args.queries, clients=n, algo=args.algo, hot=args.hot,
+                           update_every=args.update_every, seed=args.seed)
+        counts = r["counts"]
+        print(f"{n:>7} {r['queries']:>7} | {r['qps']:>8.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['max_ms']:>8.2f} | {counts.get('coalesced', 0):>9} {counts.get('batches', 0):>7} "
+              f"{r['failed']:>6}")
+    if svc is not None:
+        await svc.close()
+
+
+def main():
+    p = argparse.ArgumentParser(description="load generator for src.service.server")
+    p.add_argument("--spawn", action="store_true", help="start a service in this process instead of connecting")
+    p.add_argument("--workers", type=int, default=2, help="planner processes for --spawn")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--unix", default=None)
+    p.add_argument("--kind", choices=KINDS, default="urban")
+    p.add_argument("--size", type=int, default=200)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--algo", default="astar")
+    p.add_argument("--clients", type=int, nargs="*", default=[1, 8, 32], help="concurrency levels to run")
+    p.add_argument("--queries", type=int, default=1000, help="queries per concurrency level")
+    p.add_argument("--hot", type=float, default=0.3, help="share of queries repeating a few hot pairs")
+    p.add_argument("--update_every", type=int, default=0, help="toggle an obstacle every N queries")
+    args = p.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+# src/experiments/lockstep.py
+# many independent dynamic episodes on one map, advanced in lockstep:
+# positions, mover occupancy and collision checks are numpy arrays and
+# only the episodes whose path got blocked call the planner
+import argparse
+import random
+import time
+
+import numpy as np
+
+from src.data.grid import ArrayGrid
+from src.data.dynamic_obstacles import MovingObstacle, MovingObstacleManager
+from src.models.ara import weighted_astar
+from src.models.astar import astar
+from src.models.bfs import bfs
+from src.models.jps import jps
+from src.models.replanner import Replanner
+from src.models.search_core import as_array_grid
+from src.models.ucs import ucs
+from src.preprocessing.map_generator import KINDS, generate, generate_schedule
+
+PLANNERS = {"astar": astar, "ucs": ucs, "bfs": bfs, "jps": jps, "wastar": weighted_astar}
+# episode outcome codes in the "status" array
+STATUS = ("running", "goal", "collision", "no_path", "max_steps")
+RUNNING, GOAL, COLLISION, NO_PATH, MAX_STEPS = range(5)
+
+
+def _movers(m):
+    if m is None:
+        return []
+    if isinstance(m, MovingObstacleManager):
+        return m.obstacles
+    # straight from the schedule dicts: no OccupancyTimeline needed here
+    return [MovingObstacle(d.get("trajectory", []), start=d.get("start", 0), loop=d.get("loop", True))
+            for d in m]
+
+
+class _MoverTable:
+    """
+    Every mover of every episode in flat arrays; at(t) gives the occupied
+    cells as sorted keys episode * grid.size + flat cell, one numpy pass
+    over all movers.
+    """
+
+    def __init__(self, grid, episodes):
+        ep, start, length, loop, off, cells = [], [], [], [], [], []
+        n = 0
+        for e, (_, _, movers) in enumerate(episodes):
+            for o in _movers(movers):
+                traj = [grid.index(*p) for p in o.trajectory]
+                ep.append(e)
+                start.append(o.start)
+                length.append(len(traj))
+                loop.append(bool(o.loop))
+                off.append(n)
+                cells.extend(traj)
+                n += len(traj)
+        self.ep = np.array(ep, dtype=np.int64)
+        self.start = np.array(start, dtype=np.int64)
+        self.length = np.array(length, dtype=np.int64)
+        self.loop = np.array(loop, dtype=bool)
+        self.off = np.array(off, dtype=np.int64)
+        self.cells = np.array(cells + [0], dtype=np.int64)
+        self.size = grid.size
+
+    def at(self, t, active):
+        idx = t - self.start
+        ok = (idx >= 0) & (self.length > 0) & (self.loop | (idx < self.length)) & active[self.ep]
+        idx = np.where(self.loop, idx % np.maximum(self.length, 1), idx)
+        cells = self.cells[self.off[ok] + idx[ok]]
+        return np.unique(self.ep[ok] * self.size + cells)
+
+
+def _lookup(sorted_keys, keys):
+    """Positions of keys in sorted_keys and whether each is there."""
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=np.int64), np.zeros(len(keys), dtype=bool)
+    j = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return j, sorted_keys[j] == keys
+
+
+def run_lockstep(grid, episodes, algo="astar", max_steps=1000, time_limit=None, max_nodes=None):
+    """
+    Simulate episodes = [(start, goal, movers), ...] on one map, where
+    movers is a MovingObstacleManager, a schedule list for
+    MovingObstacleManager.load_from_list, or None. Each episode follows
+    the rules of run_experiment.run_dynamic: its movers are obstacles at
+    the current tick, a path that crosses one is replanned from the
+    agent's cell (freed shortcuts are not looked for), standing on a
+    mover's cell is a collision, and the cost counts every executed cell
+    (start included).
+
+    Per tick the mover cells, the collision test and the "is my path
+    blocked" test are a few numpy ops over all episodes together; only
+    the blocked episodes plan, one at a time, with their movers written
+    into the grid's mask for the duration of the search.
+
+    Returns a dict of per-episode arrays (status as an index into STATUS,
+    steps, cost, replans, nodes) and totals (episodes, seconds,
+    episodes_per_s, searches, and one count per status name).
+    """
+    t0 = time.perf_counter()
+    grid = as_array_grid(grid)
+    plan = PLANNERS[algo]
+    mask = grid.mask
+    static = mask.copy()
+    cost_arr = grid.cost
+    size = grid.size
+    n = len(episodes)
+    table = _MoverTable(grid, episodes)
+
+    goal = np.array([grid.index(*g) for _, g, _ in episodes], dtype=np.int64)
+    pos = np.array([grid.index(*s) for s, _, _ in episodes], dtype=np.int64)
+    status = np.zeros(n, dtype=np.int64)
+    steps = np.zeros(n, dtype=np.int64)
+    total = cost_arr[pos].astype(np.int64)
+    replans = np.zeros(n, dtype=np.int64)
+    nodes = np.zeros(n, dtype=np.int64)
+    ptr = np.zeros(n, dtype=np.int64)
+    searches = 0
+
+    def search(s, t):
+        nonlocal searches
+        searches += 1
+        path, _, k = plan(grid, grid.coord(int(s)), grid.coord(int(t)), time_limit=time_limit, max_nodes=max_nodes)
+        return np.array([grid.index(*p) for p in path], dtype=np.int64), k or 0
+
+    # paths[e]: flat cells in order; by_cell[e]: (sorted cells, their path positions)
+    paths, by_cell = [None] * n, [None] * n
+
+    def set_path(e, p):
+        paths[e] = p
+        order = np.argsort(p, kind="stable")
+        by_cell[e] = (p[order] + e * size, order)
+
+    # first plans ignore the movers, as in run_dynamic; equal (start, goal) share one
+    first = {}
+    for e in range(n):
+        key = (int(pos[e]), int(goal[e]))
+        if key not in first:
+            first[key] = search(*key)
+            nodes[e] += first[key][1]
+        set_path(e, first[key][0])
+
+    def index_paths():
+        lens = np.array([len(p) for p in paths], dtype=np.int64)
+        offs = np.concatenate(([0], np.cumsum(lens)[:-1]))
+        flat = np.concatenate(paths)
+        keys = np.concatenate([b[0] for b in by_cell])
+        at = np.concatenate([b[1] for b in by_cell])
+        return lens, offs, flat, keys, at
+
+    lens, offs, flat, keys, at = index_paths()
+    done_now = pos == goal
+    status[done_now] = GOAL
+
+    t = 0
+    while t < max_steps:
+        active = status == RUNNING
+        if not active.any():
+            break
+        occ = table.at(t, active)
+        ep_of = occ // size
+
+        # agents standing where a mover is now
+        idx = np.flatnonzero(active)
+        _, hit = _lookup(occ, idx * size + pos[idx])
+        status[idx[hit]] = COLLISION
+        active[idx[hit]] = False
+
+        # movers on the rest of an active agent's path (lens == 0: no path at all)
+        j, on = _lookup(keys, occ)
+        on &= active[ep_of]
+        on[on] = at[j[on]] >= ptr[ep_of[on]]
+        blocked = np.unique(ep_of[on])
+        blocked = np.union1d(blocked, np.flatnonzero(active & (lens < 2)))
+        if len(blocked):
+            for e in blocked.tolist():
+                lo, hi = np.searchsorted(occ, [e * size, (e + 1) * size])
+                mine = occ[lo:hi] - e * size
+                mine = mine[static[mine] == 0]
+                mask[mine] = 1
+                grid.touch()
+                p, k = search(pos[e], goal[e])
+                mask[mine] = 0
+                grid.touch()
+                replans[e] += 1
+                nodes[e] += k
+                if len(p) < 2:
+                    status[e] = NO_PATH
+                    p = np.zeros(0, dtype=np.int64)
+                set_path(e, p)
+                ptr[e] = 0
+            lens, offs, flat, keys, at = index_paths()
+            active = status == RUNNING
+
+        # everyone still running takes the next cell of its path
+        idx = np.flatnonzero(active)
+        ptr[idx] += 1
+        pos[idx] = flat[offs[idx] + ptr[idx]]
+        steps[idx] += 1
+        total[idx] += cost_arr[pos[idx]]
+        status[idx[pos[idx] == goal[idx]]] = GOAL
+        t += 1
+
+    status[status == RUNNING] = MAX_STEPS
+    seconds = time.perf_counter() - t0
+    out = {"status": status, "steps": steps, "cost": total, "replans": replans, "nodes": nodes,
+           "episodes": n, "seconds": seconds, "episodes_per_s": n / seconds if seconds else float("inf"),
+           "searches": searches}
+    for k, name in enumerate(STATUS):
+        out[name] = int((status == k).sum())
+    return out
+
+
+def run_episode(grid, start, goal, movers, algo="astar", max_steps=1000, time_limit=None, max_nodes=None):
+    """
+    One episode the way run_dynamic steps it (occupancy sets, grid edits,
+    replan_if_needed, path.index), without its files and plots. The
+    per-episode baseline for run_lockstep; returns (status, steps, cost,
+    replans).
+    """
+    grid = ArrayGrid.from_grid(grid)
+    mover = movers if isinstance(movers, MovingObstacleManager) else MovingObstacleManager.load_from_list(movers or [])
+    # mover cells that are walls anyway stay walls when the mover leaves
+    static = {tuple(p) for o in mover.obstacles for p in o.trajectory if grid.is_obstacle(*p)}
+    # lockstep only replans blocked paths, so no shortcut replans here either
+    repl = Replanner(grid, cache_size=0, shortcuts=False)
+    limits = {"time_limit": time_limit, "max_nodes": max_nodes}
+    path, _, _, _ = repl.plan_path(start, goal, algo=algo, **limits)
+    pos, executed, replans, t = start, [start], 0, 0
+    status = GOAL if pos == goal else MAX_STEPS
+    while pos != goal and t < max_steps:
+        occ = mover.occupied_at(t)
+        added, removed = mover.changes(t)
+        for p in removed:
+            if p not in static:
+                grid.remove_obstacle(*p)
+        for p in added:
+            grid.add_obstacle(*p)
+        if pos in occ:
+            status = COLLISION
+            break
+        new_path, _, _, _ = repl.replan_if_needed(path, pos, goal, algo=algo, **limits)
+        if new_path is not path:
+            replans += 1
+        path = new_path
+        if not path or len(path) < 2:
+            status = NO_PATH
+            break
+        pos = path[1]
+        executed.append(pos)
+        path = path[path.index(pos):]
+        t += 1
+        if pos == goal:
+            status = GOAL
+    return status, len(executed) - 1, sum(grid.get_cost(*p) for p in executed), replans
+
+
+def make_episodes(grid, n, movers=20, pairs=None, seed=0):
+    """
+    n episodes with their own seeded generate_schedule movers; with
+    pairs=k they draw their (start, goal) from k fixed pairs instead of
+    each getting a fresh one.
+    """
+    rnd = random.Random(seed)
+    free = [tuple(c) for c in np.argwhere(grid.obstacle_view() == 0).tolist()]
+    pool = [tuple(rnd.sample(free, 2)) for _ in range(pairs)] if pairs else None
+    out = []
+    for e in range(n):
+        s, g = rnd.choice(pool) if pool else rnd.sample(free, 2)
+        out.append((s, g, generate_schedule(grid, movers, seed=seed * 100003 + e, avoid=(s, g))))
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="many dynamic episodes in lockstep vs one at a time")
+    p.add_argument("--kind", choices=KINDS, default="urban")
+    p.add_argument("--size", type=int, default=100)
+    p.add_argument("--episodes", type=int, nargs="*", default=[100, 1000])
+    p.add_argument("--movers", type=int, default=20, help="generate_schedule movers per episode")
+    p.add_argument("--pairs", type=int, default=0, help="draw start/goal from this many fixed pairs (0 = all fresh)")
+    p.add_argument("--algo", choices=sorted(PLANNERS), default="astar")
+    p.add_argument("--max_steps", type=int, default=1000)
+    p.add_argument("--baseline", type=int, default=100, help="episodes to time one at a time (0 = skip)")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    grid, _, _ = generate(args.kind, args.size, seed=args.seed)
+    print(f"{'episodes':>8} {'mode':>9} | {'eps/s':>9} {'seconds':>8} {'goal':>6} {'collide':>7} "
+          f"{'no_path':>7} {'searches':>8}")
+    for n in args.episodes:
+        eps = make_episodes(grid, n, movers=args.movers, pairs=args.pairs, seed=args.seed)
+        r = run_lockstep(grid, eps, algo=args.algo, max_steps=args.max_steps)
+        print(f"{n:>8} {'lockstep':>9} | {r['episodes_per_s']:>9.1f} {r['seconds']:>8.2f} {r['goal']:>6} "
+              f"{r['collision']:>7} {r['no_path']:>7} {r['searches']:>8}")
+        if args.baseline:
+            k = min(n, args.baseline)
+            t0 = time.perf_counter()
+            res = [run_episode(grid, s, g, m, algo=args.algo, max_steps=args.max_steps) for s, g, m in eps[:k]]
+            dt = time.perf_counter() - t0
+            st = [x[0] for x in res]
+            print(f"{k:>8} {'one-by-one':>9} | {k / dt:>9.1f} {dt:>8.2f} {st.count(GOAL):>6} "
+                  f"{st.count(COLLISION):>7} {st.count(NO_PATH):>7} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,67 @@
-import pandas as pd
+# src/experiments/plot_results.py
+# summary_stats.csv, tables.latex and per-map bar plots from the results
+# store's aggregates (no rescan of the raw runs)
+import argparse
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 
-# Load the results CSV file
-df = pd.read_csv('/Users/ayetirishith/Desktop/AIML PROJECT/outputs/results.csv')
-
-# Convert non-numeric 'cost' values like 'FAIL' to NaN
-df['numeric_cost'] = pd.to_numeric(df['cost'], errors='coerce')
-
-# Group by map and algorithm to get mean and std dev for cost, nodes, and time
-summary = df.groupby(['map', 'algo']).agg({
-    'numeric_cost': ['mean', 'std'],
-    'nodes': ['mean', 'std'],
-    'time_s': ['mean', 'std']
-}).reset_index()
-
-# Rename columns for readability
-summary.columns = ['map', 'algo', 'cost_mean', 'cost_std', 'nodes_mean', 'nodes_std', 'time_mean', 'time_std']
-
-# Save summary table as CSV (optional)
-summary.to_csv('outputs/summary_stats.csv', index=False)
-
-# Create bar plots per map
-for m in df['map'].unique():
-    d = df[df['map'] == m]
-    
-    # Plot path cost
-    plt.figure()
-    plt.bar(d['algo'], d['numeric_cost'])
-    plt.title(f'Path Cost Comparison: {m}')
-    plt.ylabel('Cost')
-    plt.xlabel('Algorithm')
-    plt.tight_layout()
-    plt.savefig(f'outputs/plot_cost_{m}.png')
-    plt.close()
-    
-    # Plot nodes expanded
-    plt.figure()
-    plt.bar(d['algo'], d['nodes'])
-    plt.title(f'Nodes Expanded: {m}')
-    plt.ylabel('Nodes')
-    plt.xlabel('Algorithm')
-    plt.tight_layout()
-    plt.savefig(f'outputs/plot_nodes_{m}.png')
-    plt.close()
-    
-    # Plot runtime
-    plt.figure()
-    plt.bar(d['algo'], d['time_s'])
-    plt.title(f'Execution Time: {m}')
-    plt.ylabel('Time (s)')
-    plt.xlabel('Algorithm')
-    plt.tight_layout()
-    plt.savefig(f'outputs/plot_time_{m}.png')
-    plt.close()
+from src.utils.results_store import ResultsStore, write_latex, write_summary_csv
+
+PLOTS = (("cost", "Path Cost Comparison", "Cost"), ("nodes", "Nodes Expanded", "Nodes"),
+         ("time_s", "Execution Time", "Time (s)"))
+
+
+def plot_summary(summary, outdir):
+    """Mean cost / nodes / time per algorithm, one PNG per map and metric, std as error bars."""
+    written = []
+    for m in sorted({row["map"] for row in summary}):
+        rows = [row for row in summary if row["map"] == m]
+        for metric, title, ylabel in PLOTS:
+            have = [row for row in rows if row.get(f"{metric}_mean") is not None]
+            if not have:
+                continue
+            fig, ax = plt.subplots()
+            ax.bar([row["algo"] for row in have], [row[f"{metric}_mean"] for row in have],
+                   yerr=[row[f"{metric}_std"] or 0 for row in have], capsize=3)
+            ax.set_title(f"{title}: {m}")
+            ax.set_ylabel(ylabel)
+            ax.set_xlabel("Algorithm")
+            fig.tight_layout()
+            path = Path(outdir) / f"plot_{metric.split('_')[0]}_{m}.png"
+            fig.savefig(path)
+            plt.close(fig)
+            written.append(path)
+    return written
+
+
+def report(db="outputs/results.db", outdir="outputs", plots=True):
+    """Write outdir/summary_stats.csv, outdir/tables.latex and the plots; returns the summary."""
+    store = ResultsStore(db)
+    summary = store.summary()
+    store.close()
+    Path(outdir).mkdir(parents=True, exist_ok=True)
+    write_summary_csv(summary, Path(outdir) / "summary_stats.csv")
+    write_latex(summary, Path(outdir) / "tables.latex")
+    if plots:
+        plot_summary(summary, outdir)
+    return summary
+
+
+def main():
+    p = argparse.ArgumentParser(description="summary table, LaTeX table and plots from outputs/results.db")
+    p.add_argument("--db", default="outputs/results.db")
+    p.add_argument("--out", default="outputs")
+    p.add_argument("--import_csv", default=None, help="first load the rows of an old results.csv into --db")
+    p.add_argument("--no_plots", action="store_true")
+    args = p.parse_args()
+    if args.import_csv:
+        store = ResultsStore(args.db)
+        store.import_csv(args.import_csv)
+        store.close()
+    summary = report(args.db, args.out, plots=not args.no_plots)
+    print(f"{len(summary)} map/algo groups -> {args.out}/summary_stats.csv, {args.out}/tables.latex")
+
 
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import argparse
+import itertools
+import multiprocessing
+import os
 import random
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 
@@ -8,9 +12,15 @@ from src.preprocessing.map_loader import load_map_from_file
 from src.models.bfs import bfs
 from src.models.ucs import ucs
 from src.models.astar import astar
+from src.models.jps import jps, jps_plus
+from src.models.bidirectional import bi_astar, bi_ucs
+from src.models.fuel import refuel_astar
 from src.models.replanner import Replanner
-from src.utils.metrics import CSVLogger
-from src.utils.visualize import plot_grid
+from src.models.tour import plan_tour
+from src.models.landmarks import Landmarks
+from src.utils.metrics import CSVLogger, JSONLLogger, SearchStats
+from src.utils.results_store import ResultsStore
+from src.utils.visualize import FrameWriter, plot_grid
 from src.data.dynamic_obstacles import MovingObstacleManager
 
 def _add_obstacle_to_grid(grid, pos):
@@ -19,8 +29,6 @@ def _add_obstacle_to_grid(grid, pos):
         grid.add_obstacle(r, c)
     elif hasattr(grid, "set_obstacle"):
         grid.set_obstacle(r, c)
-    elif hasattr(grid, "obstacles"):
-        grid.obstacles.add((r, c))
     else:
         raise AttributeError("Grid has no method to add obstacle")
 
@@ -30,12 +38,12 @@ def _remove_obstacle_from_grid(grid, pos):
         grid.remove_obstacle(r, c)
     elif hasattr(grid, "clear_obstacle"):
         grid.clear_obstacle(r, c)
-    elif hasattr(grid, "obstacles"):
-        grid.obstacles.discard((r, c))
     else:
         return
 
-ALGS = {"bfs": bfs, "ucs": ucs, "astar": astar, "replanner": None}
+ALGS = {"bfs": bfs, "ucs": ucs, "astar": astar, "jps": jps, "jps_plus": jps_plus, "bi_ucs": bi_ucs, "bi_astar": bi_astar,
+        "fuel": refuel_astar,
+        "replanner": None, "dstar": None, "spacetime": None, "hpa": None, "wastar": None, "ara": None}
 
 def normalize_result(res, grid):
     """
@@ -96,24 +104,43 @@ def _add_obstacle_to_grid(grid, pos):
 def _remove_obstacle_from_grid(grid, pos):
     r, c = pos
     grid.remove_obstacle(r, c)
-def run_single(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=None):
-    random.seed(seed)
-    grid, start, goal = load_map_from_file(mapfile)
-    rows, cols = grid.rows, grid.cols
-    Path(outdir).mkdir(parents=True, exist_ok=True)
-
-    if algo in ("bfs", "ucs", "astar"):
+def _print_hpa_report(hpa):
+    if hpa is None:
+        return
+    r = hpa.report()
+    print(f"hpa: cluster_size {r['cluster_size']}, {r['clusters']} clusters, "
+          f"{r['abstract_nodes']} nodes / {r['abstract_edges']} edges, "
+          f"preprocessing {r['build_s']:.3f}s, memory {r['memory_bytes'] / 1e6:.2f} MB, "
+          f"{r['queries']} queries at {r['query_ms_mean']:.2f} ms mean / {r['query_ms_max']:.2f} ms max, "
+          f"{r['clusters_rebuilt']} clusters rebuilt")
+
+def solve(grid, start, goal, algo, fuel=None, time_limit=None, lm=None, cluster_size=16,
+          max_nodes=None, stats=None, weight=2.0):
+    """
+    Run one static query. Returns (path, cost, nodes, time_s, fail_reason,
+    repl); fail_reason is "" on success, repl the Replanner if one was used.
+    time_limit is in seconds, max_nodes caps the expansions; stats is an
+    optional SearchStats handed to the planner. weight is for wastar / ara
+    (repl.bound then holds the suboptimality bound reached).
+    """
+    repl = None
+    if algo in ("bfs", "ucs", "astar", "jps", "jps_plus", "bi_ucs", "bi_astar", "fuel"):
         fn = ALGS.get(algo)
+        kw = {"heuristic": lm} if algo == "astar" and lm else {}
         t0 = time.perf_counter()
-        res = fn(grid, start, goal, fuel_limit=fuel, time_limit=time_limit)
+        res = fn(grid, start, goal, fuel_limit=fuel, time_limit=time_limit, max_nodes=max_nodes, stats=stats, **kw)
         t1 = time.perf_counter()
         time_s = t1 - t0
         path, cost, nodes = normalize_result(res, grid)
 
-    elif algo == "replanner":
-        repl = Replanner(grid)
+    elif algo in ("replanner", "dstar", "spacetime", "hpa", "wastar", "ara"):
+        # no schedule in a static run, so spacetime sees no movers
+        repl = Replanner(grid, movers=MovingObstacleManager(), landmarks=lm, cluster_size=cluster_size,
+                         weight=weight)
+        plan_algo = algo if algo in ("dstar", "spacetime", "hpa", "wastar", "ara") else "astar"
         res, time_s = None, None
-        res, time_s = ((repl.plan_path(start, goal, fuel_limit=fuel, time_limit=time_limit)), 0.0)
+        res, time_s = ((repl.plan_path(start, goal, algo=plan_algo, fuel_limit=fuel, time_limit=time_limit,
+                                       max_nodes=max_nodes, stats=stats)), 0.0)
         if isinstance(res, tuple) and len(res) == 4:
             path, cost, nodes, runtime = res
             time_s = runtime
@@ -129,22 +156,35 @@ def run_single(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=No
     if cost == float("inf") and path:
         cost = sum(grid.get_cost(*p) for p in path)
 
-    failed = False
     fail_reason = ""
     if not path or cost == float("inf"):
-        failed = True
-        if time_limit is not None and nodes >= time_limit:
+        if (time_limit is not None and time_s >= time_limit) or (max_nodes is not None and nodes >= max_nodes):
             fail_reason = "FAIL_TIME"
         elif fuel is not None:
             fail_reason = "FAIL_FUEL"
         else:
             fail_reason = "FAIL"
+    return path, cost, nodes, time_s, fail_reason, repl
+
+def run_single(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=None, landmarks=0,
+               cluster_size=16, max_nodes=None, stats=False, weight=2.0):
+    random.seed(seed)
+    grid, start, goal = load_map_from_file(mapfile, compact=True)
+    rows, cols = grid.rows, grid.cols
+    Path(outdir).mkdir(parents=True, exist_ok=True)
+    # ALT tables are cached next to the map file
+    lm = Landmarks.for_map(mapfile, grid, k=landmarks) if landmarks else None
+
+    st = SearchStats() if stats else None
+    path, cost, nodes, time_s, fail_reason, repl = solve(grid, start, goal, algo, fuel=fuel, time_limit=time_limit,
+                                                         lm=lm, cluster_size=cluster_size, max_nodes=max_nodes,
+                                                         stats=st, weight=weight)
+    failed = bool(fail_reason)
 
     vizfile = f"{outdir}/{Path(mapfile).stem}_{algo}.png"
     safe_plot(grid, path, start, goal, title=f"{algo} {Path(mapfile).stem}", save=vizfile)
 
-    logger = CSVLogger(f"{outdir}/results.csv")
-    logger.log({
+    row = {
         "map": Path(mapfile).name,
         "algo": algo,
         "rows": rows,
@@ -156,21 +196,46 @@ def run_single(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=No
         "nodes": nodes,
         "time_s": time_s,
         "seed": seed,
-        "notes": ""
-    })
-    logger.close()
-
-    print("done", mapfile, algo, "time", time_s, "nodes", nodes, "cost", cost, ("FAILED" if failed else ""))
+        "notes": _bound_note(algo, repl)
+    }
+    _log_row(outdir, row, st)
+
+    print("done", mapfile, algo, "time", time_s, "nodes", nodes, "cost", cost, ("FAILED" if failed else ""),
+          _bound_note(algo, repl))
+    if algo == "hpa":
+        _print_hpa_report(repl.hpa)
 from src.data.dynamic_obstacles import DynamicObstacles
 
 
-def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=None, schedule_file=None, max_steps=1000):
+def _bound_note(algo, repl):
+    # wastar / ara: cost <= bound x optimal
+    if algo in ("wastar", "ara") and repl is not None and repl.bound is not None:
+        return f"bound={repl.bound:.3f}"
+    return ""
+
+
+def _log_row(outdir, row, stats=None):
+    """results.csv and results.db row; with stats also a full record in stats.jsonl."""
+    for logger in (CSVLogger(f"{outdir}/results.csv"), ResultsStore(f"{outdir}/results.db")):
+        logger.log(row, stats=stats)
+        logger.close()
+    if stats is not None:
+        jl = JSONLLogger(f"{outdir}/stats.jsonl")
+        jl.log(row, stats=stats)
+        jl.close()
+
+
+def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=None, schedule_file=None, max_steps=1000,
+                horizon=None, landmarks=0, cluster_size=16, frames=0, max_nodes=None, stats=False, weight=2.0):
     """
     Simulate moving obstacles and let Replanner react.
     schedule_file (optional): json file with list of obstacle dicts (trajectory,start,loop,id)
+    horizon (optional): look-ahead in steps for algo="spacetime"
+    frames (optional): write a PNG every `frames` steps to outdir/frames/
+    stats (optional): collect SearchStats over the whole episode
     """
     random.seed(seed)
-    grid, start, goal = load_map_from_file(mapfile)
+    grid, start, goal = load_map_from_file(mapfile, compact=True)
     rows, cols = grid.rows, grid.cols
     Path(outdir).mkdir(parents=True, exist_ok=True)
 
@@ -184,10 +249,21 @@ def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=N
         ]
 
     mover = MovingObstacleManager.load_from_list(schedule_list)
-    repl = Replanner(grid)
-
-
-    path, cost, nodes, runtime = repl.plan_path(start, goal, algo="astar", fuel_limit=fuel, time_limit=time_limit)
+    # landmarks only help until movers change the map; astar then falls back to manhattan
+    lm = Landmarks.for_map(mapfile, grid, k=landmarks) if landmarks else None
+    repl = Replanner(grid, movers=mover, horizon=horizon, landmarks=lm, cluster_size=cluster_size, weight=weight)
+    # dstar keeps its search between steps and is fed the occupancy deltas;
+    # spacetime plans around the schedule itself, so movers never hit the grid;
+    # jps_plus rebuilds its jump tables whenever a mover changes the grid;
+    # hpa only rebuilds the clusters a mover enters or leaves;
+    # ara replans within time_limit seconds each time
+    plan_algo = algo if algo in ("dstar", "spacetime", "jps", "jps_plus", "hpa", "wastar", "ara") else "astar"
+    timed = plan_algo == "spacetime"
+    st = SearchStats() if stats else None
+    limits = {"fuel_limit": fuel, "time_limit": time_limit, "max_nodes": max_nodes, "stats": st}
+
+
+    path, cost, nodes, runtime = repl.plan_path(start, goal, algo=plan_algo, **limits)
     total_nodes = nodes if nodes else 0
     total_time = runtime if runtime else 0.0
 
@@ -195,24 +271,34 @@ def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=N
     viz_original = f"{outdir}/{Path(mapfile).stem}_{algo}_original.png"
     safe_plot(grid, path, start, goal, title=f"original {algo} {Path(mapfile).stem}", save=viz_original)
 
-    prev_occ = set()
     agent_pos = start
     executed_path = [agent_pos]
     timestep = 0
+    planned_at = 0
+
+    writer = None
+    if frames:
+        Path(f"{outdir}/frames").mkdir(parents=True, exist_ok=True)
+        writer = FrameWriter(grid, start, goal, f"{outdir}/frames/{Path(mapfile).stem}_{algo}",
+                             title=f"{algo} {Path(mapfile).stem}")
 
 
     while agent_pos != goal and timestep < max_steps:
 
+        # precomputed by the obstacle timeline, no per-step set diffing
         new_occ = mover.occupied_at(timestep)
+        added, removed = mover.changes(timestep)
 
-        for p in (prev_occ - new_occ):
-            _remove_obstacle_from_grid(grid, p)
+        if not timed:
+            for p in removed:
+                _remove_obstacle_from_grid(grid, p)
 
 
-        for p in (new_occ - prev_occ):
-            _add_obstacle_to_grid(grid, p)
+            for p in added:
+                _add_obstacle_to_grid(grid, p)
 
-        prev_occ = new_occ
+        if writer and timestep % frames == 0:
+            writer.frame(grid, path, agent_pos, t=timestep)
 
 
         if agent_pos in new_occ:
@@ -222,9 +308,32 @@ def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=N
             total_time += 0
             break
 
+        if timed:
+            # the plan dodges the scheduled movers up to its horizon; replan
+            # when it runs out, when t reaches the horizon (past it the plan
+            # only saw the static grid), or when the next step would land on
+            # a mover or swap cells with one
+            stale = len(path) < 2 or (horizon is not None and timestep >= planned_at + horizon)
+            if stale or path[1] in mover.occupied_at(timestep + 1) or mover.moved(timestep, path[1], agent_pos):
+                if st is not None:
+                    st.replan("horizon" if stale else "blocked")
+                path, _, new_nodes, new_runtime = repl.plan_path(agent_pos, goal, algo=plan_algo,
+                                                                 timestep=timestep, **limits)
+                planned_at = timestep
+                total_nodes += (new_nodes or 0)
+                total_time += (new_runtime or 0.0)
+            if not path or len(path) < 2:
+                print("No available next step (path too short or missing). Stopping.")
+                cost = float("inf")
+                nodes = total_nodes
+                break
+            agent_pos = path[1]
+            executed_path.append(agent_pos)
+            path = path[1:]
+            timestep += 1
+            continue
 
-
-        path_res = repl.replan_if_needed(path, agent_pos, goal, algo="astar", fuel_limit=fuel, time_limit=time_limit)
+        path_res = repl.replan_if_needed(path, agent_pos, goal, algo=plan_algo, changed=added | removed, **limits)
 
         if isinstance(path_res, tuple) and len(path_res) >= 3:
             new_path = path_res[0]
@@ -250,7 +359,7 @@ def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=N
 
         if next_pos in new_occ:
 
-            path_res2 = repl.replan_if_needed(path, agent_pos, goal, algo="astar", fuel_limit=fuel, time_limit=time_limit)
+            path_res2 = repl.replan_if_needed(path, agent_pos, goal, algo=plan_algo, changed=set(), **limits)
             path, cost_tmp, nodes_tmp = normalize_result(path_res2, grid)
             total_nodes += (nodes_tmp or 0)
             if not path or len(path) < 2:
@@ -274,13 +383,16 @@ def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=N
         timestep += 1
 
     
+    if writer:
+        writer.frame(grid, path, agent_pos, t=timestep)
+        writer.close()
+
     if agent_pos == goal:
         final_cost = sum(grid.get_cost(*p) for p in executed_path)
     else:
         final_cost = float("inf")
 
-    logger = CSVLogger(f"{outdir}/results.csv")
-    logger.log({
+    row = {
         "map": Path(mapfile).name,
         "algo": algo,
         "rows": rows,
@@ -293,8 +405,8 @@ def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=N
         "time_s": total_time,
         "seed": seed,
         "notes": "dynamic"
-    })
-    logger.close()
+    }
+    _log_row(outdir, row, st)
 
     
     vizfile = f"{outdir}/{Path(mapfile).stem}_{algo}_dynamic.png"
@@ -302,27 +414,214 @@ def run_dynamic(mapfile, algo, outdir="outputs", seed=0, fuel=None, time_limit=N
               title=f"{algo} dynamic {Path(mapfile).stem}", save=vizfile)
 
     print("done dynamic:", mapfile, algo, "steps:", len(executed_path), "nodes:", total_nodes, "cost:", final_cost)
+    print("path cache:", repl.cache_info())
+    print("replan checks:", repl.replan_info())
+    if algo == "hpa":
+        _print_hpa_report(repl.hpa)
     return
 
 
+def run_tour(mapfile, packages_file, outdir="outputs", seed=0, return_to_depot=False, workers=1):
+    """
+    Multi-stop delivery from the map's S cell.
+    packages_file: json list; each item is a drop cell [r,c] or a
+    [[pickup_r,pickup_c],[drop_r,drop_c]] pair.
+    """
+    random.seed(seed)
+    grid, start, goal = load_map_from_file(mapfile, compact=True)
+    Path(outdir).mkdir(parents=True, exist_ok=True)
+    with open(packages_file, "r") as f:
+        packages = json.load(f)
+
+    t0 = time.perf_counter()
+    path, cost, order = plan_tour(grid, start, packages, return_to_depot=return_to_depot, workers=workers)
+    time_s = time.perf_counter() - t0
+
+    _log_row(outdir, {
+        "map": Path(mapfile).name,
+        "algo": "tour",
+        "rows": grid.rows,
+        "cols": grid.cols,
+        "start": start,
+        "goal": order[-1] if order else None,
+        "cost": cost if path else "FAIL",
+        "length": len(path),
+        "nodes": len(order),
+        "time_s": time_s,
+        "seed": seed,
+        "notes": f"{len(packages)} packages"
+    })
+
+    safe_plot(grid, path, start, order[-1] if order else None,
+              title=f"tour {Path(mapfile).stem}", save=f"{outdir}/{Path(mapfile).stem}_tour.png")
+    print("done tour:", mapfile, "stops:", len(order), "time", time_s, "cost", cost)
+
+
+# ---------------- batch sweeps ----------------
+# per-worker state, set once by the pool initializer
+_batch_queue = None
+_batch_opts = {}
+_batch_maps = {}
+
+def _batch_init(queue, landmarks, cluster_size, max_nodes=None, weight=2.0):
+    global _batch_queue
+    _batch_queue = queue
+    _batch_opts.update(landmarks=landmarks, cluster_size=cluster_size, max_nodes=max_nodes, weight=weight)
+    _batch_maps.clear()
+
+def _batch_map(mapfile):
+    """Each worker loads and parses a map once, then reuses it."""
+    if mapfile not in _batch_maps:
+        grid, start, goal = load_map_from_file(mapfile, compact=True)
+        k = _batch_opts["landmarks"]
+        lm = Landmarks.for_map(mapfile, grid, k=k) if k else None
+        _batch_maps[mapfile] = (grid, start, goal, lm)
+    return _batch_maps[mapfile]
+
+def _batch_run(cases):
+    rows = []
+    for mapfile, algo, seed, fuel, time_limit in cases:
+        random.seed(seed)
+        grid, start, goal, lm = _batch_map(mapfile)
+        path, cost, nodes, time_s, fail_reason, repl = solve(grid, start, goal, algo, fuel=fuel,
+                                                             time_limit=time_limit, lm=lm,
+                                                             cluster_size=_batch_opts["cluster_size"],
+                                                             max_nodes=_batch_opts["max_nodes"],
+                                                             weight=_batch_opts["weight"])
+        rows.append({
+            "map": Path(mapfile).name,
+            "algo": algo,
+            "rows": grid.rows,
+            "cols": grid.cols,
+            "start": start,
+            "goal": goal,
+            "cost": fail_reason or cost,
+            "length": len(path),
+            "nodes": nodes,
+            "time_s": time_s,
+            "seed": seed,
+            "notes": f"batch fuel={fuel} time_limit={time_limit} {_bound_note(algo, repl)}".strip()
+        })
+    # one message per chunk, not per case
+    _batch_queue.put(rows)
+    return len(rows)
+
+def _batch_writer(queue, outdir, flush_every=500):
+    """
+    The only process that touches results.csv / results.db; writes rows
+    in bulk, one store transaction per flush.
+    """
+    loggers = (CSVLogger(f"{outdir}/results.csv"), ResultsStore(f"{outdir}/results.db"))
+    pending = []
+    while True:
+        rows = queue.get()
+        if rows is None:
+            break
+        pending += rows
+        if len(pending) >= flush_every:
+            for logger in loggers:
+                logger.log_many(pending)
+            pending = []
+    for logger in loggers:
+        if pending:
+            logger.log_many(pending)
+        logger.close()
+
+def run_batch(maps, algos, seeds=(0,), fuels=(None,), time_limits=(None,), outdir="outputs",
+              workers=None, landmarks=0, cluster_size=16, max_nodes=None, weight=2.0):
+    """
+    Static runs for every map x algo x seed x fuel x time_limit, spread
+    over a process pool (workers defaults to every core). Cases are
+    handed out in chunks, maps stay loaded in each worker, no PNGs are
+    rendered, and a single writer process appends the rows to
+    outdir/results.csv and outdir/results.db.
+    """
+    Path(outdir).mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # map outermost, so a chunk mostly needs maps its worker already has
+    cases = list(itertools.product(maps, algos, seeds, fuels, time_limits))
+    if landmarks:
+        # build missing tables here, not in several workers at once
+        for m in maps:
+            Landmarks.for_map(m, load_map_from_file(m, compact=True)[0], k=landmarks)
+    chunk = max(1, len(cases) // (workers * 4))
+    chunks = [cases[i:i + chunk] for i in range(0, len(cases), chunk)]
+
+    queue = multiprocessing.Queue()
+    writer = multiprocessing.Process(target=_batch_writer, args=(queue, outdir))
+    writer.start()
+    t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init,
+                                 initargs=(queue, landmarks, cluster_size, max_nodes, weight)) as pool:
+            done = sum(pool.map(_batch_run, chunks))
+    finally:
+        queue.put(None)
+        writer.join()
+    elapsed = time.perf_counter() - t0
+    print(f"done batch: {done} cases on {workers} workers in {elapsed:.2f}s "
+          f"({done / max(elapsed, 1e-9):.1f} cases/s)")
+    return done
+
+
+def _limit(value):
+    # fuel / max_nodes values for the sweep; "none" means no limit
+    return None if value.lower() == "none" else int(value)
+
+def _seconds(value):
+    # time_limit values, in seconds
+    return None if value.lower() == "none" else float(value)
 
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--map", required=True)
-    p.add_argument("--algo", required=True, choices=["bfs", "ucs", "astar", "replanner"])
+    # several values per flag are only allowed with --batch
+    p.add_argument("--map", required=True, nargs="+")
+    p.add_argument("--algo", required=True, nargs="+", choices=list(ALGS))
     p.add_argument("--out", default="outputs")
-    p.add_argument("--seed", type=int, default=0)
-    p.add_argument("--fuel", type=int, default=None)
-    p.add_argument("--time_limit", type=int, default=None)
+    p.add_argument("--seed", type=int, nargs="+", default=[0])
+    p.add_argument("--fuel", type=_limit, nargs="+", default=[None])
+    p.add_argument("--time_limit", type=_seconds, nargs="+", default=[None], help="seconds per search")
+    p.add_argument("--max_nodes", type=_limit, default=None, help="cap on node expansions per search")
+    p.add_argument("--stats", action="store_true",
+                   help="collect search stats into the notes column and <out>/stats.jsonl (not with --batch)")
+    p.add_argument("--batch", action="store_true",
+                   help="run every map x algo x seed x fuel x time_limit combination on a process pool")
     p.add_argument("--dynamic", action="store_true", help="simulate moving obstacles")
     p.add_argument("--schedule", type=str, default=None, help="JSON schedule file for moving obstacles")
+    p.add_argument("--horizon", type=int, default=None, help="look-ahead steps for --algo spacetime")
+    p.add_argument("--frames", type=int, default=0, help="with --dynamic, save a PNG every N steps to <out>/frames/")
+    p.add_argument("--packages", type=str, default=None, help="JSON package list for a multi-stop tour")
+    p.add_argument("--return_to_depot", action="store_true", help="tour ends back at the start cell")
+    p.add_argument("--workers", type=int, default=None,
+                   help="worker processes (default: 1, or every core with --batch)")
+    p.add_argument("--landmarks", type=int, default=0, help="use an ALT heuristic with this many landmarks for astar")
+    p.add_argument("--cluster_size", type=int, default=16, help="cluster side length for --algo hpa")
+    p.add_argument("--weight", type=float, default=2.0,
+                   help="heuristic weight for --algo wastar, starting weight for --algo ara")
     args = p.parse_args()
 
-    if args.dynamic:
+    if args.batch:
+        run_batch(args.map, args.algo, seeds=args.seed, fuels=args.fuel, time_limits=args.time_limit,
+                  outdir=args.out, workers=args.workers, landmarks=args.landmarks,
+                  cluster_size=args.cluster_size, max_nodes=args.max_nodes, weight=args.weight)
+        return
+    if any(len(v) > 1 for v in (args.map, args.algo, args.seed, args.fuel, args.time_limit)):
+        p.error("several --map/--algo/--seed/--fuel/--time_limit values need --batch")
+    args.map, args.algo, args.seed = args.map[0], args.algo[0], args.seed[0]
+    args.fuel, args.time_limit = args.fuel[0], args.time_limit[0]
+
+    if args.packages:
+        run_tour(args.map, args.packages, outdir=args.out, seed=args.seed,
+                 return_to_depot=args.return_to_depot, workers=args.workers or 1)
+    elif args.dynamic:
         run_dynamic(args.map, args.algo, outdir=args.out, seed=args.seed,
-                    fuel=args.fuel, time_limit=args.time_limit, schedule_file=args.schedule)
+                    fuel=args.fuel, time_limit=args.time_limit, schedule_file=args.schedule,
+                    horizon=args.horizon, landmarks=args.landmarks, cluster_size=args.cluster_size,
+                    frames=args.frames, max_nodes=args.max_nodes, stats=args.stats, weight=args.weight)
     else:
-        run_single(args.map, args.algo, outdir=args.out, seed=args.seed, fuel=args.fuel, time_limit=args.time_limit)
+        run_single(args.map, args.algo, outdir=args.out, seed=args.seed, fuel=args.fuel, time_limit=args.time_limit,
+                   landmarks=args.landmarks, cluster_size=args.cluster_size, max_nodes=args.max_nodes,
+                   stats=args.stats, weight=args.weight)
 
 
 
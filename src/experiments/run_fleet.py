@@ -0,0 +1,55 @@
+# src/experiments/run_fleet.py
+# fleet throughput: hundreds of agents on generated maps, prioritized vs CBS
+import argparse
+import random
+
+import numpy as np
+
+from src.data.dynamic_obstacles import MovingObstacleManager
+from src.models.fleet import plan_fleet
+from src.preprocessing.map_generator import KINDS, generate, generate_schedule
+
+
+def fleet_tasks(grid, n, seed=0):
+    """n (start, goal) pairs on free cells, all 2n cells distinct."""
+    rnd = random.Random(seed)
+    free = [tuple(c) for c in np.argwhere(grid.obstacle_view() == 0).tolist()]
+    cells = rnd.sample(free, 2 * n)
+    return list(zip(cells[:n], cells[n:]))
+
+
+def main():
+    p = argparse.ArgumentParser(description="multi-agent fleet planning on generated maps")
+    p.add_argument("--kind", choices=KINDS, nargs="*", default=["random", "urban"])
+    p.add_argument("--size", type=int, default=100)
+    p.add_argument("--agents", type=int, nargs="*", default=[100, 200])
+    p.add_argument("--mode", choices=["prioritized", "cbs"], nargs="*", default=["prioritized", "cbs"])
+    p.add_argument("--movers", type=int, default=0, help="non-agent movers from generate_schedule")
+    p.add_argument("--group_limit", type=int, default=4, help="largest group CBS solves jointly")
+    p.add_argument("--no_park", action="store_true", help="agents vanish at their goal instead of staying")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    print(f"{'map':>14} {'agents':>6} {'mode':>11} | {'planned':>7} {'agents/s':>9} "
+          f"{'makespan':>8} {'SOC':>8} {'nodes':>9} {'cbs':>9}")
+    for kind in args.kind:
+        grid, _, _ = generate(kind, args.size, seed=args.seed)
+        for n in args.agents:
+            tasks = fleet_tasks(grid, n, args.seed)
+            movers = None
+            if args.movers:
+                # movers keep off starts and goals, parked agents are not checked against them
+                avoid = [c for pair in tasks for c in pair]
+                movers = MovingObstacleManager.load_from_list(
+                    generate_schedule(grid, args.movers, seed=args.seed, avoid=avoid))
+            for mode in args.mode:
+                _, rep = plan_fleet(grid, tasks, movers=movers, mode=mode, park=not args.no_park,
+                                    group_limit=args.group_limit)
+                cbs = f"{rep['cbs_groups']}/{rep['cbs_nodes']}" if mode == "cbs" else "-"
+                print(f"{kind + ' ' + str(args.size):>14} {n:>6} {mode:>11} | "
+                      f"{rep['planned']:>7} {rep['agents_per_s']:>9.1f} {rep['makespan']:>8} "
+                      f"{rep['sum_of_costs']:>8} {rep['nodes']:>9} {cbs:>9}")
+
+
+if __name__ == "__main__":
+    main()
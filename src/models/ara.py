@@ -0,0 +1,182 @@
+# src/models/ara.py
+# weighted A* and ARA* (Likhachev, Gordon & Thrun): a fast first path with
+# f = g + w*h, then smaller w on the same search until a deadline.
+import heapq
+import math
+import time
+
+from .search_core import CHECK_EVERY, as_array_grid, budget, unwind, workspace_for
+
+# weights are used in tenths so heap keys stay packed ints
+SCALE = 10
+
+
+def _reserve(ws, n):
+    """
+    Take n + 1 consecutive state stamps from the workspace: base marks a
+    cell whose g is set, base + k a cell expanded in iteration k.
+    """
+    ws.next_generation()
+    if ws.gen + n // 2 + 1 > ws.MAX_GEN:
+        ws.gen = ws.MAX_GEN
+        ws.next_generation()
+    base = 2 * ws.gen
+    # later queries start above every stamp used here
+    ws.gen += n // 2 + 1
+    return base
+
+
+def ara_star(grid, start, goal, time_limit=None, weight=2.0, step=0.5, final_weight=1.0,
+             fuel_limit=None, heuristic=None, max_nodes=None, stats=None):
+    """
+    Anytime A*: search with f = g + weight*h, then lower the weight by
+    `step` and improve the path, reusing g values and expansions from
+    the previous rounds (only cells whose g dropped are expanded again),
+    until final_weight is reached or time_limit seconds / max_nodes
+    expansions run out.
+
+    Returns (path, cost, nodes_expanded, bound): the best path found so
+    far and a bound such that cost <= bound * optimal cost (1.0 once it
+    is proven optimal, inf if no path was found in time).
+    """
+    grid = as_array_grid(grid)
+    if not (grid.in_bounds(*start) and grid.in_bounds(*goal)):
+        return [], float("inf"), 0, float("inf")
+    mask, cost = grid.buffers()
+    s, t = grid.index(*start), grid.index(*goal)
+    if mask[s] or mask[t]:
+        return [], float("inf"), 0, float("inf")
+
+    weights = []
+    w = max(round(weight * SCALE), SCALE)
+    last = max(round(final_weight * SCALE), SCALE)
+    dw = max(round(step * SCALE), 1)
+    while w > last:
+        weights.append(w)
+        w -= dw
+    weights.append(last)
+
+    ws = workspace_for(grid)
+    base = _reserve(ws, len(weights))
+    g, parent, state = ws.g, ws.parent, ws.state
+    stride = grid.stride
+    fuel = fuel_limit if fuel_limit is not None else 1 << 62
+
+    est = heuristic.estimator(grid, goal) if heuristic is not None else None
+    if est is not None:
+        hfun, hmax = est
+    else:
+        # manhattan scaled by the cheapest cell stays admissible
+        hscale = int(grid.cost_view().min())
+        tr, tc = divmod(t, stride)
+        hmax = hscale * (grid.rows + grid.cols)
+
+        def hfun(j):
+            return hscale * (abs(j // stride - tr) + abs(j % stride - tc))
+    hbits = max(hmax, 1).bit_length()
+    shift = grid.size.bit_length()
+    kshift = hbits + shift
+    low = (1 << shift) - 1
+
+    check, max_nodes, deadline = budget(time_limit, max_nodes, float("inf"))
+    track = stats is not None
+    trace = stats.trace if track else None
+    phase = stats.start_phase("search") if track else None
+    nodes = pushes = stale = peak = 0
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    g[s] = 0
+    parent[s] = s
+    state[s] = base
+    todo = [s]        # OPEN and INCONS cells for the next round
+    bound = float("inf")
+    out_of_time = False
+
+    for k, W in enumerate(weights, 1):
+        cur = base + k
+        heap = []
+        for i in set(todo):
+            h = hfun(i)
+            heap.append(((((SCALE * g[i] + W * h) << hbits) | h) << shift) | i)
+        heapq.heapify(heap)
+        pushes += len(heap)
+        incons = []
+        goal_f = SCALE * g[t] if state[t] >= base else math.inf
+
+        while heap:
+            if track and len(heap) > peak:
+                peak = len(heap)
+            key = heap[0]
+            i = key & low
+            if state[i] == cur:
+                heappop(heap)
+                stale += 1
+                continue
+            if key >> kshift >= goal_f:
+                break
+            heappop(heap)
+            state[i] = cur
+            nodes += 1
+            if nodes > check:
+                if nodes > max_nodes or time.perf_counter() > deadline:
+                    out_of_time = True
+                    break
+                check = min(check + CHECK_EVERY, max_nodes)
+            gi = g[i]
+            if trace:
+                trace(grid.coord(i), gi)
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j]:
+                    continue
+                nc = gi + cost[j]
+                if nc > fuel:
+                    continue
+                if state[j] < base or nc < g[j]:
+                    g[j] = nc
+                    parent[j] = i
+                    if j == t:
+                        goal_f = SCALE * nc
+                    if state[j] == cur:
+                        # already expanded this round: waits for the next one
+                        incons.append(j)
+                        continue
+                    state[j] = base
+                    hj = hfun(j)
+                    heappush(heap, ((((SCALE * nc + W * hj) << hbits) | hj) << shift) | j)
+                    pushes += 1
+
+        todo = [key & low for key in heap if state[key & low] != cur] + incons
+        if state[t] >= base:
+            # min g + h over OPEN and INCONS is a lower bound on the optimum
+            lb = min((g[i] + hfun(i) for i in todo), default=None)
+            reached = W / SCALE if not out_of_time else bound
+            if lb is None or lb >= g[t]:
+                reached = 1.0
+            elif lb > 0:
+                reached = min(reached, g[t] / lb)
+            bound = reached
+        if out_of_time or state[t] < base:
+            break
+
+    if track:
+        stats.add_search(nodes, pushes, stale, peak)
+        stats.end_phase(phase)
+    if state[t] < base:
+        return [], float("inf"), nodes, float("inf")
+    path = unwind(grid, parent, s, t)
+    # g[t] can be stale-high: cells on the way may have improved after
+    # the parent links were set, so the path itself is what counts
+    total = sum(cost[grid.index(r, c)] for r, c in path[1:])
+    return path, total, nodes, bound
+
+
+def weighted_astar(grid, start, goal, weight=2.0, fuel_limit=None, time_limit=None, heuristic=None,
+                   max_nodes=None, stats=None):
+    """
+    One round of ara_star at a fixed weight: f = g + weight*h, cost at
+    most weight x optimal. Returns (path, cost, nodes_expanded) like astar.
+    """
+    path, cost, nodes, _ = ara_star(grid, start, goal, time_limit=time_limit, weight=weight,
+                                    final_weight=weight, fuel_limit=fuel_limit, heuristic=heuristic,
+                                    max_nodes=max_nodes, stats=stats)
+    return path, cost, nodes
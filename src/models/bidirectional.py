@@ -0,0 +1,167 @@
+# src/models/bidirectional.py
+# bidirectional Dijkstra / A*: one frontier from the start, one from the
+# goal, stopping once no path through the two frontiers can beat the best
+# meeting found so far.
+import heapq
+import time
+
+from .search_core import CHECK_EVERY, as_array_grid, budget, unwind, workspace_for
+
+
+def _bidirectional(grid, start, goal, guided, fuel_limit, time_limit, max_nodes, stats):
+    """
+    Costs are paid on entering a cell, so the backward search relaxes
+    the edge j -> i it walks against with the cost of i, the cell it is
+    expanding, not the cost of the neighbour j: gb[j] = gb[i] + cost[i]
+    is the cost from j to the goal.
+
+    guided=True uses the average potential p = (h_goal - h_start) / 2
+    (Ikeda et al.) on both sides, so reduced costs are the same in both
+    directions and the plain Dijkstra stopping rule stays exact. Keys
+    are doubled to keep p an int: 2g + (h_goal - h_start) forward,
+    2g - (h_goal - h_start) backward, stop once their tops add up to
+    2 * mu.
+    """
+    grid = as_array_grid(grid)
+    if not (grid.in_bounds(*start) and grid.in_bounds(*goal)):
+        return [], float("inf"), 0
+    mask, cost = grid.buffers()
+    s, t = grid.index(*start), grid.index(*goal)
+    if mask[t] and s != t:
+        # like search(): the start may sit on an obstacle, the goal may not
+        return [], float("inf"), 0
+
+    wf = workspace_for(grid)
+    wb = workspace_for(grid, "_search_ws_back")
+    of, cf = wf.next_generation()
+    ob, cb = wb.next_generation()
+    gf, pf, sf = wf.g, wf.parent, wf.state
+    gb, pb, sb = wb.g, wb.parent, wb.state
+    stride = grid.stride
+    fuel = fuel_limit if fuel_limit is not None else 1 << 62
+
+    if guided:
+        # manhattan scaled by the cheapest cell, both ways
+        hs = int(grid.cost_view().min())
+        sr, sc = divmod(s, stride)
+        tr, tc = divmod(t, stride)
+
+        def pot(j):
+            r, c = divmod(j, stride)
+            return hs * (abs(r - tr) + abs(c - tc) - abs(r - sr) - abs(c - sc))
+    else:
+        def pot(j):
+            return 0
+
+    shift = grid.size.bit_length()
+    low = (1 << shift) - 1
+    gf[s] = 0
+    pf[s] = s
+    sf[s] = of
+    gb[t] = 0
+    pb[t] = t
+    sb[t] = ob
+    hf = [(pot(s) << shift) | s]
+    hb = [(-pot(t) << shift) | t]
+    mu, meet = (0, s) if s == t else (float("inf"), -1)
+
+    check, max_nodes, deadline = budget(time_limit, max_nodes, grid.size + 1)
+    track = stats is not None
+    trace = stats.trace if track else None
+    phase = stats.start_phase("search") if track else None
+    nodes = stale = peak = 0
+    aborted = False
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while hf and hb:
+        if track and len(hf) + len(hb) > peak:
+            peak = len(hf) + len(hb)
+        # grow the smaller frontier; the other side's top may be a stale
+        # entry, but that only makes the stopping test later, never wrong
+        if len(hf) <= len(hb):
+            key = heappop(hf)
+            i = key & low
+            if sf[i] == cf:
+                stale += 1
+                continue
+            if (key >> shift) + (hb[0] >> shift) >= 2 * mu:
+                heappush(hf, key)
+                break
+            nodes += 1
+            if nodes > check:
+                if nodes > max_nodes or time.perf_counter() > deadline:
+                    aborted = True
+                    break
+                check = min(check + CHECK_EVERY, max_nodes)
+            sf[i] = cf
+            gi = gf[i]
+            if trace:
+                trace(grid.coord(i), gi)
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j]:
+                    continue
+                nc = gi + cost[j]
+                if nc > fuel:
+                    continue
+                if sf[j] < of or nc < gf[j]:
+                    sf[j] = of
+                    gf[j] = nc
+                    pf[j] = i
+                    heappush(hf, ((2 * nc + pot(j)) << shift) | j)
+                    if sb[j] >= ob and nc + gb[j] < mu:
+                        mu, meet = nc + gb[j], j
+        else:
+            key = heappop(hb)
+            i = key & low
+            if sb[i] == cb:
+                stale += 1
+                continue
+            if (key >> shift) + (hf[0] >> shift) >= 2 * mu:
+                heappush(hb, key)
+                break
+            nodes += 1
+            if nodes > check:
+                if nodes > max_nodes or time.perf_counter() > deadline:
+                    aborted = True
+                    break
+                check = min(check + CHECK_EVERY, max_nodes)
+            sb[i] = cb
+            if trace:
+                trace(grid.coord(i), gb[i])
+            # stepping from j into i costs cost[i]
+            nc = gb[i] + cost[i]
+            if nc > fuel:
+                continue
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j]:
+                    continue
+                if sb[j] < ob or nc < gb[j]:
+                    sb[j] = ob
+                    gb[j] = nc
+                    pb[j] = i
+                    heappush(hb, ((2 * nc - pot(j)) << shift) | j)
+                    if sf[j] >= of and gf[j] + nc < mu:
+                        mu, meet = gf[j] + nc, j
+
+    if track:
+        stats.add_search(nodes, nodes + stale + len(hf) + len(hb), stale, peak)
+        stats.end_phase(phase)
+    if aborted or meet < 0 or mu > fuel:
+        return [], float("inf"), nodes
+    path = unwind(grid, pf, s, meet)
+    j = meet
+    while j != t:
+        j = pb[j]
+        path.append(grid.coord(j))
+    return path, mu, nodes
+
+
+def bi_ucs(grid, start, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+    """Bidirectional Dijkstra. Returns (path, cost, nodes_expanded) like ucs;
+    nodes_expanded counts both directions."""
+    return _bidirectional(grid, start, goal, False, fuel_limit, time_limit, max_nodes, stats)
+
+
+def bi_astar(grid, start, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+    """Bidirectional A* with manhattan on both sides, same triple as astar."""
+    return _bidirectional(grid, start, goal, True, fuel_limit, time_limit, max_nodes, stats)
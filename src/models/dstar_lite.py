@@ -0,0 +1,202 @@
+# src/models/dstar_lite.py
+# D* Lite (Koenig & Likhachev) over flat ArrayGrid indices.
+# Searches backwards from the goal so the agent's start can move
+# between calls, and repairs only the vertices an obstacle change touches.
+from array import array
+import heapq
+import time
+
+from .search_core import CHECK_EVERY, as_array_grid, budget
+
+INF = float("inf")
+
+
+class DStarLite:
+    def __init__(self, grid, start, goal):
+        """
+        grid : Grid or ArrayGrid. A plain Grid is copied once; changed
+               cells are re-read from it in update_cells().
+        """
+        self.source = grid
+        self.grid = as_array_grid(grid)
+        self.mask, self.cost = self.grid.buffers()
+        self.stride = self.grid.stride
+        n = self.grid.size
+        self.g = array("d", [INF]) * n
+        self.rhs = array("d", [INF]) * n
+        # manhattan scaled by the cheapest cell stays a lower bound
+        self.hscale = int(self.grid.cost_view().min()) if n else 1
+        self.goal_cell = goal
+        self.goal = self.grid.index(*goal)
+        self.start = self.grid.index(*start)
+        self.last = self.start
+        self.km = 0
+        self.open = []
+        self.key = {}           # vertex -> key it is queued under
+        self.nodes_expanded = 0
+        self.pushes = 0
+        self.stale = 0
+        self.peak = 0
+        self.rhs[self.goal] = 0
+        self._queue(self.goal)
+
+    # ---- helpers ----
+    def _h(self, a, b):
+        ar, ac = divmod(a, self.stride)
+        br, bc = divmod(b, self.stride)
+        return self.hscale * (abs(ar - br) + abs(ac - bc))
+
+    def _calc_key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        return (m + self._h(self.start, u) + self.km, m)
+
+    def _queue(self, u):
+        k = self._calc_key(u)
+        self.key[u] = k
+        self.pushes += 1
+        heapq.heappush(self.open, (k[0], k[1], u))
+
+    def _neighbors(self, u):
+        s = self.stride
+        return (u + s, u - s, u + 1, u - 1)
+
+    def _best_rhs(self, u):
+        if self.mask[u]:
+            return INF
+        g, mask, cost = self.g, self.mask, self.cost
+        best = INF
+        for v in self._neighbors(u):
+            if not mask[v]:
+                c = cost[v] + g[v]
+                if c < best:
+                    best = c
+        return best
+
+    def _update_vertex(self, u):
+        if u != self.goal:
+            self.rhs[u] = self._best_rhs(u)
+        if self.g[u] != self.rhs[u]:
+            self._queue(u)
+        else:
+            self.key.pop(u, None)
+
+    # ---- public API ----
+    def update_start(self, start):
+        self.start = self.grid.index(*start)
+
+    def update_cells(self, cells):
+        """
+        cells: (r, c) cells whose obstacle status changed since the last call.
+        The grid must already reflect the change.
+        """
+        cells = list(cells)
+        if not cells:
+            return
+        self.km += self._h(self.last, self.start)
+        self.last = self.start
+        copied = self.grid is not self.source
+        for (r, c) in cells:
+            if not self.grid.in_bounds(r, c):
+                continue
+            u = self.grid.index(r, c)
+            if copied:
+                self.grid.mask[u] = 1 if self.source.is_obstacle(r, c) else 0
+            self._update_vertex(u)
+            for v in self._neighbors(u):
+                if self.grid.in_bounds(*self.grid.coord(v)):
+                    self._update_vertex(v)
+
+    def compute_shortest_path(self, max_nodes=None, time_limit=None, stats=None):
+        """
+        Returns False if max_nodes expansions or time_limit seconds ran
+        out first. stats gets the stale pops, the peak queue size and
+        trace calls; plan() adds up the rest.
+        """
+        open_, key, g, rhs = self.open, self.key, self.g, self.rhs
+        check, max_nodes, deadline = budget(time_limit, max_nodes, INF)
+        trace = stats.trace if stats is not None else None
+        expanded = stale = 0
+        while open_:
+            if stats is not None and len(open_) > self.peak:
+                self.peak = len(open_)
+            k1, k2, u = open_[0]
+            if key.get(u) != (k1, k2):
+                heapq.heappop(open_)       # stale entry
+                stale += 1
+                continue
+            s = self.start
+            if (k1, k2) >= self._calc_key(s) and rhs[s] == g[s]:
+                break
+            if expanded >= check:
+                if expanded >= max_nodes or time.perf_counter() > deadline:
+                    self.nodes_expanded += expanded
+                    self.stale += stale
+                    return False
+                check = min(check + CHECK_EVERY, max_nodes)
+            heapq.heappop(open_)
+            expanded += 1
+            if trace:
+                trace(self.grid.coord(u), min(g[u], rhs[u]))
+            k_new = self._calc_key(u)
+            if (k1, k2) < k_new:
+                self._queue(u)
+                continue
+            del key[u]
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+            for v in self._neighbors(u):
+                # blocked cells that were never reached have nothing to fix
+                if v != self.goal and not (self.mask[v] and g[v] == INF):
+                    self._update_vertex(v)
+        self.nodes_expanded += expanded
+        self.stale += stale
+        return True
+
+    def extract_path(self):
+        """Greedy walk down g from start; [] if the goal is unreachable."""
+        u = self.start
+        if self.rhs[u] == INF:
+            return []
+        path = [self.grid.coord(u)]
+        g, mask, cost = self.g, self.mask, self.cost
+        for _ in range(self.grid.size):
+            if u == self.goal:
+                return path
+            best, nxt = INF, None
+            for v in self._neighbors(u):
+                if not mask[v]:
+                    c = cost[v] + g[v]
+                    if c < best:
+                        best, nxt = c, v
+            if nxt is None:
+                return []
+            u = nxt
+            path.append(self.grid.coord(u))
+        return []
+
+    def plan(self, time_limit=None, max_nodes=None, stats=None):
+        """
+        Repair the search and return (path, cost, nodes_expanded) like
+        astar; nodes_expanded only counts this call's work. time_limit is
+        in seconds, max_nodes caps the expansions.
+        """
+        before = self.nodes_expanded, self.pushes, self.stale
+        self.peak = 0
+        if stats is None:
+            finished = self.compute_shortest_path(max_nodes, time_limit)
+        else:
+            with stats.phase("search"):
+                finished = self.compute_shortest_path(max_nodes, time_limit, stats)
+            stats.add_search(self.nodes_expanded - before[0], self.pushes - before[1],
+                             self.stale - before[2], self.peak)
+        nodes = self.nodes_expanded - before[0]
+        if not finished:
+            return [], INF, nodes
+        path = self.extract_path()
+        if not path:
+            return [], INF, nodes
+        cost = self.rhs[self.start]
+        return path, int(cost), nodes
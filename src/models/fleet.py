@@ -0,0 +1,423 @@
+# src/models/fleet.py
+# multi-agent planning on one grid: prioritized space-time A* over a shared
+# reservation table, and Conflict-Based Search for small conflict groups
+import heapq
+import time
+from itertools import count
+
+from .search_core import as_array_grid
+
+INF = float("inf")
+
+
+class ReservationTable:
+    """
+    Space-time cells claimed by agents that are already planned, on flat
+    grid indices; timestep 0 is the moment the fleet is planned.
+
+    vertex : (t, i) -> agent at cell i at timestep t
+    edge   : (t, i, j) -> agent moving from i to j between t and t + 1
+    parked : i -> (t, agent) that stays on goal cell i from t on
+    last   : i -> last timestep a moving agent passes through cell i
+    """
+
+    def __init__(self):
+        self.vertex = {}
+        self.edge = {}
+        self.parked = {}
+        self.last = {}
+
+    def reserve(self, agent, cells, park=True):
+        """cells[t] is the agent's cell at timestep t."""
+        vertex, edge, last = self.vertex, self.edge, self.last
+        prev = None
+        for t, i in enumerate(cells):
+            vertex[(t, i)] = agent
+            if last.get(i, -1) < t:
+                last[i] = t
+            if prev is not None and prev != i:
+                edge[(t - 1, prev, i)] = agent
+            prev = i
+        if park and cells:
+            self.parked[cells[-1]] = (len(cells) - 1, agent)
+
+    def blocked(self, t, i):
+        if (t, i) in self.vertex:
+            return True
+        p = self.parked.get(i)
+        return p is not None and p[0] <= t
+
+    def free(self, cells, park=True):
+        """True if cells (as for reserve) clash with nothing reserved."""
+        for t, i in enumerate(cells):
+            if self.blocked(t, i):
+                return False
+            if t and cells[t - 1] != i and (t - 1, i, cells[t - 1]) in self.edge:
+                return False
+        if park and cells:
+            goal = cells[-1]
+            return goal not in self.parked and self.last.get(goal, -1) < len(cells) - 1
+        return True
+
+
+class _Distances:
+    """
+    Exact static cost from any cell to `goal`, filled in on demand by a
+    backward A* aimed at `toward` that resumes whenever a cell it has not
+    closed yet is asked for (Silver's Reverse Resumable A*). Costs are
+    paid on entry, so stepping back from a closed cell i charges cost[i].
+    """
+
+    def __init__(self, grid, goal, toward, hscale):
+        self.grid = grid
+        self.mask, self.cost = grid.buffers()
+        self.stride = grid.stride
+        self.tr, self.tc = divmod(toward, self.stride)
+        self.hscale = hscale
+        self.g = {goal: 0}
+        self.closed = {}
+        self.heap = [(self._h(goal), goal)]
+
+    def _h(self, i):
+        r, c = divmod(i, self.stride)
+        return self.hscale * (abs(r - self.tr) + abs(c - self.tc))
+
+    def __call__(self, i):
+        d = self.closed.get(i)
+        if d is not None:
+            return d
+        g, closed, heap, mask, cost = self.g, self.closed, self.heap, self.mask, self.cost
+        stride = self.stride
+        while heap:
+            _, j = heapq.heappop(heap)
+            if j in closed:
+                continue
+            gj = closed[j] = g[j]
+            nc = gj + cost[j]
+            for k in (j + stride, j - stride, j + 1, j - 1):
+                if not mask[k] and nc < g.get(k, INF):
+                    g[k] = nc
+                    heapq.heappush(heap, (nc + self._h(k), k))
+            if j == i:
+                return gj
+        return INF
+
+
+def _plan_agent(grid, agent, s, goal, table, dist, movers_at, horizon, cons=None, park=True,
+                wait_cost=1, step=1, max_nodes=None):
+    """
+    Space-time A* for one agent around the reservation table, the
+    scheduled movers and (for CBS) its own constraints: a set of (t, i)
+    cells and (t, i, j) moves it may not use. step is the cheapest move
+    or wait, min(wait_cost, cheapest cell). Returns (cells, cost,
+    nodes_expanded); cells[t] is its flat index at timestep t.
+    """
+    mask, cost = grid.buffers()
+    stride = grid.stride
+    vertex, edge, parked = table.vertex, table.edge, table.parked
+    cons = cons or ()
+    if park and goal in parked and parked[goal][1] != agent:
+        return [], INF, 0
+    # it may only stop for good once nobody else needs the goal cell
+    settle = max([table.last.get(goal, -1)] + [c[0] for c in cons if len(c) == 2 and c[1] == goal])
+    h0 = dist(s)
+    if h0 == INF:
+        return [], INF, 0
+    # each step costs at least `step`, and it must still be moving (or
+    # waiting) until settle + 1, so the later of the two bounds the rest
+    h0 = max(h0, (settle + 1) * step)
+    max_nodes = max_nodes if max_nodes is not None else INF
+    size = grid.size
+    best = {s: 0}
+    parent = {s: None}
+    heap = [(h0, h0, 0, s)]
+    closed = set()
+    nodes = 0
+    while heap:
+        _, _, t, i = heapq.heappop(heap)
+        key = t * size + i
+        if key in closed:
+            continue
+        closed.add(key)
+        nodes += 1
+        if nodes > max_nodes:
+            break
+        if i == goal and t > settle:
+            cells = []
+            while key is not None:
+                cells.append(key % size)
+                key = parent[key]
+            cells.reverse()
+            return cells, best[t * size + i], nodes
+        if t >= horizon:
+            continue
+        gi = best[key]
+        nt = t + 1
+        occ_now, occ_next = movers_at(t), movers_at(nt)
+        for j in (i, i + stride, i - stride, i + 1, i - 1):
+            if mask[j] or (nt, j) in vertex or j in occ_next:
+                continue
+            p = parked.get(j)
+            if p is not None and p[0] <= nt and p[1] != agent:
+                continue
+            if j != i and ((t, j, i) in edge or (j in occ_now and i in occ_next)):
+                continue
+            if cons and ((nt, j) in cons or (t, i, j) in cons):
+                continue
+            nkey = nt * size + j
+            if nkey in closed:
+                continue
+            nc = gi + (wait_cost if j == i else cost[j])
+            if nc < best.get(nkey, INF):
+                hj = dist(j)
+                if hj == INF:
+                    continue
+                if nt <= settle:
+                    hj = max(hj, (settle + 1 - nt) * step)
+                best[nkey] = nc
+                parent[nkey] = key
+                heapq.heappush(heap, (nc + hj, hj, nt, j))
+    return [], INF, nodes
+
+
+def _at(cells, t, park):
+    if t < len(cells):
+        return cells[t]
+    return cells[-1] if park else None
+
+
+def find_conflicts(paths, park=True, first=False):
+    """
+    Clashes between planned paths (dict agent -> cells): vertex clashes
+    ("v", a, b, t, i) and swaps ("e", a, b, t, i, j) where a moves i -> j
+    and b moves j -> i between t and t + 1. With park, an agent stays on
+    its last cell. first=True stops at the earliest one.
+    """
+    found = []
+    horizon = max((len(p) for p in paths.values() if p), default=0)
+    items = [(a, p) for a, p in paths.items() if p]
+    for t in range(horizon):
+        seen = {}
+        moves = {}
+        for a, p in items:
+            i = _at(p, t, park)
+            if i is None:
+                continue
+            if i in seen:
+                found.append(("v", seen[i], a, t, i))
+                if first:
+                    return found
+            else:
+                seen[i] = a
+            if t + 1 < len(p) and p[t + 1] != i:
+                j = p[t + 1]
+                b = moves.get((j, i))
+                if b is not None:
+                    found.append(("e", b, a, t, j, i))
+                    if first:
+                        return found
+                moves[(i, j)] = a
+    return found
+
+
+def _cbs(grid, group, starts, goals, table, dists, movers_at, horizon, park, wait_cost, step,
+         max_nodes, max_ct):
+    """
+    Conflict-Based Search over the agents in `group`, planned around the
+    reservations already in table. Returns ({agent: cells}, ct_nodes,
+    low_nodes); the paths are None if max_ct constraint-tree nodes
+    were not enough.
+    """
+    low = 0
+
+    def replan(a, cons):
+        nonlocal low
+        cells, c, n = _plan_agent(grid, a, starts[a], goals[a], table, dists[a], movers_at, horizon,
+                                  cons, park, wait_cost, step, max_nodes)
+        low += n
+        return cells, c
+
+    cons = {a: frozenset() for a in group}
+    paths, costs = {}, {}
+    for a in group:
+        paths[a], costs[a] = replan(a, cons[a])
+        if not paths[a]:
+            return None, 0, low
+    tie = count()
+    heap = [(sum(costs.values()), next(tie), cons, paths, costs)]
+    ct = 0
+    while heap and ct < max_ct:
+        _, _, cons, paths, costs = heapq.heappop(heap)
+        ct += 1
+        clash = find_conflicts(paths, park, first=True)
+        if not clash:
+            return paths, ct, low
+        kind, a, b, t, *cells = clash[0]
+        if kind == "v":
+            branches = ((a, (t, cells[0])), (b, (t, cells[0])))
+        else:
+            i, j = cells
+            branches = ((a, (t, i, j)), (b, (t, j, i)))
+        for agent, c in branches:
+            new = dict(cons)
+            new[agent] = cons[agent] | {c}
+            p, cost = replan(agent, new[agent])
+            if not p:
+                continue
+            np_, nc = dict(paths), dict(costs)
+            np_[agent], nc[agent] = p, cost
+            heapq.heappush(heap, (sum(nc.values()), next(tie), new, np_, nc))
+    return None, ct, low
+
+
+def _groups(paths, park, limit):
+    """
+    Split agents into groups of at most `limit` that clash with each
+    other, grown breadth-first over the clash graph from the first agent
+    in priority order not grouped yet. Returns the groups in that order.
+    """
+    near = {a: [] for a in paths}
+    for _, a, b, *_ in find_conflicts(paths, park):
+        near[a].append(b)
+        near[b].append(a)
+    seen = set()
+    groups = []
+    for a in sorted(paths):
+        if a in seen:
+            continue
+        seen.add(a)
+        group = [a]
+        for x in group:
+            for y in sorted(near[x]):
+                if len(group) < limit and y not in seen:
+                    seen.add(y)
+                    group.append(y)
+        groups.append(sorted(group))
+    return groups
+
+
+def plan_fleet(grid, agents, movers=None, mode="prioritized", park=True, horizon=None, wait_cost=1,
+               max_nodes=None, group_limit=4, max_ct=64):
+    """
+    Plan collision-free paths for many agents on one grid.
+
+    agents : list of (start, goal) cells; list order is the priority order
+    movers : optional MovingObstacleManager; its movers keep their schedule
+             and the agents keep out of their way (parked agents are not
+             checked against them, so keep goals off mover routes)
+    mode   : "prioritized" - agents plan one by one with space-time A*
+             around the reservations of the ones before them;
+             "cbs" - agents plan alone first, clashing agents are split
+             into groups of at most group_limit and each group is solved
+             jointly with Conflict-Based Search around the groups before
+             it; a group that needs more than max_ct constraint-tree
+             nodes falls back to prioritized order
+    park   : agents stay on their goal once they arrive
+    horizon: last timestep searched, default 4 * (rows + cols)
+    max_nodes: expansion cap per single-agent search, default rows * cols
+
+    Moving into a cell costs its terrain cost, waiting costs wait_cost.
+    Returns (paths, report): paths[k] lists agent k's cell at each
+    timestep ([] if it found none), report holds agents, planned, failed,
+    makespan, sum_of_costs, nodes, cbs_groups, cbs_nodes, time_s and
+    agents_per_s.
+    """
+    t0 = time.perf_counter()
+    grid = as_array_grid(grid)
+    mask, cost = grid.buffers()
+    horizon = horizon if horizon is not None else 4 * (grid.rows + grid.cols)
+    max_nodes = max_nodes if max_nodes is not None else grid.rows * grid.cols
+    hscale = grid.cost_range()[0]
+    step = min(wait_cost, hscale)
+    starts, goals, dists = [], [], []
+    by_goal = {}
+    for s, t in agents:
+        si, ti = grid.index(*s), grid.index(*t)
+        starts.append(si)
+        goals.append(ti)
+        # one resumable reverse search per goal, shared by agents that use it
+        if ti not in by_goal:
+            by_goal[ti] = _Distances(grid, ti, si, hscale)
+        dists.append(by_goal[ti])
+
+    occ = {}
+    none = frozenset()
+
+    def movers_at(t):
+        cells = occ.get(t)
+        if cells is None:
+            cells = occ[t] = frozenset(grid.index(r, c) for r, c in movers.occupied_at(t)) if movers else none
+        return cells
+
+    table = ReservationTable()
+    paths = [[] for _ in agents]
+    costs = [0] * len(agents)
+    nodes = ct_nodes = cbs_groups = 0
+
+    def plan_one(a):
+        nonlocal nodes
+        if mask[starts[a]]:
+            return
+        cells, c, n = _plan_agent(grid, a, starts[a], goals[a], table, dists[a], movers_at, horizon,
+                                  None, park, wait_cost, step, max_nodes)
+        nodes += n
+        if cells:
+            paths[a], costs[a] = cells, c
+            table.reserve(a, cells, park)
+
+    if mode == "prioritized":
+        for a in range(len(agents)):
+            plan_one(a)
+    elif mode == "cbs":
+        # everyone alone first: clashes between these paths give the groups
+        alone = ReservationTable()
+        solo = {}
+        for a in range(len(agents)):
+            if mask[starts[a]]:
+                continue
+            cells, c, n = _plan_agent(grid, a, starts[a], goals[a], alone, dists[a], movers_at,
+                                      horizon, None, park, wait_cost, step, max_nodes)
+            nodes += n
+            solo[a] = (cells, c)
+        for group in _groups({a: p for a, (p, _) in solo.items() if p}, park, max(group_limit, 1)):
+            if len(group) == 1:
+                a = group[0]
+                cells, c = solo[a]
+                if table.free(cells, park):
+                    paths[a], costs[a] = cells, c
+                    table.reserve(a, cells, park)
+                else:
+                    plan_one(a)
+                continue
+            cbs_groups += 1
+            found, ct, low = _cbs(grid, group, starts, goals, table, dists, movers_at, horizon,
+                                  park, wait_cost, step, max_nodes, max_ct)
+            ct_nodes += ct
+            nodes += low
+            if found is None:
+                for a in group:
+                    plan_one(a)
+                continue
+            for a in group:
+                paths[a] = found[a]
+                costs[a] = sum(wait_cost if i == j else cost[j] for i, j in zip(found[a], found[a][1:]))
+                table.reserve(a, found[a], park)
+    else:
+        raise ValueError(f"unknown mode {mode!r}")
+
+    out = [[grid.coord(i) for i in p] for p in paths]
+    planned = sum(1 for p in paths if p)
+    elapsed = time.perf_counter() - t0
+    report = {
+        "agents": len(agents),
+        "planned": planned,
+        "failed": len(agents) - planned,
+        "makespan": max((len(p) - 1 for p in paths if p), default=0),
+        "sum_of_costs": sum(costs[a] for a in range(len(agents)) if paths[a]),
+        "nodes": nodes,
+        "cbs_groups": cbs_groups,
+        "cbs_nodes": ct_nodes,
+        "time_s": elapsed,
+        "agents_per_s": len(agents) / elapsed if elapsed > 0 else float("inf"),
+    }
+    return out, report
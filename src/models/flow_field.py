@@ -0,0 +1,249 @@
+# src/models/flow_field.py
+# flow fields: one reverse Dijkstra from a goal gives every cell its cost
+# to go and its next step, so any number of agents heading to that goal
+# read their move in O(1); obstacle deltas are repaired in place
+import heapq
+from array import array
+from collections import OrderedDict, deque
+
+from .search_core import UNREACHED, as_array_grid
+
+NONE = -1
+
+
+class FlowField:
+    """
+    Cost to go and next step towards one goal for every cell of a grid.
+
+    dist : array("I") over the padded flat indices, UNREACHED where the
+           goal can't be reached (and on obstacles)
+    step : array("b"), the direction k of the next cell, i + offsets[k],
+           or -1 at the goal and where there is no way
+    Costs are paid on entering a cell, as in the planners, so dist of a
+    start equals the cost ucs returns for it.
+
+    update(cells) repairs the field after those cells changed (obstacles
+    added or removed, costs edited): only the cells whose way to the goal
+    ran through a changed cell are re-settled, plus whatever got cheaper.
+    sync() does the same from the grid's own change log.
+    """
+
+    def __init__(self, grid, goal):
+        self.source = grid
+        self.grid = as_array_grid(grid)
+        self.goal_cell = goal
+        self.goal = self.grid.index(*goal)
+        self.mask, self.cost = self.grid.buffers()
+        self.offsets = self.grid.offsets
+        self.nodes = 0
+        self.build()
+
+    # ---- reading ----
+    def next_step(self, cell):
+        """The cell to move to from cell, or None (at the goal or no way there)."""
+        i = self.grid.index(*cell)
+        k = self.step[i]
+        return None if k < 0 else self.grid.coord(i + self.offsets[k])
+
+    def cost_to_go(self, cell):
+        d = self.dist[self.grid.index(*cell)]
+        return float("inf") if d == UNREACHED else d
+
+    def path(self, cell):
+        """cell -> goal by following the steps; [] when the goal can't be reached."""
+        i = self.grid.index(*cell)
+        if self.dist[i] == UNREACHED:
+            return []
+        path = [cell]
+        step, offsets = self.step, self.offsets
+        while step[i] >= 0:
+            i += offsets[step[i]]
+            path.append(self.grid.coord(i))
+        return path
+
+    # ---- building ----
+    def build(self):
+        """Full reverse sweep from the goal."""
+        n = self.grid.size
+        self.dist = dist = array("I", [UNREACHED]) * n
+        self.step = array("b", [NONE]) * n
+        self.version = getattr(self.source, "version", None)
+        if self.mask[self.goal]:
+            return
+        dist[self.goal] = 0
+        if self.grid.unit_cost():
+            self._bfs()
+        else:
+            self._propagate([self.goal])
+
+    def _bfs(self):
+        # every step costs 1: FIFO order settles cells by distance already
+        mask, dist, step, offsets = self.mask, self.dist, self.step, self.offsets
+        q = deque([self.goal])
+        nodes = 0
+        while q:
+            i = q.popleft()
+            nodes += 1
+            d = dist[i] + 1
+            for k in range(4):
+                j = i + offsets[k]
+                if mask[j] or dist[j] != UNREACHED:
+                    continue
+                dist[j] = d
+                # j's next step is back to i: the opposite direction
+                step[j] = k ^ 1
+                q.append(j)
+        self.nodes += nodes
+
+    def _propagate(self, seeds):
+        """Dijkstra outwards from seeds (cells whose dist is set), lowering neighbours."""
+        mask, cost, dist, step, offsets = self.mask, self.cost, self.dist, self.step, self.offsets
+        shift = self.grid.size.bit_length()
+        low = (1 << shift) - 1
+        heap = [(dist[i] << shift) | i for i in seeds]
+        heapq.heapify(heap)
+        heappush, heappop = heapq.heappush, heapq.heappop
+        nodes = 0
+        while heap:
+            key = heappop(heap)
+            i = key & low
+            d = key >> shift
+            if d != dist[i]:
+                continue
+            nodes += 1
+            nd = d + cost[i]
+            for k in range(4):
+                j = i + offsets[k]
+                if mask[j] or nd >= dist[j]:
+                    continue
+                dist[j] = nd
+                step[j] = k ^ 1
+                heappush(heap, (nd << shift) | j)
+        self.nodes += nodes
+
+    # ---- repair ----
+    def update(self, cells):
+        """
+        cells: (r, c) cells whose obstacle status or cost changed; the grid
+        must already show the change.
+        """
+        grid, mask, cost, dist, step, offsets = self.grid, self.mask, self.cost, self.dist, self.step, self.offsets
+        copied = grid is not self.source
+        changed = []
+        for r, c in cells:
+            if not grid.in_bounds(r, c):
+                continue
+            i = grid.index(r, c)
+            if copied:
+                grid.mask[i] = 1 if self.source.is_obstacle(r, c) else 0
+                grid.cost[i] = self.source.get_cost(r, c)
+            changed.append(i)
+        if not changed:
+            return
+        # cells whose route ran into or through a changed cell lose their distance:
+        # all of it for a new obstacle, its children only for a free cell (they pay its cost)
+        lost = []
+        stack = []
+        for i in changed:
+            if mask[i]:
+                if dist[i] != UNREACHED:
+                    dist[i] = UNREACHED
+                    step[i] = NONE
+                    lost.append(i)
+                    stack.append(i)
+            elif dist[i] != UNREACHED:
+                stack.append(i)
+        while stack:
+            u = stack.pop()
+            for k in range(4):
+                v = u - offsets[k]
+                if step[v] == k and dist[v] != UNREACHED:
+                    dist[v] = UNREACHED
+                    step[v] = NONE
+                    lost.append(v)
+                    stack.append(v)
+        # re-seed the lost cells and the freed ones from their settled neighbours;
+        # lost cells deeper inside are reached by the propagation
+        seeds = []
+        goal = self.goal
+        lost_set = set(lost)
+        for i in lost + [i for i in changed if not mask[i]]:
+            if mask[i]:
+                continue
+            if i == goal:
+                dist[i] = 0
+                step[i] = NONE
+                seeds.append(i)
+                continue
+            best, via = dist[i], step[i]
+            for k in range(4):
+                j = i + offsets[k]
+                if mask[j] or dist[j] == UNREACHED or j in lost_set:
+                    continue
+                d = dist[j] + cost[j]
+                if d < best:
+                    best, via = d, k
+            dist[i], step[i] = best, via
+            if best != UNREACHED:
+                seeds.append(i)
+        self._propagate(seeds)
+        self.version = getattr(self.source, "version", None)
+
+    def sync(self):
+        """Repair from grid.changed_since(), rebuilding when the log can't say."""
+        version = getattr(self.source, "version", None)
+        if version is None or version == self.version:
+            return
+        changed = self.source.changed_since(self.version) if hasattr(self.source, "changed_since") else None
+        if changed is None:
+            if self.grid is not self.source:
+                self.grid = as_array_grid(self.source)
+                self.mask, self.cost = self.grid.buffers()
+            self.build()
+        else:
+            self.update(changed)
+        self.version = version
+
+    def nbytes(self):
+        return self.dist.itemsize * len(self.dist) + self.step.itemsize * len(self.step)
+
+
+class FlowFields:
+    """
+    FlowField per goal for one grid, least recently used dropped past
+    capacity. field(goal) brings the field up to date with the grid
+    (see FlowField.sync) before handing it out.
+    """
+
+    def __init__(self, grid, capacity=8):
+        self.grid = grid
+        self.capacity = capacity
+        self._fields = OrderedDict()   # goal -> FlowField
+        self.stats = {"hits": 0, "builds": 0, "evictions": 0}
+
+    def field(self, goal):
+        f = self._fields.get(goal)
+        if f is not None:
+            self._fields.move_to_end(goal)
+            self.stats["hits"] += 1
+            f.sync()
+            return f
+        f = self._fields[goal] = FlowField(self.grid, goal)
+        self.stats["builds"] += 1
+        while len(self._fields) > self.capacity:
+            self._fields.popitem(last=False)
+            self.stats["evictions"] += 1
+        return f
+
+    def next_step(self, cell, goal):
+        return self.field(goal).next_step(cell)
+
+    def update(self, cells):
+        """Hand the same changed cells to every cached field."""
+        cells = list(cells)
+        for f in self._fields.values():
+            f.update(cells)
+
+    def info(self):
+        return dict(self.stats, size=len(self._fields), capacity=self.capacity,
+                    bytes=sum(f.nbytes() for f in self._fields.values()))
@@ -0,0 +1,173 @@
+# src/models/fuel.py
+# fuel-constrained planning with refuel stations: label-setting A* over
+# (cell, fuel left) states with dominance pruning
+import heapq
+import time
+
+import numpy as np
+
+from .search_core import CHECK_EVERY, as_array_grid, budget, workspace_for
+
+
+def _manhattan_field(rows, cols, cells):
+    """Manhattan distance from every cell to the nearest of cells, ignoring
+    obstacles (separable L1 distance transform, one numpy op per row/col)."""
+    far = rows + cols
+    d = np.full((rows, cols), far, dtype=np.int64)
+    if cells:
+        rs, cs = zip(*cells)
+        d[list(rs), list(cs)] = 0
+    for c in range(1, cols):
+        np.minimum(d[:, c], d[:, c - 1] + 1, out=d[:, c])
+    for c in range(cols - 2, -1, -1):
+        np.minimum(d[:, c], d[:, c + 1] + 1, out=d[:, c])
+    for r in range(1, rows):
+        np.minimum(d[r], d[r - 1] + 1, out=d[r])
+    for r in range(rows - 2, -1, -1):
+        np.minimum(d[r], d[r + 1] + 1, out=d[r])
+    return d
+
+
+def _station_field(grid, stations):
+    """
+    Padded flat list: manhattan distance to the nearest station. Kept on
+    the grid until the map or the station set changes.
+    """
+    key = (grid.version, frozenset(stations))
+    cached = getattr(grid, "_fuel_near", None)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    far = grid.rows + grid.cols
+    d = np.pad(_manhattan_field(grid.rows, grid.cols, [s for s in stations if grid.in_bounds(*s)]),
+               1, constant_values=far)
+    near = d.ravel().tolist()
+    grid._fuel_near = (key, near)
+    return near
+
+
+def fuel_astar(grid, start, goal, capacity, fuel=None, stations=None, time_limit=None, max_nodes=None,
+               stats=None):
+    """
+    Cheapest path for a vehicle with a tank of `capacity`: entering a cell
+    burns its cost in fuel and arriving at a refuel station fills the tank
+    again. fuel is what it starts with (default a full tank), stations a
+    set of (r, c) cells (default grid.stations). With no stations this is
+    the same query as ucs with fuel_limit=fuel.
+
+    A label is (cell, cost, fuel left). Labels come off the heap by
+    f = cost + h, fuller tank first on ties, so the labels settled at a
+    cell have nondecreasing cost; a later one there is only worth keeping
+    with more fuel than all of them. One int per cell (the most fuel
+    settled there) is then the whole dominance test, checked before a
+    label is pushed as well as when it is popped. Labels that can't reach
+    the goal or a station on what is left are dropped on the spot.
+
+    Returns (path, cost, nodes_expanded) like astar.
+    """
+    grid = as_array_grid(grid)
+    if not (grid.in_bounds(*start) and grid.in_bounds(*goal)):
+        return [], float("inf"), 0
+    mask, cost = grid.buffers()
+    s, t = grid.index(*start), grid.index(*goal)
+    if mask[t] and s != t:
+        return [], float("inf"), 0
+    stations = grid.stations if stations is None else stations
+    is_station = {grid.index(*c) for c in stations if grid.in_bounds(*c)}
+    tank = capacity if fuel is None or s in is_station else min(fuel, capacity)
+
+    ws = workspace_for(grid)
+    opened, _ = ws.next_generation()
+    # best[i]: most fuel left among labels settled at i (valid where state == opened)
+    best, state = ws.g, ws.state
+    stride = grid.stride
+    hs = int(grid.cost_view().min())
+    tr, tc = divmod(t, stride)
+    near = _station_field(grid, stations) if is_station else None
+
+    # label arrays, label k: cell, parent label, cost, fuel
+    lcell, lparent, lcost, lfuel = [s], [-1], [0], [tank]
+    fbits = max(capacity, 1).bit_length()
+    h = hs * (abs(s // stride - tr) + abs(s % stride - tc))
+    heap = [((h << fbits | (capacity - tank)) << 32) | 0]
+    low = (1 << 32) - 1
+
+    check, max_nodes, deadline = budget(time_limit, max_nodes, float("inf"))
+    track = stats is not None
+    trace = stats.trace if track else None
+    phase = stats.start_phase("search") if track else None
+    nodes = stale = peak = 0
+    found = -1
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while heap:
+        if track and len(heap) > peak:
+            peak = len(heap)
+        k = heappop(heap) & low
+        i, fi = lcell[k], lfuel[k]
+        if state[i] == opened and fi <= best[i]:
+            stale += 1
+            continue
+        state[i] = opened
+        best[i] = fi
+        nodes += 1
+        if nodes > check:
+            if nodes > max_nodes or time.perf_counter() > deadline:
+                break
+            check = min(check + CHECK_EVERY, max_nodes)
+        if trace:
+            trace(grid.coord(i), lcost[k])
+        if i == t:
+            found = k
+            break
+        gi = lcost[k]
+        for j in (i + stride, i - stride, i + 1, i - 1):
+            if mask[j]:
+                continue
+            cj = cost[j]
+            if cj > fi:
+                continue
+            r, c = divmod(j, stride)
+            hj = abs(r - tr) + abs(c - tc)
+            if j in is_station:
+                fj = capacity
+            else:
+                fj = fi - cj
+                # must still make it to the goal or some station
+                if hs * (hj if near is None else min(hj, near[j])) > fj:
+                    continue
+            if state[j] == opened and fj <= best[j]:
+                continue
+            nc = gi + cj
+            lcell.append(j)
+            lparent.append(k)
+            lcost.append(nc)
+            lfuel.append(fj)
+            heappush(heap, (((nc + hs * hj) << fbits | (capacity - fj)) << 32) | (len(lcell) - 1))
+
+    if track:
+        stats.add_search(nodes, len(lcell), stale, peak)
+        stats.end_phase(phase)
+    if found < 0:
+        return [], float("inf"), nodes
+    path = []
+    k = found
+    while k >= 0:
+        path.append(grid.coord(lcell[k]))
+        k = lparent[k]
+    path.reverse()
+    return path, lcost[found], nodes
+
+
+def refuel_astar(grid, start, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+    """
+    fuel_astar with the planner signature of bfs / ucs / astar: the tank
+    holds fuel_limit and the map's own stations refill it.
+    """
+    capacity = fuel_limit if fuel_limit is not None else 1 << 40
+    return fuel_astar(grid, start, goal, capacity, time_limit=time_limit, max_nodes=max_nodes, stats=stats)
+
+
+def refuel_stops(grid, path, stations=None):
+    """Cells on path (after the start) where the tank is filled."""
+    stations = grid.stations if stations is None else stations
+    return [p for p in path[1:] if p in stations]
@@ -0,0 +1,404 @@
+# src/models/hpa.py
+# HPA* (Botea, Mueller & Schaeffer): hierarchical path-finding on a grid
+# cut into square clusters. Entrances on cluster borders become abstract
+# nodes, intra-cluster costs between them are precomputed, queries search
+# the small abstract graph and refine each hop with a search inside one
+# cluster. Paths are near-optimal, not always optimal.
+from array import array
+import heapq
+import sys
+import time
+
+import numpy as np
+
+from .search_core import CHECK_EVERY, as_array_grid, budget, workspace_for, unwind
+
+INF = float("inf")
+
+
+class HPAStar:
+    def __init__(self, grid, cluster_size=16):
+        """
+        grid : Grid or ArrayGrid. A plain Grid is copied once; changed
+               cells are re-read from it in update_cells().
+        """
+        self.source = grid
+        self.grid = as_array_grid(grid)
+        self.cluster_size = cluster_size
+        self.query_times = []
+        self.rebuilt = 0          # clusters rebuilt by update_cells
+        t0 = time.perf_counter()
+        self.build()
+        self.build_time = time.perf_counter() - t0
+
+    # ---- preprocessing ----
+    def build(self):
+        grid, k = self.grid, self.cluster_size
+        self.crows = -(-grid.rows // k)
+        self.ccols = -(-grid.cols // k)
+        # cluster id of every padded index, -1 on the border ring
+        ids = np.full((grid.rows + 2, grid.stride), -1, dtype=np.int32)
+        ids[1:-1, 1:-1] = (np.arange(grid.rows) // k * self.ccols)[:, None] + np.arange(grid.cols) // k
+        self.cid = array("i", ids.tobytes())
+        # manhattan scaled by the cheapest cell stays a lower bound
+        free = grid.obstacle_view() == 0
+        self.hscale = int(grid.cost_view()[free].min()) if free.any() else 1
+        # walls in _intra_batch cost more than any path inside one cluster
+        self.big = k * k * (int(grid.cost_view()[free].max()) if free.any() else 1) + 1
+        self.sides = {}
+        for a in range(self.crows * self.ccols):
+            for b in self._next_to(a):
+                if b > a:
+                    self.sides[(a, b)] = self._entrances(a, b)
+        self.inter = {}
+        for pairs in self.sides.values():
+            self._link(pairs)
+        self.nodes = {a: self._cluster_nodes(a) for a in range(self.crows * self.ccols)}
+        self.intra = {}
+        self._intra_batch(range(self.crows * self.ccols))
+        self.version = self.source.version
+
+    def _next_to(self, a):
+        cr, cc = divmod(a, self.ccols)
+        if cc + 1 < self.ccols:
+            yield a + 1
+        if cc > 0:
+            yield a - 1
+        if cr + 1 < self.crows:
+            yield a + self.ccols
+        if cr > 0:
+            yield a - self.ccols
+
+    def _entrances(self, a, b):
+        """
+        Transition pairs (cell in a, cell in b) on the border of a and b
+        (b right of or below a): one per run of open border cells, or one
+        at each end of runs of 6 or more, as in the paper.
+        """
+        grid, k = self.grid, self.cluster_size
+        mask = grid.mask
+        ar, ac = divmod(a, self.ccols)
+        if b // self.ccols == ar:
+            c = ac * k + k - 1
+            r0, r1 = ar * k, min(ar * k + k, grid.rows)
+            cells = [(grid.index(r, c), grid.index(r, c + 1)) for r in range(r0, r1)]
+        else:
+            r = ar * k + k - 1
+            c0, c1 = ac * k, min(ac * k + k, grid.cols)
+            cells = [(grid.index(r, c), grid.index(r + 1, c)) for c in range(c0, c1)]
+        pairs, run = [], []
+        for p in cells + [None]:
+            if p is not None and not mask[p[0]] and not mask[p[1]]:
+                run.append(p)
+                continue
+            if run:
+                if len(run) < 6:
+                    pairs.append(run[len(run) // 2])
+                else:
+                    pairs += [run[0], run[-1]]
+                run = []
+        return pairs
+
+    def _link(self, pairs, drop=False):
+        cost = self.grid.cost
+        for u, v in pairs:
+            if drop:
+                self.inter[u].pop(v, None)
+                self.inter[v].pop(u, None)
+            else:
+                self.inter.setdefault(u, {})[v] = int(cost[v])
+                self.inter.setdefault(v, {})[u] = int(cost[u])
+
+    def _cluster_nodes(self, a):
+        nodes = set()
+        for b in self._next_to(a):
+            for u, v in self.sides[(min(a, b), max(a, b))]:
+                nodes.add(u if a < b else v)
+        return nodes
+
+    def _intra_batch(self, clusters):
+        """
+        Shortest in-cluster costs between the entrance cells of each cluster.
+
+        A Python Dijkstra from every entrance is far too slow on big maps,
+        so all tiles and all their entrances are relaxed together in numpy.
+        One sweep along a row settles every straight run at once: with S the
+        running sum of entry costs, d[j] = S[j] + min(d[i] - S[i] for i <= j).
+        Sweeping right, left, down and up until nothing changes takes about
+        as many rounds as the paths have turns.
+        """
+        grid, k, big = self.grid, self.cluster_size, self.big
+        dtype = np.int32 if 4 * k * big < 1 << 31 else np.int64
+        blocked, costs = grid.obstacle_view(), grid.cost_view()
+        stride = grid.stride
+        clusters = list(clusters)
+        m = max((len(self.nodes[a]) for a in clusters), default=0)
+        # keep each batch around 4M cells
+        chunk = max(1, (1 << 22) // max(m * k * k, 1))
+        for lo in range(0, len(clusters), chunk):
+            ids = clusters[lo:lo + chunk]
+            srcs = [sorted(self.nodes[a]) for a in ids]
+            m = max(len(x) for x in srcs)
+            if m < 2:
+                for a, nodes in zip(ids, srcs):
+                    self.intra[a] = {u: {} for u in nodes}
+                continue
+            # tile coordinates of every entrance
+            where = []
+            for a, nodes in zip(ids, srcs):
+                cr, cc = divmod(a, self.ccols)
+                where.append([(u // stride - 1 - cr * k, u % stride - 1 - cc * k) for u in nodes])
+            w = np.full((len(ids), 1, k, k), big, dtype=dtype)
+            for i, a in enumerate(ids):
+                cr, cc = divmod(a, self.ccols)
+                r0, c0 = cr * k, cc * k
+                tile = w[i, 0, :min(k, grid.rows - r0), :min(k, grid.cols - c0)]
+                tile[...] = costs[r0:r0 + k, c0:c0 + k]
+                tile[blocked[r0:r0 + k, c0:c0 + k] != 0] = big
+            dist = np.full((len(ids), m, k, k), big, dtype=dtype)
+            dist[[i for i, x in enumerate(where) for _ in x],
+                 [j for x in where for j in range(len(x))],
+                 [p[0] for x in where for p in x],
+                 [p[1] for x in where for p in x]] = 0
+            # running sums of entry costs, forwards and backwards on both axes
+            sums = []
+            for axis in (3, 2):
+                fwd = np.cumsum(w, axis=axis, dtype=dtype)
+                sums.append((axis, fwd, False))
+                sums.append((axis, np.flip(np.cumsum(np.flip(w, axis), axis=axis, dtype=dtype), axis), True))
+            while True:
+                before = dist.copy()
+                for axis, run, back in sums:
+                    d = dist - run
+                    if back:
+                        d = np.flip(np.minimum.accumulate(np.flip(d, axis), axis=axis), axis)
+                    else:
+                        d = np.minimum.accumulate(d, axis=axis)
+                    np.minimum(dist, d + run, out=dist)
+                np.minimum(dist, big, out=dist)
+                if np.array_equal(dist, before):
+                    break
+            for i, (a, nodes) in enumerate(zip(ids, srcs)):
+                x = where[i]
+                rows = dist[i, :len(nodes)][:, [p[0] for p in x], [p[1] for p in x]].tolist()
+                self.intra[a] = {u: {v: d for v, d in zip(nodes, row) if v != u and d < big}
+                                 for u, row in zip(nodes, rows)}
+
+    def _local(self, src, targets, goal=None):
+        """
+        Dijkstra from src that never leaves src's cluster, stopping once all
+        targets are settled. Returns ({target: cost}, path to goal or None,
+        cells settled).
+        """
+        grid = self.grid
+        ws = workspace_for(grid)
+        opened, closed = ws.next_generation()
+        mask, cost = grid.buffers()
+        g, parent, state = ws.g, ws.parent, ws.state
+        cid, stride = self.cid, grid.stride
+        home = cid[src]
+        want = set(targets)
+        if goal is not None:
+            want.add(goal)
+        out = {}
+        g[src] = 0
+        parent[src] = src
+        state[src] = opened
+        heap = [(0, src)]
+        settled = 0
+        while heap and want:
+            gi, i = heapq.heappop(heap)
+            if state[i] == closed:
+                continue
+            state[i] = closed
+            settled += 1
+            if i in want:
+                out[i] = gi
+                want.discard(i)
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j] or cid[j] != home:
+                    continue
+                nc = gi + cost[j]
+                if state[j] < opened or nc < g[j]:
+                    state[j] = opened
+                    g[j] = nc
+                    parent[j] = i
+                    heapq.heappush(heap, (nc, j))
+        path = None
+        if goal is not None and goal in out:
+            path = unwind(grid, parent, src, goal)
+        return out, path, settled
+
+    # ---- obstacle changes ----
+    def update_cells(self, cells):
+        """
+        cells: (r, c) cells whose obstacle status changed. Only the clusters
+        they fall in, plus neighbours whose shared entrances moved, are
+        rebuilt. Returns the number of clusters rebuilt.
+        """
+        grid = self.grid
+        copied = grid is not self.source
+        touched = set()
+        for (r, c) in cells:
+            if not grid.in_bounds(r, c):
+                continue
+            u = grid.index(r, c)
+            if copied:
+                grid.mask[u] = 1 if self.source.is_obstacle(r, c) else 0
+            touched.add(self.cid[u])
+        if copied and touched:
+            grid.touch()
+        affected = set(touched)
+        for a in touched:
+            for b in self._next_to(a):
+                key = (min(a, b), max(a, b))
+                old = self.sides[key]
+                new = self._entrances(*key)
+                if new != old:
+                    self._link(old, drop=True)
+                    self._link(new)
+                    self.sides[key] = new
+                    affected.add(b)
+        for a in affected:
+            self.nodes[a] = self._cluster_nodes(a)
+        for u in [u for u, e in self.inter.items() if not e]:
+            del self.inter[u]
+        self._intra_batch(sorted(affected))
+        self.rebuilt += len(affected)
+        self.version = self.source.version
+        return len(affected)
+
+    # ---- queries ----
+    def plan(self, start, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+        """
+        Returns (path, cost, nodes_expanded) like astar. nodes_expanded
+        counts abstract nodes plus cells settled while connecting start /
+        goal and refining the abstract path. time_limit (seconds) and
+        max_nodes cap the abstract search. stats gets the abstract search
+        and "connect" / "abstract" / "refine" phase times.
+        """
+        t0 = time.perf_counter()
+        res = self._plan(start, goal, fuel_limit, time_limit, max_nodes, stats)
+        self.query_times.append(time.perf_counter() - t0)
+        return res
+
+    def _plan(self, start, goal, fuel_limit, time_limit, max_nodes, stats):
+        grid, cid = self.grid, self.cid
+        mask, cost = grid.buffers()
+        if not (grid.in_bounds(*start) and grid.in_bounds(*goal)):
+            return [], INF, 0
+        s, t = grid.index(*start), grid.index(*goal)
+        if mask[s] or mask[t]:
+            return [], INF, 0
+        cs, ct = cid[s], cid[t]
+
+        track = stats is not None
+        phase = stats.start_phase("connect") if track else None
+        # hook start and goal into the abstract graph
+        out_s, _, n1 = self._local(s, self.nodes[cs] | ({t} if cs == ct else set()))
+        back, _, n2 = self._local(t, self.nodes[ct])
+        if track:
+            stats.end_phase(phase)
+            phase = stats.start_phase("abstract")
+        into_t = {n: d + int(cost[t]) - int(cost[n]) for n, d in back.items()}
+        nodes = n1 + n2
+
+        stride, hs = grid.stride, self.hscale
+        tr, tc = divmod(t, stride)
+
+        def h(i):
+            r, c = divmod(i, stride)
+            return hs * (abs(r - tr) + abs(c - tc))
+
+        intra, inter = self.intra, self.inter
+        check, max_nodes, deadline = budget(time_limit, max_nodes, INF)
+        best = {s: 0}
+        parent = {s: None}
+        heap = [(h(s), 0, s)]
+        closed = set()
+        expanded = stale = peak = 0
+        aborted = False
+        while heap:
+            if track and len(heap) > peak:
+                peak = len(heap)
+            _, gu, u = heapq.heappop(heap)
+            if u in closed:
+                stale += 1
+                continue
+            closed.add(u)
+            expanded += 1
+            if expanded > check:
+                if expanded > max_nodes or time.perf_counter() > deadline:
+                    aborted = True
+                    break
+                check = min(check + CHECK_EVERY, max_nodes)
+            if track and stats.trace:
+                stats.trace(grid.coord(u), gu)
+            if u == t:
+                break
+            hops = list(inter.get(u, {}).items())
+            if u == s:
+                hops += out_s.items()
+            else:
+                hops += intra[cid[u]].get(u, {}).items()
+            if u in into_t:
+                hops.append((t, into_t[u]))
+            for v, w in hops:
+                nc = gu + w
+                if v not in closed and nc < best.get(v, INF):
+                    best[v] = nc
+                    parent[v] = u
+                    heapq.heappush(heap, (nc + h(v), nc, v))
+        if track:
+            stats.add_search(expanded, expanded + stale + len(heap), stale, peak)
+            stats.end_phase(phase)
+        nodes += expanded
+        if aborted or t not in closed:
+            return [], INF, nodes
+        total = best[t]
+        if fuel_limit is not None and total > fuel_limit:
+            return [], INF, nodes
+
+        hops = [t]
+        while parent[hops[-1]] is not None:
+            hops.append(parent[hops[-1]])
+        hops.reverse()
+        phase = stats.start_phase("refine") if track else None
+        path = [grid.coord(s)]
+        for u, v in zip(hops, hops[1:]):
+            if cid[u] != cid[v]:
+                path.append(grid.coord(v))
+                continue
+            _, leg, n = self._local(u, (), goal=v)
+            nodes += n
+            path += leg[1:]
+        if track:
+            stats.end_phase(phase)
+        return path, total, nodes
+
+    # ---- reporting ----
+    @property
+    def nbytes(self):
+        """Rough size of the abstract graph and cluster index."""
+        size = sys.getsizeof(self.cid) + sys.getsizeof(self.inter) + sys.getsizeof(self.intra)
+        size += sum(sys.getsizeof(e) for e in self.inter.values())
+        for edges in self.intra.values():
+            size += sys.getsizeof(edges) + sum(sys.getsizeof(e) for e in edges.values())
+        size += sum(sys.getsizeof(n) for n in self.nodes.values())
+        return size
+
+    def report(self):
+        q = self.query_times
+        return {
+            "cluster_size": self.cluster_size,
+            "clusters": self.crows * self.ccols,
+            "abstract_nodes": sum(len(n) for n in self.nodes.values()),
+            "abstract_edges": sum(len(e) for e in self.inter.values())
+                              + sum(len(e) for edges in self.intra.values() for e in edges.values()),
+            "build_s": self.build_time,
+            "memory_bytes": self.nbytes,
+            "queries": len(q),
+            "query_ms_mean": 1000 * sum(q) / len(q) if q else 0.0,
+            "query_ms_max": 1000 * max(q) if q else 0.0,
+            "clusters_rebuilt": self.rebuilt,
+        }
@@ -0,0 +1,313 @@
+# src/models/jps.py
+# Jump Point Search for 4-connected grids, plus JPS+ jump tables.
+#
+# In a region where every cell has the same cost there are many equally
+# short paths between two cells. JPS only follows one canonical family:
+# vertical moves may turn left/right at any cell, horizontal moves only
+# turn where an obstacle forces it. Straight runs are skipped over in one
+# "jump" instead of pushing every cell on the heap.
+#
+# Weighted cells (cost above the grid's cheapest cell) break the symmetry,
+# so jumps treat them like walls and stop next to them; from there the
+# search steps into and through weighted terrain one cell at a time.
+import heapq
+import time
+
+import numpy as np
+
+from .search_core import CHECK_EVERY, as_array_grid, budget, workspace_for
+
+# direction bits, same order as ArrayGrid.offsets: down, up, right, left
+DOWN, UP, RIGHT, LEFT = 1, 2, 4, 8
+HORIZONTAL = RIGHT | LEFT
+ALL = 15
+
+
+def _base_cost(grid):
+    free = grid.obstacle_view() == 0
+    return int(grid.cost_view()[free].min()) if free.any() else 1
+
+
+class JumpTable:
+    """
+    JPS+ preprocessing for one grid version: for every cell and direction,
+    the distance to the next jump point (> 0) or minus the number of free
+    steps before a wall (<= 0). Built with numpy row/column sweeps.
+    """
+
+    def __init__(self, grid):
+        grid = as_array_grid(grid)
+        self.version = grid.version
+        self.base = _base_cost(grid)
+        shape = (grid.rows + 2, grid.stride)
+        mask = grid.mask.reshape(shape)
+        cost = grid.cost.reshape(shape)
+        free = mask == 0
+        uniform = free & (cost == self.base)
+        weighted = free & ~uniform
+        wall = ~uniform
+
+        # uniform cells next to weighted terrain: jumps always stop there
+        near = np.zeros(shape, dtype=bool)
+        near[1:-1, 1:-1] = (weighted[2:, 1:-1] | weighted[:-2, 1:-1]
+                            | weighted[1:-1, 2:] | weighted[1:-1, :-2])
+        boundary = uniform & near
+
+        # forced turns for a horizontal move arriving from the left / right
+        def forced(back):
+            f = np.zeros(shape, dtype=bool)
+            f[1:-1, 1:-1] = ((uniform[:-2, 1:-1] & wall[:-2, 1 - back:shape[1] - 1 - back])
+                             | (uniform[2:, 1:-1] & wall[2:, 1 - back:shape[1] - 1 - back]))
+            return uniform & (boundary | f)
+
+        right = self._sweep(wall.T, forced(1).T, reverse=True).T
+        left = self._sweep(wall.T, forced(-1).T, reverse=False).T
+        vertical = uniform & (boundary | (right > 0) | (left > 0))
+        down = self._sweep(wall, vertical, reverse=True)
+        up = self._sweep(wall, vertical, reverse=False)
+
+        self.uniform = uniform.astype(np.uint8).ravel()
+        self.boundary = boundary.astype(np.uint8).ravel()
+        self.dist = [a.ravel() for a in (down, up, right, left)]
+
+    @staticmethod
+    def _sweep(wall, jump, reverse):
+        """Distances along axis 0, looking towards +axis when reverse."""
+        n = wall.shape[0]
+        out = np.zeros(wall.shape, dtype=np.int32)
+        order = range(n - 2, -1, -1) if reverse else range(1, n)
+        step = 1 if reverse else -1
+        for r in order:
+            nxt = out[r + step]
+            out[r] = np.where(wall[r + step], 0,
+                              np.where(jump[r + step], 1,
+                                       np.where(nxt > 0, nxt + 1, nxt - 1)))
+        return out
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.dist) + self.uniform.nbytes + self.boundary.nbytes
+
+
+def jump_table_for(grid):
+    """JPS+ tables cached on the grid, rebuilt when grid.version moves on."""
+    table = getattr(grid, "_jump_table", None)
+    if table is None or table.version != grid.version:
+        table = JumpTable(grid)
+        grid._jump_table = table
+    return table
+
+
+def jps(grid, start, goal, fuel_limit=None, time_limit=None, plus=False, max_nodes=None, stats=None):
+    """
+    A* over jump points. By default jumps are found by scanning the grid
+    (JPS); plus=True reads them from the cached JumpTable (JPS+).
+    Returns (path, cost, nodes_expanded) like astar; nodes_expanded counts
+    expanded jump points, path has every cell in between filled in.
+    time_limit / max_nodes / stats as in search_core.search.
+    """
+    source = grid
+    grid = as_array_grid(grid)
+    ws = workspace_for(grid)
+    opened, closed = ws.next_generation()
+    mask, cost = grid.buffers()
+    g, parent, state = ws.g, ws.parent, ws.state
+    stride = grid.stride
+    offsets = grid.offsets
+
+    s = grid.index(*start)
+    t = grid.index(*goal)
+    tr, tc = divmod(t, stride)
+
+    if plus:
+        # cached on the caller's grid, rebuilt only when its version moves
+        if stats is not None:
+            with stats.phase("preprocess"):
+                table = jump_table_for(source)
+        else:
+            table = jump_table_for(source)
+        base = table.base
+        is_uniform = memoryview(table.uniform).__getitem__
+        near_weighted = memoryview(table.boundary).__getitem__
+        dist = [memoryview(a) for a in table.dist]
+
+        def jump(i, d):
+            v = dist[d][i]
+            reach = v if v > 0 else -v
+            r, c = divmod(i, stride)
+            if d < 2:
+                # stop in the goal's row, the sideways jumps take it from there
+                k = (tr - r) if d == 0 else (r - tr)
+                if 0 < k <= reach:
+                    return i + k * offsets[d], k
+            elif r == tr:
+                k = (tc - c) if d == 2 else (c - tc)
+                if 0 < k <= reach:
+                    return t, k
+            if v > 0:
+                return i + v * offsets[d], v
+            return None
+    else:
+        base = _base_cost(grid)
+
+        def is_uniform(i):
+            return not mask[i] and cost[i] == base
+
+        def near_weighted(i):
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if not mask[j] and cost[j] != base:
+                    return True
+            return False
+
+        def jump_h(i, o):
+            n = 0
+            while True:
+                i += o
+                n += 1
+                if not is_uniform(i):
+                    return None
+                if i == t or near_weighted(i):
+                    return i, n
+                if ((is_uniform(i - stride) and not is_uniform(i - stride - o))
+                        or (is_uniform(i + stride) and not is_uniform(i + stride - o))):
+                    return i, n
+
+        def jump(i, d):
+            o = offsets[d]
+            if d >= 2:
+                return jump_h(i, o)
+            n = 0
+            while True:
+                i += o
+                n += 1
+                if not is_uniform(i):
+                    return None
+                if i == t or near_weighted(i) or jump_h(i, 1) or jump_h(i, -1):
+                    return i, n
+
+    # directions to try when a jump along d ends at k
+    def dirs_at(k, d):
+        if near_weighted(k):
+            return ALL
+        if d < 2:
+            return (1 << d) | HORIZONTAL
+        o = offsets[d]
+        bits = 1 << d
+        if is_uniform(k - stride) and not is_uniform(k - stride - o):
+            bits |= UP
+        if is_uniform(k + stride) and not is_uniform(k + stride - o):
+            bits |= DOWN
+        return bits
+
+    check, max_nodes, deadline = budget(time_limit, max_nodes, grid.size + 1)
+    fuel = fuel_limit if fuel_limit is not None else 1 << 62
+    shift = grid.size.bit_length()
+    low = (1 << shift) - 1
+    hbits = max(base * (grid.rows + grid.cols), 1).bit_length()
+
+    def h(i):
+        r, c = divmod(i, stride)
+        return base * (abs(r - tr) + abs(c - tc))
+
+    g[s] = 0
+    parent[s] = s
+    state[s] = opened
+    todo = {s: ALL}
+    hs = h(s)
+    heap = [(((hs << hbits) | hs) << shift) | s]
+    heappush, heappop = heapq.heappush, heapq.heappop
+    nodes_expanded = stale = peak = 0
+    found = False
+    track = stats is not None
+    trace = stats.trace if track else None
+    phase = stats.start_phase("search") if track else None
+
+    def relax(i, j, nc, bits):
+        if nc > fuel:
+            return
+        if state[j] < opened or nc < g[j]:
+            state[j] = opened
+            g[j] = nc
+            parent[j] = i
+            todo[j] = bits
+        elif nc == g[j] and bits & ~todo[j]:
+            # an equally short arrival from another side: its directions
+            # are needed too, reopen if the cell was already expanded
+            todo[j] |= bits
+            if state[j] != closed:
+                return
+            state[j] = opened
+        else:
+            return
+        hj = h(j)
+        heappush(heap, ((((nc + hj) << hbits) | hj) << shift) | j)
+
+    while heap:
+        if track and len(heap) > peak:
+            peak = len(heap)
+        i = heappop(heap) & low
+        if state[i] == closed:
+            stale += 1
+            continue
+        state[i] = closed
+        nodes_expanded += 1
+        if nodes_expanded > check:
+            if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                break
+            check = min(check + CHECK_EVERY, max_nodes)
+        gi = g[i]
+        if trace:
+            trace(grid.coord(i), gi)
+        if i == t:
+            found = True
+            break
+        if not is_uniform(i):
+            # weighted terrain: ordinary single steps
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if not mask[j]:
+                    relax(i, j, gi + cost[j], ALL)
+            continue
+        bits = todo[i]
+        for d in range(4):
+            if not bits & (1 << d):
+                continue
+            j = i + offsets[d]
+            if mask[j]:
+                continue
+            if not is_uniform(j):
+                relax(i, j, gi + cost[j], ALL)
+                continue
+            hit = jump(i, d)
+            if hit is not None:
+                k, n = hit
+                relax(i, k, gi + n * base, ALL if k == t else dirs_at(k, d))
+
+    if track:
+        # every push is popped (expanded or stale) or still on the heap
+        stats.add_search(nodes_expanded, nodes_expanded + stale + len(heap), stale, peak)
+        stats.end_phase(phase)
+    if not found:
+        return [], float("inf"), nodes_expanded
+    return _fill(grid, parent, s, t), g[t], nodes_expanded
+
+
+def _fill(grid, parent, s, t):
+    """Unwind the jump points and fill in the straight runs between them."""
+    points = [t]
+    while points[-1] != s:
+        points.append(parent[points[-1]])
+    points.reverse()
+    stride = grid.stride
+    path = [grid.coord(s)]
+    for a, b in zip(points, points[1:]):
+        step = stride if abs(b - a) >= stride else 1
+        if b < a:
+            step = -step
+        for i in range(a + step, b + step, step):
+            path.append(grid.coord(i))
+    return path
+
+
+def jps_plus(grid, start, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+    return jps(grid, start, goal, fuel_limit=fuel_limit, time_limit=time_limit, plus=True,
+               max_nodes=max_nodes, stats=stats)
@@ -0,0 +1,174 @@
+# src/models/landmarks.py
+# ALT heuristic: A*, Landmarks and the Triangle inequality
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from .search_core import UNREACHED, as_array_grid, distance_field
+
+
+def grid_digest(grid):
+    """Fingerprint of the obstacle mask and costs, to spot stale tables."""
+    grid = as_array_grid(grid)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.int64([grid.rows, grid.cols]).tobytes())
+    h.update(grid.mask.tobytes())
+    h.update(grid.cost.tobytes())
+    return h.hexdigest()
+
+
+class Landmarks:
+    """
+    Dijkstra distance tables from k landmark cells, one uint32 row per
+    landmark over the padded ArrayGrid indices.
+
+    Cell costs are paid on entry, so d(n, L) = d(L, n) + cost(L) - cost(n)
+    and the from-landmark table is enough for both triangle bounds:
+        d(n, t) >= d(L, t) - d(L, n)
+        d(n, t) >= d(L, n) - d(L, t) + cost(t) - cost(n)
+    The bounds only hold for the map they were built on; while the grid
+    differs from it, estimator() returns None and astar uses manhattan.
+    Edits are checked cell by cell from grid.changed_since() against a
+    copy of the mask and costs taken at attach(); the full digest is only
+    hashed when the change log can't say, and a version found not to
+    match is remembered.
+    """
+
+    def __init__(self, cells, dist, digest, k=None):
+        self.cells = [tuple(c) for c in cells]
+        self.dist = dist
+        self.digest = digest
+        # landmarks asked for; a small map may have room for fewer
+        self.k = len(self.cells) if k is None else k
+        finite = dist[dist != UNREACHED]
+        self.max_dist = int(finite.max()) if finite.size else 0
+        self.version = None
+        self.grid = None
+        self.stale = None
+
+    @classmethod
+    def build(cls, grid, k=8, seed=0):
+        """Farthest-point selection: each landmark is the reachable cell
+        farthest from the ones picked so far."""
+        grid = as_array_grid(grid)
+        free = np.flatnonzero(grid.mask == 0)
+        if free.size == 0 or k <= 0:
+            return cls([], np.zeros((0, grid.size), dtype=np.uint32), grid_digest(grid), k=k)
+        rng = np.random.default_rng(seed)
+        first = grid.coord(int(rng.choice(free)))
+        field = distance_field(grid, first)
+        reach = field != UNREACHED
+        nearest = np.where(reach, field, 0).astype(np.int64)
+        cells, rows = [], []
+        for _ in range(k):
+            i = int(np.argmax(nearest))
+            if cells and nearest[i] == 0:
+                break
+            cell = grid.coord(i)
+            row = distance_field(grid, cell)
+            cells.append(cell)
+            rows.append(row)
+            nearest = np.minimum(nearest, np.where(reach, row, 0).astype(np.int64))
+        lm = cls(cells, np.stack(rows), grid_digest(grid), k=k)
+        lm.attach(grid)
+        return lm
+
+    def attach(self, grid):
+        """Bind to grid, which must be the map the tables were built on."""
+        grid = as_array_grid(grid)
+        self.grid = grid
+        self.version = grid.version
+        self.base_mask, self.base_cost = grid.mask.copy(), grid.cost.copy()
+        self.stale = None
+        return self
+
+    def matches(self, grid):
+        """Whether the tables hold for grid as it is now."""
+        if grid is self.grid:
+            if grid.version == self.version:
+                return True
+            if grid.version == self.stale:
+                return False
+            cells = grid.changed_since(self.version)
+            if cells is not None:
+                idx = [grid.index(r, c) for r, c in cells if grid.in_bounds(r, c)]
+                ok = bool((grid.mask[idx] == self.base_mask[idx]).all()
+                          and (grid.cost[idx] == self.base_cost[idx]).all())
+            else:
+                ok = grid_digest(grid) == self.digest
+            if ok:
+                self.version = grid.version
+            else:
+                self.stale = grid.version
+            return ok
+        if grid_digest(grid) != self.digest:
+            return False
+        self.attach(grid)
+        return True
+
+    def save(self, path):
+        np.savez_compressed(path, cells=np.array(self.cells, dtype=np.int64).reshape(-1, 2),
+                            dist=self.dist, digest=np.array(self.digest), k=np.array(self.k))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        k = int(data["k"]) if "k" in data else None
+        return cls(data["cells"].tolist(), data["dist"], str(data["digest"]), k=k)
+
+    @staticmethod
+    def path_for(mapfile):
+        # maps/large.txt -> maps/large.landmarks.npz
+        return Path(mapfile).with_suffix(".landmarks.npz")
+
+    @classmethod
+    def for_map(cls, mapfile, grid, k=8, seed=0):
+        """Load the tables saved next to mapfile, or build and save them."""
+        path = cls.path_for(mapfile)
+        if path.exists():
+            lm = cls.load(path)
+            if lm.digest == grid_digest(grid) and lm.k == k:
+                return lm.attach(grid)
+        lm = cls.build(grid, k=k, seed=seed)
+        lm.save(path)
+        return lm.attach(grid)
+
+    @property
+    def nbytes(self):
+        return self.dist.nbytes
+
+    def estimator(self, grid, goal):
+        if not self.matches(grid):
+            return None
+        t = grid.index(*goal)
+        cost = grid.buffers()[1]
+        ct = cost[t]
+        terms = []
+        for row in self.dist:
+            dt = int(row[t])
+            if dt != UNREACHED:
+                terms.append((memoryview(row), dt))
+        stride = grid.stride
+        tr, tc = divmod(t, stride)
+        hscale, top = grid.cost_range()
+        # loose upper bound on h, only used to size the packed heap keys
+        hmax = self.max_dist + top + hscale * (grid.rows + grid.cols)
+
+        def h(n):
+            r, c = divmod(n, stride)
+            best = hscale * (abs(r - tr) + abs(c - tc))
+            cn = cost[n]
+            for row, dt in terms:
+                dn = row[n]
+                if dn == UNREACHED:
+                    continue
+                a = dt - dn
+                if a > best:
+                    best = a
+                b = dn - dt + ct - cn
+                if b > best:
+                    best = b
+            return best
+
+        return h, hmax
@@ -0,0 +1,24 @@
+# src/models/one_to_many.py
+# one-to-many / many-to-one queries answered by one shared sweep
+
+from .search_core import sweep
+
+
+def one_to_many(grid, start, goals, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+    """
+    Shortest paths from one start to many goals with a single Dijkstra
+    sweep, stopped once every goal is settled (see search_core.sweep).
+    Returns a SearchTree: tree.cost(goal), tree.path(goal) (built on
+    demand from the shared parent links) and tree.nodes.
+    """
+    return sweep(grid, start, goals, fuel_limit=fuel_limit, time_limit=time_limit,
+                 max_nodes=max_nodes, stats=stats)
+
+
+def many_to_one(grid, starts, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+    """
+    The reverse: one backward sweep from goal answers every start.
+    tree.path(start) runs start -> goal, with the same cost ucs gives.
+    """
+    return sweep(grid, goal, starts, reverse=True, fuel_limit=fuel_limit, time_limit=time_limit,
+                 max_nodes=max_nodes, stats=stats)
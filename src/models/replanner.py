@@ -1,59 +1,343 @@
 import time
+from collections import OrderedDict
 from .astar import astar
 from .ucs import ucs
 from .bfs import bfs
+from .jps import jps, jps_plus
+from .dstar_lite import DStarLite
+from .hpa import HPAStar
+from .spacetime_astar import spacetime_astar
+from .ara import ara_star, weighted_astar
+
+# answers that only depend on the static grid, safe to cache
+CACHEABLE = ("astar", "ucs", "bfs", "jps", "jps_plus", "hpa")
+# optimal planners: every piece of their path is itself a shortest path
+SUBPATH_OK = ("astar", "ucs", "bfs", "jps", "jps_plus")
+
+class _ActivePlan:
+    # a plan replan_if_needed handed out, indexed by cell
+    def __init__(self, path, goal, algo, version, prefix, near=False):
+        self.path = path
+        self.goal = goal
+        self.algo = algo
+        # grid version the plan was last known clear at
+        self.version = version
+        self.prefix = prefix
+        self.pos = {cell: i for i, cell in enumerate(path)}
+        # cells next to the plan, the only ones a freed cell can shortcut through
+        self.near = {(r + dr, c + dc) for r, c in path
+                     for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1))} if near else ()
+
 
 class Replanner:
-    def __init__(self, grid):
+    def __init__(self, grid, movers=None, horizon=None, landmarks=None, cluster_size=16,
+                 cache_size=128, weight=2.0, shortcuts=True):
         self.grid = grid
+        # optional landmarks.Landmarks for astar (ALT heuristic)
+        self.landmarks = landmarks
+        # scheduled moving obstacles (MovingObstacleManager) for algo="spacetime"
+        self.movers = movers
+        self.horizon = horizon
+        # D* Lite state kept between calls for algo="dstar"
+        self._dstar = None
+        # HPA* abstraction for algo="hpa", built on first use
+        self.cluster_size = cluster_size
+        self.hpa = None
+        # heuristic weight for algo="wastar", starting weight for algo="ara";
+        # bound is the cost / optimum guarantee of the last such plan
+        self.weight = weight
+        self.bound = None
+        # LRU path cache, see _cache_get; cache_size=0 turns it off
+        self.cache_size = cache_size
+        self._cache = OrderedDict()    # (start, goal, algo, fuel) -> (path, cost, prefix, pos)
+        self._on_path = {}             # cell -> cache keys whose path crosses it
+        self._cache_version = grid.version if hasattr(grid, "version") else None
+        self.cache_stats = {"hits": 0, "subpath_hits": 0, "misses": 0,
+                            "evictions": 0, "invalidations": 0}
+        # the plan replan_if_needed last handed out, checked against grid
+        # deltas instead of cell by cell; see _check_plan
+        self._active = None
+        # also replan when a removed obstacle opens a shortcut next to the plan
+        self.shortcuts = shortcuts
+        self.replan_stats = {"checks": 0, "skipped": 0, "rescans": 0,
+                             "blocked": 0, "shortcut": 0, "no_path": 0}
 
-    def plan_path(self, start, goal, algo="astar", fuel_limit=None, time_limit=None):
-        
+    def plan_path(self, start, goal, algo="astar", fuel_limit=None, time_limit=None, timestep=0,
+                  max_nodes=None, stats=None):
+        """
+        Returns (path, cost, nodes_expanded, runtime). time_limit is in
+        seconds and max_nodes caps the expansions for every algo; stats
+        (metrics.SearchStats) is handed to the planner, cache lookups are
+        timed as its "cache" phase.
+        """
         t0 = time.perf_counter()
+        limits = {"fuel_limit": fuel_limit, "time_limit": time_limit, "max_nodes": max_nodes, "stats": stats}
+
+        cached = self.cache_size and algo in CACHEABLE
+        if cached:
+            if stats is None:
+                hit = self._cache_get(start, goal, algo, fuel_limit)
+            else:
+                with stats.phase("cache"):
+                    hit = self._cache_get(start, goal, algo, fuel_limit)
+            if hit is not None:
+                # answered without a search: no nodes expanded
+                return hit[0], hit[1], 0, time.perf_counter() - t0
 
         if algo == "astar":
-            path, cost,_ = astar(self.grid, start, goal,
-                               fuel_limit=fuel_limit, time_limit=time_limit)
+            path, cost, nodes = astar(self.grid, start, goal, heuristic=self.landmarks, **limits)
         elif algo == "ucs":
-            path, cost,_ = ucs(self.grid, start, goal)
+            path, cost, nodes = ucs(self.grid, start, goal, **limits)
         elif algo == "bfs":
-            path, cost,_ = bfs(self.grid, start, goal)
+            path, cost, nodes = bfs(self.grid, start, goal, **limits)
+        elif algo in ("jps", "jps_plus"):
+            fn = jps if algo == "jps" else jps_plus
+            path, cost, nodes = fn(self.grid, start, goal, **limits)
+        elif algo == "wastar":
+            path, cost, nodes = weighted_astar(self.grid, start, goal, weight=self.weight,
+                                               heuristic=self.landmarks, **limits)
+            self.bound = self.weight if path else float("inf")
+        elif algo == "ara":
+            # anytime: keeps improving until time_limit (seconds) runs out
+            path, cost, nodes, self.bound = ara_star(self.grid, start, goal, weight=self.weight,
+                                                     heuristic=self.landmarks, **limits)
+        elif algo == "hpa":
+            path, cost, nodes = self._hpa_plan(start, goal, **limits)
+        elif algo == "dstar":
+            path, cost, nodes = self._dstar_plan(start, goal, **limits)
+        elif algo == "spacetime":
+            # path[i] is the cell at timestep + i (waits repeat a cell)
+            if self.movers is None:
+                raise ValueError("spacetime planning needs Replanner(movers=...)")
+            path, cost, nodes = spacetime_astar(self.grid, start, goal, self.movers, t0=timestep,
+                                                horizon=self.horizon, **limits)
         elif algo == "hill":
-            path, cost, nodes, runtime = self.hill_climb(start, goal,
-                                                         fuel_limit=fuel_limit,
-                                                         time_limit=time_limit)
+            path, cost, nodes, runtime = self.hill_climb(start, goal, **limits)
             return path, cost, nodes, runtime
         else:
             raise ValueError(f"Unknown algorithm: {algo}")
 
+        if cached and path:
+            self._cache_put((start, goal, algo, fuel_limit), path, cost)
+
         t1 = time.perf_counter()
         runtime = t1 - t0
-        nodes = len(path) if path else 0
         return path, cost, nodes, runtime
 
     def replan_if_needed(self, current_path, start, goal,
-                         algo="astar", fuel_limit=None, time_limit=None):
+                         algo="astar", fuel_limit=None, time_limit=None,
+                         changed=None, max_nodes=None, stats=None):
         """
         If path blocked due to new obstacles, replan.
+        changed: cells whose obstacle status flipped since the last call.
+        With algo="dstar" they are fed to the kept D* Lite search so a
+        replan only repairs what changed; without them the kept search
+        can't be trusted and is dropped. algo="hpa" likewise rebuilds
+        only the clusters the changed cells touch.
+
+        When current_path is the plan this method last returned, or what
+        is left of it from start on, only the changed cells are looked at
+        (without changed, the grid's own change log since that plan);
+        other paths are scanned cell by cell. With shortcuts=True a freed
+        cell that joins two cells of the rest of the plan for less than
+        the plan pays between them triggers a replan too.
+        stats records each replan with its reason ("no_path" / "blocked" /
+        "shortcut"); replan_info() counts the skipped checks as well.
+        A path that is still clear comes back as is, with 0 nodes.
         """
-        if not current_path:
-            return self.plan_path(start, goal, algo, fuel_limit, time_limit)
+        if algo == "dstar":
+            if changed is None:
+                self._dstar = None
+            elif self._dstar is not None:
+                self._dstar.update_start(start)
+                self._dstar.update_cells(changed)
+        elif algo == "hpa" and self.hpa is not None:
+            if changed is None:
+                self.hpa = None
+            else:
+                self.hpa.update_cells(changed)
+
+        reason = self._check_plan(current_path, start, goal, algo, changed)
+        if reason is None:
+            self.replan_stats["skipped"] += 1
+            return current_path, None, 0, 0.0
+        self.replan_stats[reason] += 1
+        if stats is not None:
+            stats.replan(reason)
+        if reason == "shortcut":
+            # the cache would hand back the detour this check just beat
+            self._cache_forget(start, goal, algo)
+        res = self.plan_path(start, goal, algo, fuel_limit, time_limit, max_nodes=max_nodes, stats=stats)
+        self._watch(res[0], goal, algo)
+        return res
+
+    # ---------------- plan validity ----------------
+    def _watch(self, path, goal, algo):
+        # cell -> position and cost prefix sums of the plan handed out
+        if not path:
+            self._active = None
+            return
+        prefix = [0]
+        for cell in path[1:]:
+            prefix.append(prefix[-1] + self.grid.get_cost(*cell))
+        self._active = _ActivePlan(path, goal, algo, getattr(self.grid, "version", None), prefix, self.shortcuts)
+
+    def _check_plan(self, path, start, goal, algo, changed):
+        """Why path needs a replan ("no_path" / "blocked" / "shortcut"), or None."""
+        self.replan_stats["checks"] += 1
+        if not path:
+            return "no_path"
+        a = self._active
+        k = None
+        if a is not None and a.goal == goal and a.algo == algo and path[0] == start and path[-1] == goal:
+            # path must be the watched plan from position k on
+            k = a.pos.get(start)
+            if k is not None and len(a.path) - k != len(path):
+                k = None
+        version = getattr(self.grid, "version", None)
+        if k is not None and changed is None and version is not None and hasattr(self.grid, "changed_since"):
+            changed = self.grid.changed_since(a.version)
+        if k is None or changed is None:
+            self.replan_stats["rescans"] += 1
+            if any(self.grid.is_obstacle(x, y) for (x, y) in path):
+                return "blocked"
+            self._watch(path, goal, algo)
+            return None
+        a.version = version
+        shortcut = False
+        pos, near, is_obstacle = a.pos, a.near, self.grid.is_obstacle
+        for cell in changed:
+            i = pos.get(cell)
+            if i is not None:
+                if i >= k and is_obstacle(*cell):
+                    return "blocked"
+            elif not shortcut and cell in near and not is_obstacle(*cell):
+                shortcut = self._shortcut(a, k, cell)
+        return "shortcut" if shortcut else None
+
+    def _shortcut(self, a, k, cell):
+        # the freed cell touches path cells i < j at or after the agent:
+        # stepping i -> cell -> j beats the plan's cost from i to j
+        r, c = cell
+        on = [a.pos[n] for n in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)) if a.pos.get(n, -1) >= k]
+        if len(on) < 2:
+            return False
+        i, j = min(on), max(on)
+        return a.prefix[j] - a.prefix[i] > self.grid.get_cost(*cell) + self.grid.get_cost(*a.path[j])
 
-        for (x, y) in current_path:
-            if self.grid.is_obstacle(x, y):
-                return self.plan_path(start, goal, algo, fuel_limit, time_limit)
+    def replan_info(self):
+        """How many replan_if_needed calls were skipped, rescanned or replanned and why."""
+        return dict(self.replan_stats)
 
-        return current_path, None, len(current_path), 0.0
+    def _dstar_plan(self, start, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+        # grid changes must reach the kept search via replan_if_needed(changed=...)
+        d = self._dstar
+        if d is None or d.goal_cell != goal:
+            d = self._dstar = DStarLite(self.grid, start, goal)
+        d.update_start(start)
+        path, cost, nodes = d.plan(time_limit=time_limit, max_nodes=max_nodes, stats=stats)
+        if fuel_limit is not None and cost > fuel_limit:
+            return [], float("inf"), nodes
+        return path, cost, nodes
+
+    # ---------------- path cache ----------------
+    def _cache_sync(self):
+        """
+        Drop cached paths that a grid change since the last call lies on.
+        Entries are stamped with the grid version they were planned at;
+        grid.changed_since() says which cells moved in between, and
+        anything it can't account for clears the whole cache. Removed
+        obstacles elsewhere leave a cached path valid, if maybe no longer
+        the shortest, same as replan_if_needed.
+        """
+        version = getattr(self.grid, "version", None)
+        if version is not None and version == self._cache_version:
+            return
+        changed = None
+        if version is not None and self._cache_version is not None and hasattr(self.grid, "changed_since"):
+            changed = self.grid.changed_since(self._cache_version)
+        if changed is None:
+            self.cache_stats["invalidations"] += len(self._cache)
+            self._cache.clear()
+            self._on_path.clear()
+        else:
+            for cell in changed:
+                for key in list(self._on_path.get(cell, ())):
+                    self._cache_drop(key)
+                    self.cache_stats["invalidations"] += 1
+        self._cache_version = version
+
+    def _cache_drop(self, key):
+        path = self._cache.pop(key)[0]
+        for cell in path:
+            keys = self._on_path[cell]
+            keys.discard(key)
+            if not keys:
+                del self._on_path[cell]
+
+    def _cache_forget(self, start, goal, algo):
+        # every cached path that could answer start -> goal for algo
+        for key in self._on_path.get(start, set()) & self._on_path.get(goal, set()):
+            if key[2] == algo:
+                self._cache_drop(key)
+                self.cache_stats["invalidations"] += 1
+
+    def _cache_get(self, start, goal, algo, fuel_limit):
+        self._cache_sync()
+        key = (start, goal, algo, fuel_limit)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.cache_stats["hits"] += 1
+            return entry[0], entry[1]
+        if algo in SUBPATH_OK:
+            # a cached path through both start and goal, in that order
+            fuel = fuel_limit if fuel_limit is not None else float("inf")
+            for k in self._on_path.get(start, set()) & self._on_path.get(goal, set()):
+                if k[2] != algo:
+                    continue
+                path, _, prefix, pos = self._cache[k]
+                i, j = pos[start], pos[goal]
+                if i <= j and prefix[j] - prefix[i] <= fuel:
+                    self._cache.move_to_end(k)
+                    self.cache_stats["subpath_hits"] += 1
+                    return path[i:j + 1], prefix[j] - prefix[i]
+        self.cache_stats["misses"] += 1
+        return None
+
+    def _cache_put(self, key, path, cost):
+        if key in self._cache:
+            self._cache_drop(key)
+        prefix = [0]
+        for cell in path[1:]:
+            prefix.append(prefix[-1] + self.grid.get_cost(*cell))
+        self._cache[key] = (path, cost, prefix, {cell: i for i, cell in enumerate(path)})
+        for cell in path:
+            self._on_path.setdefault(cell, set()).add(key)
+        while len(self._cache) > self.cache_size:
+            self._cache_drop(next(iter(self._cache)))
+            self.cache_stats["evictions"] += 1
+
+    def cache_info(self):
+        """Hit / miss / eviction counters plus the current size."""
+        return dict(self.cache_stats, size=len(self._cache), capacity=self.cache_size)
+
+    def _hpa_plan(self, start, goal, fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
+        # a grid edited behind our back (no changed cells) needs a full rebuild
+        if self.hpa is None or self.hpa.version != self.grid.version:
+            self.hpa = HPAStar(self.grid, cluster_size=self.cluster_size)
+        return self.hpa.plan(start, goal, fuel_limit=fuel_limit, time_limit=time_limit,
+                             max_nodes=max_nodes, stats=stats)
 
     # ---------------- local search ----------------
     def heuristic(self, state, goal):
         return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
 
     def hill_climb(self, start, goal, max_steps=100, restarts=5,
-                   fuel_limit=None, time_limit=None):
+                   fuel_limit=None, time_limit=None, max_nodes=None, stats=None):
         """
         Hill climbing with random restarts.
-        Stops if fuel/time exceeded.
+        Stops if fuel/time (seconds) or max_nodes steps are exceeded.
         """
         import random
         best_path = None
@@ -71,6 +355,8 @@ class Replanner:
                     break
                 if time_limit and (time.perf_counter() - t0) > time_limit:
                     break
+                if max_nodes is not None and nodes_expanded >= max_nodes:
+                    break
 
                 neighbors = self.grid.neighbors(*current)
                 if not neighbors:
@@ -80,6 +366,8 @@ class Replanner:
                                  key=lambda n: self.heuristic(n, goal))
                 steps += 1
                 nodes_expanded += 1
+                if stats is not None and stats.trace:
+                    stats.trace(next_state, steps)
                 path.append(next_state)
                 current = next_state
 
@@ -88,5 +376,9 @@ class Replanner:
                 best_path, best_score = path, score
 
         runtime = time.perf_counter() - t0
+        if stats is not None:
+            # no frontier: every step is one expansion and one push
+            stats.add_search(nodes_expanded, nodes_expanded, 0, 1)
+            stats.phases["search"] += runtime
         cost = len(best_path) if best_path else float("inf")
         return best_path, cost, nodes_expanded, runtime
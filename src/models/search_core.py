@@ -0,0 +1,734 @@
+# src/models/search_core.py
+# shared integer-indexed search loop used by bfs / ucs / astar
+from array import array
+from collections import deque
+import heapq
+import time
+
+import numpy as np
+
+from src.data.grid import ArrayGrid
+
+
+def as_array_grid(grid):
+    """
+    Return grid itself if it is an ArrayGrid, otherwise its compact copy.
+
+    The copy is kept on the grid with the version it was taken at; later
+    calls patch the cells grid.changed_since() reports (a fresh copy when
+    the log can't say), so repeated queries on a plain Grid share one copy
+    and its search workspace. Grid.obstacles / Grid.costs are read-only,
+    so every edit goes through a method that moves the version.
+    """
+    if isinstance(grid, ArrayGrid):
+        return grid
+    version = getattr(grid, "version", None)
+    cached = getattr(grid, "_array_grid", None)
+    if cached is not None and version is not None:
+        seen, copy = cached
+        if seen == version:
+            return copy
+        cells = grid.changed_since(seen)
+        if cells is not None:
+            for r, c in cells:
+                if not copy.in_bounds(r, c):
+                    continue
+                if grid.is_obstacle(r, c):
+                    copy.add_obstacle(r, c)
+                else:
+                    copy.remove_obstacle(r, c)
+                copy.add_cost(r, c, grid.get_cost(r, c))
+                if (r, c) in grid.stations:
+                    copy.stations.add((r, c))
+                else:
+                    copy.stations.discard((r, c))
+            grid._array_grid = (version, copy)
+            return copy
+    copy = ArrayGrid.from_grid(grid)
+    if version is not None:
+        grid._array_grid = (version, copy)
+    return copy
+
+
+class SearchWorkspace:
+    """
+    Per-grid scratch arrays reused across queries.
+
+    Each query gets two stamps, open = 2*gen and closed = 2*gen + 1.
+    g / parent are only meaningful where state[i] >= open, so starting a
+    new query is just gen += 1 instead of clearing millions of entries.
+    """
+
+    MAX_GEN = 0x7FFFFFFE
+
+    def __init__(self, size):
+        self.size = size
+        self.g = array("q", bytes(8 * size))
+        self.parent = array("q", bytes(8 * size))
+        self.state = array("I", bytes(4 * size))
+        self.gen = 0
+
+    def next_generation(self):
+        self.gen += 1
+        if self.gen > self.MAX_GEN:
+            # stamps ran out: clear once and start over
+            self.state = array("I", bytes(4 * self.size))
+            self.gen = 1
+        return 2 * self.gen, 2 * self.gen + 1
+
+
+def workspace_for(grid, slot="_search_ws"):
+    # a second slot gives searches that need two sets of arrays
+    # (e.g. bidirectional) their own
+    ws = getattr(grid, slot, None)
+    if ws is None or ws.size != grid.size:
+        ws = SearchWorkspace(grid.size)
+        setattr(grid, slot, ws)
+    return ws
+
+
+# with a time_limit the clock is read once every CHECK_EVERY expansions
+CHECK_EVERY = 256
+# ucs uses bucket queues up to this max cell cost, a heap above it
+DIAL_MAX_COST = 1024
+
+
+def budget(time_limit, max_nodes, default):
+    """
+    (check, max_nodes, deadline) for an expansion loop. The loop only
+    compares its count against check; past it, it gives up if the count
+    is over max_nodes or the clock is past deadline, else moves check on
+    by CHECK_EVERY (see search below).
+    """
+    max_nodes = max_nodes if max_nodes is not None else default
+    if time_limit is None:
+        return max_nodes, max_nodes, float("inf")
+    return min(CHECK_EVERY, max_nodes), max_nodes, time.perf_counter() + time_limit
+
+
+def unwind(grid, parent, start_i, goal_i):
+    """Follow parent links from goal_i back to start_i, as (r, c) cells."""
+    path = []
+    i = goal_i
+    while True:
+        path.append(grid.coord(i))
+        if i == start_i:
+            break
+        i = parent[i]
+    path.reverse()
+    return path
+
+
+def search(grid, start, goal, mode="astar", fuel_limit=None, time_limit=None, heuristic=None,
+           max_nodes=None, stats=None):
+    """
+    mode: "bfs" (FIFO), "ucs" (g) or "astar" (g + manhattan).
+    heuristic: optional object for astar with estimator(grid, goal)
+               returning (h, hmax), h a function of a flat index, or None
+               to fall back to manhattan (see landmarks.Landmarks).
+    time_limit: seconds of wall time; max_nodes: cap on expansions.
+    stats: optional metrics.SearchStats, filled by an instrumented copy
+           of the loop so the plain loops below pay nothing for it.
+    Returns (path, cost, nodes_expanded) like the public planners.
+    """
+    grid = as_array_grid(grid)
+    ws = workspace_for(grid)
+    opened, closed = ws.next_generation()
+    mask, cost = grid.buffers()
+    g, parent, state = ws.g, ws.parent, ws.state
+    stride = grid.stride
+
+    s = grid.index(*start)
+    t = grid.index(*goal)
+    g[s] = 0
+    parent[s] = s
+    state[s] = opened
+    nodes_expanded = 0
+    found = False
+    # plain ints compare faster than "is not None and" on every step
+    check, max_nodes, deadline = budget(time_limit, max_nodes, grid.size + 1)
+    fuel = fuel_limit if fuel_limit is not None else 1 << 62
+
+    est = heuristic.estimator(grid, goal) if heuristic is not None and mode == "astar" else None
+
+    dial = None
+    if mode == "ucs":
+        lo, hi = grid.cost_range()
+        if lo == hi == 1:
+            # every step costs 1, so FIFO order already pops cells by g
+            mode = "bfs"
+        elif hi <= DIAL_MAX_COST:
+            dial = [[] for _ in range(hi + 1)]
+
+    if stats is not None:
+        return _search_stats(grid, ws, s, t, mode, est, fuel, (check, max_nodes, deadline), stats, dial)
+
+    if mode == "bfs" and fuel_limit is None:
+        # nothing to prune on, so g isn't kept during the search; the cost
+        # is summed back along the parent links at the end
+        q = deque([s])
+        pop, push = q.popleft, q.append
+        while q:
+            i = pop()
+            nodes_expanded += 1
+            if nodes_expanded > check:
+                if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                    return [], float("inf"), nodes_expanded
+                check = min(check + CHECK_EVERY, max_nodes)
+            if i == t:
+                total, j = 0, t
+                while j != s:
+                    total += cost[j]
+                    j = parent[j]
+                return unwind(grid, parent, s, t), total, nodes_expanded
+            j = i + stride
+            if not mask[j] and state[j] != opened:
+                state[j] = opened
+                parent[j] = i
+                push(j)
+            j = i - stride
+            if not mask[j] and state[j] != opened:
+                state[j] = opened
+                parent[j] = i
+                push(j)
+            j = i + 1
+            if not mask[j] and state[j] != opened:
+                state[j] = opened
+                parent[j] = i
+                push(j)
+            j = i - 1
+            if not mask[j] and state[j] != opened:
+                state[j] = opened
+                parent[j] = i
+                push(j)
+    elif mode == "bfs":
+        q = deque([s])
+        pop, push = q.popleft, q.append
+        while q:
+            i = pop()
+            nodes_expanded += 1
+            if nodes_expanded > check:
+                if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                    return [], float("inf"), nodes_expanded
+                check = min(check + CHECK_EVERY, max_nodes)
+            if i == t:
+                found = True
+                break
+            gi = g[i]
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j] or state[j] == opened:
+                    continue
+                nc = gi + cost[j]
+                if nc > fuel:
+                    continue
+                state[j] = opened
+                g[j] = nc
+                parent[j] = i
+                push(j)
+    elif mode == "ucs" and dial:
+        # small integer costs: a ring of max cost + 1 buckets (Dial's
+        # algorithm) instead of a heap; bucket d % nb holds cells queued at g = d
+        nb = len(dial)
+        pending = 1
+        dial[0].append(s)
+        d = 0
+        while pending and not found:
+            b = dial[d % nb]
+            while b:
+                i = b.pop()
+                pending -= 1
+                if state[i] == closed:
+                    continue
+                state[i] = closed
+                nodes_expanded += 1
+                if nodes_expanded > check:
+                    if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                        return [], float("inf"), nodes_expanded
+                    check = min(check + CHECK_EVERY, max_nodes)
+                if i == t:
+                    found = True
+                    break
+                for j in (i + stride, i - stride, i + 1, i - 1):
+                    if mask[j]:
+                        continue
+                    nc = d + cost[j]
+                    if nc > fuel:
+                        continue
+                    if state[j] < opened or nc < g[j]:
+                        state[j] = opened
+                        g[j] = nc
+                        parent[j] = i
+                        dial[nc % nb].append(j)
+                        pending += 1
+            d += 1
+    elif mode == "ucs":
+        # heap entries are one packed int: g << shift | index
+        shift = grid.size.bit_length()
+        low = (1 << shift) - 1
+        heap = [s]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while heap:
+            i = heappop(heap) & low
+            if state[i] == closed:
+                continue
+            state[i] = closed
+            nodes_expanded += 1
+            if nodes_expanded > check:
+                if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                    return [], float("inf"), nodes_expanded
+                check = min(check + CHECK_EVERY, max_nodes)
+            if i == t:
+                found = True
+                break
+            gi = g[i]
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j]:
+                    continue
+                nc = gi + cost[j]
+                if nc > fuel:
+                    continue
+                if state[j] < opened or nc < g[j]:
+                    state[j] = opened
+                    g[j] = nc
+                    parent[j] = i
+                    heappush(heap, (nc << shift) | j)
+    elif est is not None:
+        # same packing as plain astar below, h comes from the estimator
+        hfun, hmax = est
+        shift = grid.size.bit_length()
+        low = (1 << shift) - 1
+        hbits = max(hmax, 1).bit_length()
+        h = hfun(s)
+        heap = [(((h << hbits) | h) << shift) | s]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while heap:
+            i = heappop(heap) & low
+            if state[i] == closed:
+                continue
+            state[i] = closed
+            nodes_expanded += 1
+            if nodes_expanded > check:
+                if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                    return [], float("inf"), nodes_expanded
+                check = min(check + CHECK_EVERY, max_nodes)
+            if i == t:
+                found = True
+                break
+            gi = g[i]
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j]:
+                    continue
+                nc = gi + cost[j]
+                if nc > fuel:
+                    continue
+                if state[j] < opened or nc < g[j]:
+                    state[j] = opened
+                    g[j] = nc
+                    parent[j] = i
+                    hj = hfun(j)
+                    heappush(heap, ((((nc + hj) << hbits) | hj) << shift) | j)
+    else:
+        # packed as ((f << hbits) | h) << shift | index, so ties on f go to
+        # the smaller h (the deeper node) and then to the lower index
+        shift = grid.size.bit_length()
+        low = (1 << shift) - 1
+        tr, tc = divmod(t, stride)
+        hbits = (grid.rows + grid.cols).bit_length()
+        hmask = (1 << hbits) - 1
+        h = abs(s // stride - tr) + abs(s % stride - tc)
+        heap = [(((h << hbits) | h) << shift) | s]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while heap:
+            key = heappop(heap)
+            i = key & low
+            if state[i] == closed:
+                continue
+            state[i] = closed
+            nodes_expanded += 1
+            if nodes_expanded > check:
+                if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                    return [], float("inf"), nodes_expanded
+                check = min(check + CHECK_EVERY, max_nodes)
+            if i == t:
+                found = True
+                break
+            gi = g[i]
+            # each move changes the manhattan distance by exactly one
+            h = (key >> shift) & hmask
+            r, c = divmod(i, stride)
+            for j, hj in ((i + stride, h - 1 if r < tr else h + 1),
+                          (i - stride, h - 1 if r > tr else h + 1),
+                          (i + 1, h - 1 if c < tc else h + 1),
+                          (i - 1, h - 1 if c > tc else h + 1)):
+                if mask[j]:
+                    continue
+                nc = gi + cost[j]
+                if nc > fuel:
+                    continue
+                # closed cells can still improve (reopen) when zero-cost
+                # terrain makes manhattan inconsistent
+                if state[j] < opened or nc < g[j]:
+                    state[j] = opened
+                    g[j] = nc
+                    parent[j] = i
+                    heappush(heap, ((((nc + hj) << hbits) | hj) << shift) | j)
+
+    if not found:
+        return [], float("inf"), nodes_expanded
+    return unwind(grid, parent, s, t), g[t], nodes_expanded
+
+
+def _search_stats(grid, ws, s, t, mode, est, fuel, limits, stats, dial=None):
+    """
+    search() with counters and trace hooks. Same keys and tie-breaking as
+    the plain loops, so it expands the same cells in the same order.
+    """
+    opened, closed = 2 * ws.gen, 2 * ws.gen + 1
+    mask, cost = grid.buffers()
+    g, parent, state = ws.g, ws.parent, ws.state
+    stride = grid.stride
+    check, max_nodes, deadline = limits
+    trace = stats.trace
+    expanded = pushes = stale = peak = 0
+    found = aborted = False
+
+    with stats.phase("search"):
+        if mode == "bfs":
+            q = deque([s])
+            pushes = 1
+            while q:
+                if len(q) > peak:
+                    peak = len(q)
+                i = q.popleft()
+                expanded += 1
+                if expanded > check:
+                    if expanded > max_nodes or time.perf_counter() > deadline:
+                        aborted = True
+                        break
+                    check = min(check + CHECK_EVERY, max_nodes)
+                gi = g[i]
+                if trace:
+                    trace(grid.coord(i), gi)
+                if i == t:
+                    found = True
+                    break
+                for j in (i + stride, i - stride, i + 1, i - 1):
+                    if mask[j] or state[j] == opened:
+                        continue
+                    nc = gi + cost[j]
+                    if nc > fuel:
+                        continue
+                    state[j] = opened
+                    g[j] = nc
+                    parent[j] = i
+                    q.append(j)
+                    pushes += 1
+        elif mode == "ucs" and dial:
+            nb = len(dial)
+            pending = pushes = 1
+            dial[0].append(s)
+            d = 0
+            while pending and not found and not aborted:
+                b = dial[d % nb]
+                while b:
+                    if pending > peak:
+                        peak = pending
+                    i = b.pop()
+                    pending -= 1
+                    if state[i] == closed:
+                        stale += 1
+                        continue
+                    state[i] = closed
+                    expanded += 1
+                    if expanded > check:
+                        if expanded > max_nodes or time.perf_counter() > deadline:
+                            aborted = True
+                            break
+                        check = min(check + CHECK_EVERY, max_nodes)
+                    if trace:
+                        trace(grid.coord(i), d)
+                    if i == t:
+                        found = True
+                        break
+                    for j in (i + stride, i - stride, i + 1, i - 1):
+                        if mask[j]:
+                            continue
+                        nc = d + cost[j]
+                        if nc > fuel:
+                            continue
+                        if state[j] < opened or nc < g[j]:
+                            state[j] = opened
+                            g[j] = nc
+                            parent[j] = i
+                            dial[nc % nb].append(j)
+                            pending += 1
+                            pushes += 1
+                d += 1
+        else:
+            if mode == "ucs":
+                # ucs keys are astar keys with h = 0
+                hbits = 0
+
+                def hfun(j):
+                    return 0
+            elif est is not None:
+                hfun, hmax = est
+                hbits = max(hmax, 1).bit_length()
+            else:
+                tr, tc = divmod(t, stride)
+                hbits = (grid.rows + grid.cols).bit_length()
+
+                def hfun(j):
+                    return abs(j // stride - tr) + abs(j % stride - tc)
+            shift = grid.size.bit_length()
+            low = (1 << shift) - 1
+            h = hfun(s)
+            heap = [(((h << hbits) | h) << shift) | s]
+            pushes = 1
+            heappush, heappop = heapq.heappush, heapq.heappop
+            while heap:
+                if len(heap) > peak:
+                    peak = len(heap)
+                i = heappop(heap) & low
+                if state[i] == closed:
+                    stale += 1
+                    continue
+                state[i] = closed
+                expanded += 1
+                if expanded > check:
+                    if expanded > max_nodes or time.perf_counter() > deadline:
+                        aborted = True
+                        break
+                    check = min(check + CHECK_EVERY, max_nodes)
+                gi = g[i]
+                if trace:
+                    trace(grid.coord(i), gi)
+                if i == t:
+                    found = True
+                    break
+                for j in (i + stride, i - stride, i + 1, i - 1):
+                    if mask[j]:
+                        continue
+                    nc = gi + cost[j]
+                    if nc > fuel:
+                        continue
+                    if state[j] < opened or nc < g[j]:
+                        state[j] = opened
+                        g[j] = nc
+                        parent[j] = i
+                        hj = hfun(j)
+                        heappush(heap, ((((nc + hj) << hbits) | hj) << shift) | j)
+                        pushes += 1
+    stats.add_search(expanded, pushes, stale, peak)
+
+    if aborted or not found:
+        return [], float("inf"), expanded
+    with stats.phase("unwind"):
+        path = unwind(grid, parent, s, t)
+    return path, g[t], expanded
+
+
+class SearchTree:
+    """
+    What one sweep() leaves behind: the cost of every target and a copy of
+    the parent links, from which paths are only built when asked for.
+    Forward trees run root -> target, reverse trees target -> root.
+    """
+
+    def __init__(self, grid, root, reverse, parent, costs, nodes):
+        self.grid = grid
+        self.root = root
+        self.reverse = reverse
+        self.parent = parent
+        self.costs = costs
+        self.nodes = nodes
+
+    def cost(self, cell):
+        return self.costs.get(cell, float("inf"))
+
+    def path(self, cell):
+        """Path between root and cell, [] if cell was not reached."""
+        if self.costs.get(cell, float("inf")) == float("inf"):
+            return []
+        grid, parent = self.grid, self.parent
+        r = grid.index(*self.root)
+        if self.reverse:
+            # parent links point towards the goal, so this is already in order
+            i = grid.index(*cell)
+            path = [cell]
+            while i != r:
+                i = parent[i]
+                path.append(grid.coord(i))
+            return path
+        return unwind(grid, parent, r, grid.index(*cell))
+
+    def paths(self):
+        """(target, path) for every reached target, built one at a time."""
+        for cell, c in self.costs.items():
+            if c != float("inf"):
+                yield cell, self.path(cell)
+
+
+def sweep(grid, root, targets, reverse=False, fuel_limit=None, time_limit=None, max_nodes=None,
+          stats=None):
+    """
+    One Dijkstra from root that stops once every cell in targets is
+    settled. reverse=True treats root as the goal and targets as starts:
+    costs are paid on entering a cell, so stepping back from a settled
+    cell i costs cost[i], and a start may sit on an obstacle, like in
+    search(). The budget and stats work as in search(); cut short, the
+    targets not settled yet stay at inf. Returns a SearchTree.
+    """
+    grid = as_array_grid(grid)
+    ws = workspace_for(grid)
+    opened, closed = ws.next_generation()
+    mask, cost = grid.buffers()
+    g, parent, state = ws.g, ws.parent, ws.state
+    stride = grid.stride
+
+    want = {}
+    for cell in targets:
+        if grid.in_bounds(*cell):
+            want.setdefault(grid.index(*cell), []).append(cell)
+    dist = {cell: float("inf") for cell in targets}
+    remaining = len(want)
+    # blocked starts of a reverse sweep are reached but never expanded
+    leaves = {i for i in want if mask[i]} if reverse else ()
+
+    s = grid.index(*root)
+    g[s] = 0
+    parent[s] = s
+    state[s] = opened
+    fuel = fuel_limit if fuel_limit is not None else 1 << 62
+    check, max_nodes, deadline = budget(time_limit, max_nodes, grid.size + 1)
+    track = stats is not None
+    phase = stats.start_phase("search") if track else None
+    trace = stats.trace if track else None
+    nodes = stale = peak = pushes = 0
+
+    if grid.unit_cost():
+        # every step costs 1: FIFO order settles cells by g already
+        q = deque([s])
+        pop, push = q.popleft, q.append
+        while q and remaining:
+            if track and len(q) > peak:
+                peak = len(q)
+            i = pop()
+            nodes += 1
+            if nodes > check:
+                if nodes > max_nodes or time.perf_counter() > deadline:
+                    break
+                check = min(check + CHECK_EVERY, max_nodes)
+            gi = g[i]
+            if trace:
+                trace(grid.coord(i), gi)
+            if i in want:
+                for cell in want[i]:
+                    dist[cell] = gi
+                remaining -= 1
+            if mask[i] and (reverse or i != s):
+                continue
+            if gi + 1 > fuel:
+                continue
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if state[j] == opened or (mask[j] and j not in leaves):
+                    continue
+                state[j] = opened
+                g[j] = gi + 1
+                parent[j] = i
+                push(j)
+                pushes += 1
+    else:
+        shift = grid.size.bit_length()
+        low = (1 << shift) - 1
+        heap = [s]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while heap and remaining:
+            if track and len(heap) > peak:
+                peak = len(heap)
+            i = heappop(heap) & low
+            if state[i] == closed:
+                stale += 1
+                continue
+            state[i] = closed
+            nodes += 1
+            if nodes > check:
+                if nodes > max_nodes or time.perf_counter() > deadline:
+                    break
+                check = min(check + CHECK_EVERY, max_nodes)
+            gi = g[i]
+            if trace:
+                trace(grid.coord(i), gi)
+            if i in want:
+                for cell in want[i]:
+                    dist[cell] = gi
+                remaining -= 1
+            if mask[i] and (reverse or i != s):
+                continue
+            step = gi + cost[i]
+            for j in (i + stride, i - stride, i + 1, i - 1):
+                if mask[j] and j not in leaves:
+                    continue
+                nc = step if reverse else gi + cost[j]
+                if nc > fuel:
+                    continue
+                if state[j] < opened or nc < g[j]:
+                    state[j] = opened
+                    g[j] = nc
+                    parent[j] = i
+                    heappush(heap, (nc << shift) | j)
+                    pushes += 1
+
+    if track:
+        stats.add_search(nodes, pushes + 1, stale, peak)
+        stats.end_phase(phase)
+    # the workspace is reused by the next query, the tree keeps its own links
+    return SearchTree(grid, root, reverse, parent[:], dist, nodes)
+
+
+def dijkstra_many(grid, source, targets):
+    """
+    One Dijkstra sweep from source that stops once every target is settled.
+    Returns {target: cost}, inf for targets that can't be reached.
+    """
+    return sweep(grid, source, targets).costs
+
+
+UNREACHED = 0xFFFFFFFF
+
+
+def distance_field(grid, source):
+    """
+    Full Dijkstra from source. Returns a uint32 numpy array over the padded
+    flat indices of as_array_grid(grid), UNREACHED where there is no path.
+    """
+    grid = as_array_grid(grid)
+    ws = workspace_for(grid)
+    opened, closed = ws.next_generation()
+    mask, cost = grid.buffers()
+    g, state = ws.g, ws.state
+    stride = grid.stride
+    s = grid.index(*source)
+    g[s] = 0
+    state[s] = opened
+    shift = grid.size.bit_length()
+    low = (1 << shift) - 1
+    heap = [s]
+    heappush, heappop = heapq.heappush, heapq.heappop
+    while heap:
+        i = heappop(heap) & low
+        if state[i] == closed:
+            continue
+        state[i] = closed
+        gi = g[i]
+        for j in (i + stride, i - stride, i + 1, i - 1):
+            if mask[j]:
+                continue
+            nc = gi + cost[j]
+            if state[j] < opened or nc < g[j]:
+                state[j] = opened
+                g[j] = nc
+                heappush(heap, (nc << shift) | j)
+    reached = np.frombuffer(ws.state, dtype=np.uint32) == closed
+    gv = np.frombuffer(ws.g, dtype=np.int64)
+    return np.where(reached, gv, UNREACHED).astype(np.uint32)
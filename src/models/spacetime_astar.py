@@ -0,0 +1,140 @@
+# src/models/spacetime_astar.py
+# A* over (cell, t) states that plans around scheduled moving obstacles
+import heapq
+import time
+
+from .search_core import CHECK_EVERY, as_array_grid, budget
+
+
+def spacetime_astar(grid, start, goal, movers, t0=0, horizon=None,
+                    wait_cost=1, swap_check=True, fuel_limit=None, time_limit=None,
+                    max_nodes=None, stats=None):
+    """
+    Plan from start at timestep t0 so the agent never shares a cell with a
+    moving obstacle (and, with swap_check, never swaps cells with one).
+
+    movers     : MovingObstacleManager, queried through position_at(t)
+    horizon    : only the next `horizon` steps are checked against movers;
+                 past that the search is plain A* on the static grid
+    wait_cost  : cost of staying put for one step
+
+    Occupancy is periodic after movers.cycle() settles, so times past the
+    settle point are folded into one period and the state space stays
+    finite even with no horizon.
+
+    time_limit / max_nodes / stats as in search_core.search.
+    Returns (path, cost, nodes_expanded); path[i] is the cell at t0 + i,
+    so waits show up as repeated cells.
+    """
+    grid = as_array_grid(grid)
+    mask, cost = grid.buffers()
+    stride = grid.stride
+    size = grid.size
+    settle, period = movers.cycle()
+    end = t0 + horizon if horizon is not None else None
+
+    def layer(t):
+        # folded time; -1 is the static layer past the horizon
+        if end is not None and t >= end:
+            return -1
+        if t >= settle:
+            return settle + (t - settle) % period
+        return t
+
+    occ_cache = {}
+
+    def occupancy(t):
+        lt = layer(t)
+        if lt not in occ_cache:
+            cells = set()
+            moves = set()
+            for o in movers.obstacles:
+                p = o.position_at(t)
+                if p is None or not grid.in_bounds(*p):
+                    continue
+                a = grid.index(*p)
+                cells.add(a)
+                q = o.position_at(t + 1)
+                if q is not None and grid.in_bounds(*q):
+                    moves.add((a, grid.index(*q)))
+            occ_cache[lt] = (cells, moves)
+        return occ_cache[lt]
+
+    s = grid.index(*start)
+    goal_i = grid.index(*goal)
+    gr, gc = goal
+
+    def h(i):
+        r, c = divmod(i, stride)
+        return abs(r - 1 - gr) + abs(c - 1 - gc)
+
+    fuel = fuel_limit if fuel_limit is not None else float("inf")
+    check, max_nodes, deadline = budget(time_limit, max_nodes, float("inf"))
+    key0 = layer(t0) * size + s if layer(t0) >= 0 else -1 - s
+    best = {key0: 0}
+    parent = {key0: None}
+    heap = [(h(s), h(s), t0, key0)]
+    closed = set()
+    nodes_expanded = stale = peak = 0
+    track = stats is not None
+    trace = stats.trace if track else None
+    phase = stats.start_phase("search") if track else None
+
+    def done(path, total):
+        if track:
+            stats.add_search(nodes_expanded, nodes_expanded + stale + len(heap), stale, peak)
+            stats.end_phase(phase)
+        return path, total, nodes_expanded
+
+    while heap:
+        if track and len(heap) > peak:
+            peak = len(heap)
+        _, _, t, key = heapq.heappop(heap)
+        if key in closed:
+            stale += 1
+            continue
+        closed.add(key)
+        nodes_expanded += 1
+        if nodes_expanded > check:
+            if nodes_expanded > max_nodes or time.perf_counter() > deadline:
+                return done([], float("inf"))
+            check = min(check + CHECK_EVERY, max_nodes)
+        i = key % size if key >= 0 else -1 - key
+        if trace:
+            trace(grid.coord(i), best[key])
+        if i == goal_i:
+            total = best[key]
+            path = []
+            while key is not None:
+                path.append(grid.coord(key % size if key >= 0 else -1 - key))
+                key = parent[key]
+            path.reverse()
+            return done(path, total)
+
+        gi = best[key]
+        nt = t + 1
+        lt = layer(nt)
+        if lt >= 0:
+            moves = occupancy(t)[1]
+            occ_next = occupancy(nt)[0]
+        else:
+            moves, occ_next = (), ()
+        for j in (i, i + stride, i - stride, i + 1, i - 1):
+            if mask[j] or j in occ_next:
+                continue
+            if swap_check and j != i and (j, i) in moves:
+                continue
+            nc = gi + (wait_cost if j == i else cost[j])
+            if nc > fuel:
+                continue
+            nkey = lt * size + j if lt >= 0 else -1 - j
+            if nkey in closed:
+                continue
+            if nkey not in best or nc < best[nkey]:
+                best[nkey] = nc
+                parent[nkey] = key
+                hj = h(j)
+                heapq.heappush(heap, (nc + hj, hj, nt, nkey))
+
+    return done([], float("inf"))
+
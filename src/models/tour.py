@@ -0,0 +1,249 @@
+# src/models/tour.py
+# multi-package delivery: distance matrix over stops + TSP-style ordering
+from concurrent.futures import ProcessPoolExecutor
+
+from .astar import astar
+from .search_core import as_array_grid, dijkstra_many
+
+INF = float("inf")
+# fewer new stops than this are searched in-process: not worth the round trip
+PARALLEL_MIN = 4
+
+# per-worker grid, set once by the pool initializer
+_worker_grid = None
+
+
+def _init_worker(grid):
+    global _worker_grid
+    _worker_grid = grid
+
+
+def _worker_row(source, targets):
+    return source, dijkstra_many(_worker_grid, source, targets)
+
+
+class DistanceMatrix:
+    """
+    Shortest-path costs between stop cells, one Dijkstra row per source.
+
+    Rows are cached per source and dropped when grid.version changes.
+    Adding a stop costs one search: because a cell's cost is paid on
+    entry, d(a, b) = d(b, a) + cost(b) - cost(a), so the new stop's row
+    also fills in everyone else's column.
+
+    With workers > 1, batches of at least PARALLEL_MIN new stops are
+    searched on a process pool that lives as long as the matrix (or
+    until the grid changes, since the workers hold a copy); close() or a
+    with block shuts it down.
+    """
+
+    def __init__(self, grid, workers=1):
+        self.source = grid
+        self.grid = as_array_grid(grid)
+        self.workers = workers
+        self.rows = {}
+        self.version = grid.version
+        self.searches = 0
+        self.pool = None
+
+    def _refresh(self):
+        if self.source.version != self.version:
+            self.rows.clear()
+            if self.grid is not self.source:
+                self.grid = as_array_grid(self.source)
+            self.version = self.source.version
+            self.close()
+
+    def _pool(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.grid,))
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_stops(self, cells):
+        self._refresh()
+        new = [c for c in dict.fromkeys(cells) if c not in self.rows]
+        if not new:
+            return
+        old = list(self.rows)
+        targets = old + new
+        if self.workers > 1 and len(new) >= PARALLEL_MIN:
+            results = list(self._pool().map(_worker_row, new, [targets] * len(new)))
+        else:
+            results = [(c, dijkstra_many(self.grid, c, targets)) for c in new]
+        self.searches += len(new)
+        for c, row in results:
+            self.rows[c] = row
+        # mirror the new rows into the old ones
+        for c in new:
+            cc = self.grid.get_cost(*c)
+            for o in old:
+                d = self.rows[c][o]
+                self.rows[o][c] = d + cc - self.grid.get_cost(*o) if d != INF else INF
+
+    def dist(self, a, b):
+        return self.rows[a][b]
+
+
+def _feasible(tour, pairs):
+    """pairs: (pickup, drop) cells; every pickup must come before its drop."""
+    pos = {c: i for i, c in enumerate(tour)}
+    return all(pos[p] < pos[q] for p, q in pairs)
+
+
+def nearest_insertion(depot, stops, d, pairs, closed=False):
+    tour = [depot, depot] if closed else [depot]
+    needs = {}
+    for p, q in pairs:
+        needs.setdefault(q, set()).add(p)
+    todo = [x for x in dict.fromkeys(stops) if x != depot]
+    # distance from the tour to each stop, updated as stops go in
+    near = {x: d(depot, x) for x in todo}
+    while todo:
+        placed = set(tour)
+        # pickups first; a cyclic pickup/drop chain can't be honoured anyway
+        ready = [x for x in todo if needs.get(x, set()) <= placed] or todo
+        x = min(ready, key=near.__getitem__)
+        # after its pickups; on a cycle some of them aren't in the tour yet
+        lo = max((tour.index(p) for p in needs.get(x, ()) if p in placed), default=0) + 1
+        best, at = INF, None
+        for i in range(lo, len(tour) + (0 if closed else 1)):
+            prev = tour[i - 1]
+            if i < len(tour):
+                delta = d(prev, x) + d(x, tour[i]) - d(prev, tour[i])
+            else:
+                delta = d(prev, x)
+            if delta < best:
+                best, at = delta, i
+        tour.insert(at, x)
+        todo.remove(x)
+        for y in todo:
+            near[y] = min(near[y], d(x, y), d(y, x))
+    return tour
+
+
+def two_opt(tour, d, pairs, closed=False):
+    """Reverse tour[i..j] while it helps; the depot ends stay put."""
+    n = len(tour)
+    last = n - 2 if closed else n - 1
+    improved = True
+    while improved:
+        improved = False
+        # prefix sums of forward / backward leg costs, for O(1) segment costs
+        fwd, rev = [0], [0]
+        for a, b in zip(tour, tour[1:]):
+            fwd.append(fwd[-1] + d(a, b))
+            rev.append(rev[-1] + d(b, a))
+        for i in range(1, last):
+            for j in range(i + 1, last + 1):
+                a, b, c = tour[i - 1], tour[i], tour[j]
+                delta = d(a, c) - d(a, b) + (rev[j] - rev[i]) - (fwd[j] - fwd[i])
+                if j + 1 < n:
+                    e = tour[j + 1]
+                    delta += d(b, e) - d(c, e)
+                if delta < 0:
+                    cand = tour[:i] + tour[i:j + 1][::-1] + tour[j + 1:]
+                    if _feasible(cand, pairs):
+                        tour = cand
+                        improved = True
+                        break
+            if improved:
+                break
+    return tour
+
+
+def or_opt(tour, d, pairs, closed=False):
+    """Move runs of 1-3 stops to a better spot, keeping their order."""
+    improved = True
+    while improved:
+        improved = False
+        n = len(tour)
+        end = n - 1 if closed else n
+        for k in (1, 2, 3):
+            for i in range(1, end - k + 1):
+                seg = tour[i:i + k]
+                first, last = seg[0], seg[-1]
+                prev = tour[i - 1]
+                if i + k < n:
+                    nxt = tour[i + k]
+                    gain = d(prev, first) + d(last, nxt) - d(prev, nxt)
+                else:
+                    gain = d(prev, first)
+                rest = tour[:i] + tour[i + k:]
+                for j in range(1, len(rest) + (0 if closed else 1)):
+                    if j == i:
+                        continue
+                    a = rest[j - 1]
+                    if j < len(rest):
+                        add = d(a, first) + d(last, rest[j]) - d(a, rest[j])
+                    else:
+                        add = d(a, first)
+                    if add - gain < 0:
+                        cand = rest[:j] + seg + rest[j:]
+                        if _feasible(cand, pairs):
+                            tour = cand
+                            improved = True
+                            break
+                if improved:
+                    break
+            if improved:
+                break
+    return tour
+
+
+def plan_tour(grid, depot, packages, return_to_depot=False, workers=1, matrix=None):
+    """
+    Order the stops for a set of packages and stitch the legs together.
+
+    packages : each item is a drop cell (picked up at the depot) or a
+               (pickup, drop) pair; pickups are visited before drops
+    matrix   : DistanceMatrix to reuse between calls (rows are cached)
+
+    Returns (path, cost, order) where order is the visiting order of the
+    stop cells, starting at the depot.
+    """
+    if matrix is None:
+        # a matrix of our own: its worker pool goes away with this call
+        with DistanceMatrix(grid, workers=workers) as matrix:
+            return plan_tour(grid, depot, packages, return_to_depot, matrix=matrix)
+    pairs = []
+    stops = []
+    for p in packages:
+        if len(p) == 2 and isinstance(p[0], (tuple, list)):
+            pick, drop = tuple(p[0]), tuple(p[1])
+            stops += [pick, drop]
+            if pick != drop and pick != depot:
+                pairs.append((pick, drop))
+        else:
+            stops.append(tuple(p))
+
+    matrix.add_stops([depot] + stops)
+    d = matrix.dist
+    # don't try to order stops we can't reach at all
+    if any(d(depot, s) == INF for s in stops):
+        return [], INF, []
+
+    tour = nearest_insertion(depot, stops, d, pairs, closed=return_to_depot)
+    tour = two_opt(tour, d, pairs, closed=return_to_depot)
+    tour = or_opt(tour, d, pairs, closed=return_to_depot)
+
+    path = [depot]
+    cost = 0
+    for a, b in zip(tour, tour[1:]):
+        leg, c, _ = astar(matrix.grid, a, b)
+        if not leg:
+            return [], INF, tour
+        path += leg[1:]
+        cost += c
+    return path, cost, tour
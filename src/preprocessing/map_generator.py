@@ -0,0 +1,283 @@
+# src/preprocessing/map_generator.py
+# seeded procedural maps (random, maze, urban, terrain) + mover schedules
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.data.grid import ArrayGrid
+from src.preprocessing.map_loader import BINARY_SUFFIX, save_binary_map
+
+KINDS = ("random", "maze", "urban", "terrain")
+
+
+def _corridor(blocked, start, goal, rng):
+    """Clear a random monotone staircase from start to goal so the pair is
+    always connected, whatever the generator left in between."""
+    (r, c), (gr, gc) = start, goal
+    dr = 1 if gr >= r else -1
+    dc = 1 if gc >= c else -1
+    moves = np.array([0] * abs(gr - r) + [1] * abs(gc - c), dtype=np.int8)
+    rng.shuffle(moves)
+    rs = r + dr * np.concatenate(([0], np.cumsum(moves == 0)))
+    cs = c + dc * np.concatenate(([0], np.cumsum(moves == 1)))
+    blocked[rs, cs] = False
+
+
+def _finish(blocked, costs, start, goal):
+    blocked[start] = blocked[goal] = False
+    grid = ArrayGrid(*blocked.shape)
+    grid.set_obstacle_mask(blocked)
+    if costs is not None:
+        # the text format has no cost under S / G
+        costs[start] = costs[goal] = 1
+        grid.set_costs(costs)
+    return grid, start, goal
+
+
+def random_map(rows, cols, density=0.25, seed=0):
+    """Independent obstacles with probability density, corners connected."""
+    rng = np.random.default_rng(seed)
+    blocked = rng.random((rows, cols)) < density
+    start, goal = (0, 0), (rows - 1, cols - 1)
+    _corridor(blocked, start, goal, rng)
+    return _finish(blocked, None, start, goal)
+
+
+def maze_map(rows, cols, braid=0.05, seed=0):
+    """
+    Sidewinder maze on the odd (r, c) lattice: every row carves runs to the
+    east, and each run opens one random cell to the row above. braid is the
+    share of remaining inner walls knocked out, so there is more than one
+    route. Built row-parallel in numpy, fine for 5000x5000.
+    """
+    rng = np.random.default_rng(seed)
+    h, w = max((rows - 1) // 2, 1), max((cols - 1) // 2, 1)
+    blocked = np.ones((rows, cols), dtype=bool)
+    blocked[1:2 * h:2, 1:2 * w:2] = False
+
+    # close the run after cell (i, j)? always at the east edge; the top row is one run
+    close = rng.random((h, w)) < 0.5
+    close[:, -1] = True
+    close[0, :-1] = False
+    east = ~close[:, :-1]
+    blocked[1:2 * h:2, 2:2 * w - 1:2] &= ~east
+
+    # one random cell of every run (below the top row) opens north
+    run = np.cumsum(np.concatenate(([False], close[1:].ravel()[:-1])))
+    order = np.lexsort((rng.random(run.size), run))
+    first = order[np.concatenate(([True], run[order][1:] != run[order][:-1]))]
+    i, j = np.divmod(first, w)
+    blocked[2 * (i + 1), 2 * j + 1] = False
+
+    if braid > 0:
+        walls = np.zeros((rows, cols), dtype=bool)
+        walls[1:2 * h:2, 2:2 * w - 1:2] = True
+        walls[2:2 * h - 1:2, 1:2 * w:2] = True
+        knock = walls & blocked & (rng.random((rows, cols)) < braid)
+        blocked &= ~knock
+
+    start = (1, 1) if rows > 2 and cols > 2 else (0, 0)
+    goal = (2 * h - 1, 2 * w - 1) if rows > 2 and cols > 2 else (rows - 1, cols - 1)
+    if rows <= 2 or cols <= 2:
+        _corridor(blocked, start, goal, rng)
+    return _finish(blocked, None, start, goal)
+
+
+def urban_map(rows, cols, block=12, street=3, seed=0):
+    """
+    City blocks: a street grid (cost 1) around block x block lots. Each lot
+    gets a building covering most of it (blocked), some lots are parks
+    (cost 2), and buildings are cut by the odd alley. Streets are always
+    connected, start and goal sit on street corners.
+    """
+    rng = np.random.default_rng(seed)
+    period = block + street
+    r = np.arange(rows) % period
+    c = np.arange(cols) % period
+    on_street = (r[:, None] < street) | (c[None, :] < street)
+    lot_r = np.arange(rows) // period
+    lot_c = np.arange(cols) // period
+    nr, nc = lot_r[-1] + 1, lot_c[-1] + 1
+
+    # building footprint inside each lot: random margins
+    m_top = rng.integers(0, 3, size=(nr, nc))
+    m_left = rng.integers(0, 3, size=(nr, nc))
+    m_bot = rng.integers(0, 3, size=(nr, nc))
+    m_right = rng.integers(0, 3, size=(nr, nc))
+    park = rng.random((nr, nc)) < 0.1
+    lr, lc = lot_r[:, None], lot_c[None, :]
+    rr, cc = (r - street)[:, None], (c - street)[None, :]
+    inside = ((rr >= m_top[lr, lc]) & (rr < block - m_bot[lr, lc])
+              & (cc >= m_left[lr, lc]) & (cc < block - m_right[lr, lc]))
+    blocked = ~on_street & inside & ~park[lr, lc]
+
+    # alleys through some buildings, one cell wide
+    alley_r = rng.random((nr, nc)) < 0.2
+    alley_c = rng.random((nr, nc)) < 0.2
+    mid = street + block // 2
+    blocked &= ~(alley_r[lr, lc] & (r == mid)[:, None])
+    blocked &= ~(alley_c[lr, lc] & (c == mid)[None, :])
+
+    costs = np.ones((rows, cols), dtype=np.int64)
+    costs[~on_street & park[lr, lc]] = 2
+    start = (0, 0)
+    goal = ((rows - 1) // period * period, (cols - 1) // period * period)
+    if goal == start:
+        # smaller than one block: row 0 is street all the way along
+        goal = (0, cols - 1) if cols > 1 else (rows - 1, 0)
+    return _finish(blocked, costs, start, goal)
+
+
+def _smooth_noise(rows, cols, rng, octaves=4, scale=64):
+    """Value noise: random coarse grids upsampled bilinearly and summed."""
+    total = np.zeros((rows, cols))
+    amp, norm = 1.0, 0.0
+    for _ in range(octaves):
+        cr, cc = rows // scale + 2, cols // scale + 2
+        coarse = rng.random((cr, cc))
+        y = np.arange(rows) / scale
+        x = np.arange(cols) / scale
+        y0, x0 = y.astype(int), x.astype(int)
+        fy, fx = (y - y0)[:, None], (x - x0)[None, :]
+        a = coarse[y0][:, x0]
+        b = coarse[y0][:, x0 + 1]
+        c = coarse[y0 + 1][:, x0]
+        d = coarse[y0 + 1][:, x0 + 1]
+        total += amp * ((a * (1 - fx) + b * fx) * (1 - fy) + (c * (1 - fx) + d * fx) * fy)
+        norm += amp
+        amp /= 2
+        scale = max(scale // 2, 1)
+    return total / norm
+
+
+def terrain_map(rows, cols, max_cost=9, water=0.12, seed=0):
+    """Smooth value-noise terrain: costs 1..max_cost (a single digit, so the
+    text format can hold it), lowest `water` share of the map impassable."""
+    rng = np.random.default_rng(seed)
+    n = _smooth_noise(rows, cols, rng, scale=max(min(rows, cols) // 8, 4))
+    blocked = n < np.quantile(n, water)
+    # stretch the rest over 1..max_cost
+    lo, hi = n[~blocked].min(), n.max()
+    costs = 1 + np.floor((n - lo) / max(hi - lo, 1e-12) * max_cost).clip(0, max_cost - 1).astype(np.int64)
+    start, goal = (0, 0), (rows - 1, cols - 1)
+    _corridor(blocked, start, goal, rng)
+    return _finish(blocked, costs, start, goal)
+
+
+GENERATORS = {"random": random_map, "maze": maze_map, "urban": urban_map, "terrain": terrain_map}
+
+
+def generate(kind, rows, cols=None, seed=0, **opts):
+    """Returns (ArrayGrid, start, goal); the same seed gives the same map."""
+    return GENERATORS[kind](rows, cols or rows, seed=seed, **opts)
+
+
+def save_map(path, grid, start, goal):
+    """Write the maps/*.txt text format (rows cols header, one token per cell)."""
+    rows, cols = grid.rows, grid.cols
+    cells = np.full((rows, cols), ord("."), dtype=np.uint8)
+    cost = grid.cost_view()
+    weighted = cost > 1
+    cells[weighted] = (ord("0") + cost[weighted]).astype(np.uint8)
+    cells[grid.obstacle_view() != 0] = ord("#")
+    for cell in grid.stations:
+        cells[cell] = ord("F")
+    cells[start] = ord("S")
+    cells[goal] = ord("G")
+    # "x x x\n" per row, built in one buffer
+    out = np.full((rows, 2 * cols), ord(" "), dtype=np.uint8)
+    out[:, ::2] = cells
+    out[:, -1] = ord("\n")
+    with open(path, "wb") as f:
+        f.write(f"{rows} {cols}\n".encode())
+        f.write(out.tobytes())
+
+
+def place_stations(grid, n, seed=0, avoid=()):
+    """Mark n random free cells (not in avoid) as refuel stations, cost 1
+    like S / G in the text format. Returns the new stations."""
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(grid.obstacle_view() == 0)
+    avoid = {tuple(a) for a in avoid} | grid.stations
+    picked = []
+    for k in rng.permutation(len(free)):
+        if len(picked) == n:
+            break
+        cell = tuple(int(v) for v in free[k])
+        if cell not in avoid:
+            picked.append(cell)
+    for cell in picked:
+        grid.add_cost(*cell, 1)
+        grid.add_station(*cell)
+    return picked
+
+
+def generate_schedule(grid, n, length=20, start_max=10, seed=0, avoid=()):
+    """
+    n movers for maps/schedule.json: each patrols a random walk of up to
+    `length` free cells and back, looping, appearing at a random step in
+    [0, start_max]. Cells in `avoid` (e.g. start and goal) are never used.
+    """
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(grid.obstacle_view() == 0)
+    avoid = {tuple(a) for a in avoid}
+    blocked = grid.obstacle_view() != 0
+    rows, cols = grid.rows, grid.cols
+    steps = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    schedules = []
+    for k in range(n):
+        for _ in range(100):
+            r, c = (int(v) for v in free[rng.integers(len(free))])
+            if (r, c) not in avoid:
+                break
+        walk = [(r, c)]
+        for _ in range(length - 1):
+            opts = [(r + dr, c + dc) for dr, dc in steps
+                    if 0 <= r + dr < rows and 0 <= c + dc < cols
+                    and not blocked[r + dr, c + dc] and (r + dr, c + dc) not in avoid]
+            if not opts:
+                break
+            r, c = opts[rng.integers(len(opts))]
+            walk.append((r, c))
+        # there and back again, so the loop never jumps
+        traj = walk + walk[-2:0:-1]
+        schedules.append({"id": k + 1, "trajectory": [list(p) for p in traj],
+                          "start": int(rng.integers(0, start_max + 1)), "loop": True})
+    return schedules
+
+
+def main():
+    p = argparse.ArgumentParser(description="generate a map (and a mover schedule)")
+    p.add_argument("--kind", choices=KINDS, default="random")
+    p.add_argument("--size", type=int, default=100, help="rows (and cols unless --cols)")
+    p.add_argument("--cols", type=int, default=None)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", required=True, help="map file to write, e.g. maps/gen/maze_1000.txt (.bmap = binary)")
+    p.add_argument("--movers", type=int, default=0, help="also write <out>.schedule.json with N movers")
+    p.add_argument("--mover_length", type=int, default=20)
+    p.add_argument("--stations", type=int, default=0, help="refuel stations (F cells) to place")
+    args = p.parse_args()
+
+    grid, start, goal = generate(args.kind, args.size, args.cols, seed=args.seed)
+    if args.stations:
+        place_stations(grid, args.stations, seed=args.seed, avoid=(start, goal))
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    # .bmap gets the binary format, anything else the text one
+    (save_binary_map if out.suffix == BINARY_SUFFIX else save_map)(out, grid, start, goal)
+    print(f"wrote {out}: {args.kind} {grid.rows}x{grid.cols}, "
+          f"{int((grid.obstacle_view() != 0).sum())} obstacles, {len(grid.stations)} stations, "
+          f"S={start} G={goal}")
+    if args.movers:
+        sched = generate_schedule(grid, args.movers, length=args.mover_length, seed=args.seed,
+                                  avoid=(start, goal))
+        spath = out.with_suffix(".schedule.json")
+        with open(spath, "w") as f:
+            json.dump(sched, f)
+        print(f"wrote {spath}: {len(sched)} movers")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,223 @@
-from src.data.grid import Grid
+import argparse
+import struct
+from pathlib import Path
 
-def load_map_from_file(path):
-    with open(path, "r") as f:
-        lines = [line.strip() for line in f if line.strip()]
+import numpy as np
 
-    # first line: rows cols
-    rows, cols = map(int, lines[0].split())
-    grid = Grid(rows, cols)
+from src.data.grid import Grid, ArrayGrid
 
-    start, goal = None, None
+# ---------------- binary format ----------------
+# header, then one packed obstacle bitmap row per map row (little-endian bit
+# order, padded to whole bytes), then rows*cols cost values of cost_bytes
+# each (no cost section when every cell costs 1), then one (row, col) int32
+# pair per refuel station. start/goal are -1 if unset; files written before
+# stations existed have zeros where the station count now sits.
+MAGIC = b"GRIDMAP1"
+HEADER = struct.Struct("<8sIIiiiiBI11x")
+STATION = np.dtype("<i4")
+BINARY_SUFFIX = ".bmap"
 
-    for r in range(1, rows+1):
-        for c, ch in enumerate(lines[r].split()):
+
+def is_binary_map(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_binary_map(path, grid, start, goal):
+    if not isinstance(grid, ArrayGrid):
+        grid = ArrayGrid.from_grid(grid)
+    rows, cols = grid.rows, grid.cols
+    cost = grid.cost_view()
+    top = int(cost.max()) if cost.size else 1
+    cost_bytes = 0 if top == 1 and int(cost.min()) == 1 else (1 if top < 256 else 2)
+    sr, sc = start if start is not None else (-1, -1)
+    gr, gc = goal if goal is not None else (-1, -1)
+    stations = sorted(grid.stations)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, rows, cols, sr, sc, gr, gc, cost_bytes, len(stations)))
+        f.write(np.packbits(grid.obstacle_view() != 0, axis=1, bitorder="little").tobytes())
+        if cost_bytes:
+            f.write(cost.astype("<u2" if cost_bytes == 2 else np.uint8).tobytes())
+        if stations:
+            f.write(np.asarray(stations, dtype=STATION).tobytes())
+
+
+def load_binary_map(path, compact=False, block_rows=4096):
+    """
+    Map the file with numpy.memmap and unpack it straight into the grid's
+    arrays, block_rows map rows at a time (no per-cell Python work).
+    """
+    with open(path, "rb") as f:
+        magic, rows, cols, sr, sc, gr, gc, cost_bytes, n_stations = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a binary map")
+    rowbytes = (cols + 7) // 8
+    grid = ArrayGrid(rows, cols)
+    if rows and cols:
+        bits = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(rows, rowbytes))
+        blocked = grid.obstacle_view()
+        for r in range(0, rows, block_rows):
+            blocked[r:r + block_rows] = np.unpackbits(bits[r:r + block_rows], axis=1, count=cols,
+                                                      bitorder="little")
+        if cost_bytes:
+            costs = np.memmap(path, dtype="<u2" if cost_bytes == 2 else np.uint8, mode="r",
+                              offset=HEADER.size + rows * rowbytes, shape=(rows, cols))
+            grid.cost_view()[:] = costs
+        del bits
+    if n_stations:
+        with open(path, "rb") as f:
+            f.seek(HEADER.size + rows * rowbytes + rows * cols * cost_bytes)
+            cells = np.frombuffer(f.read(8 * n_stations), dtype=STATION).reshape(-1, 2)
+        grid.stations = set(map(tuple, cells.tolist()))
+    grid.touch()
+    start = (sr, sc) if sr >= 0 else None
+    goal = (gr, gc) if gr >= 0 else None
+    return (grid if compact else _to_grid(grid)), start, goal
+
+
+# ---------------- text format ----------------
+def _scan(block, cols):
+    """
+    Vectorized tokenizer for whole lines of single-character cells.
+    Returns a (n, cols) uint8 array of cell characters, one row per
+    non-blank line ("." pads short rows, extra cells are dropped), or
+    None if some token is longer than one character.
+    """
+    a = np.frombuffer(block, dtype=np.uint8)
+    ws = (a == 32) | (a == 9) | (a == 10) | (a == 13)
+    tok = np.flatnonzero(~ws)
+    if tok.size == 0:
+        return np.zeros((0, cols), dtype=np.uint8)
+    if not np.append(ws, True)[tok + 1].all():
+        return None
+    line = np.cumsum(a == 10)[tok]
+    # blank lines hold no tokens and drop out, like the strip() filter
+    first = np.concatenate(([True], line[1:] != line[:-1]))
+    row = np.cumsum(first) - 1
+    col = np.arange(tok.size) - np.flatnonzero(first)[row]
+    keep = col < cols
+    out = np.full((int(row[-1]) + 1, cols), ord("."), dtype=np.uint8)
+    out[row[keep], col[keep]] = a[tok[keep]]
+    return out
+
+
+def _parse_block(block, cols, max_rows):
+    """(blocked, costs, start, goal, stations) for up to max_rows rows in
+    block; cells are relative to the block's first row."""
+    chars = _scan(block, cols)
+    start = goal = None
+    if chars is not None:
+        chars = chars[:max_rows]
+        blocked = chars == ord("#")
+        stations = [tuple(rc) for rc in np.argwhere(chars == ord("F")).tolist()]
+        digit = (chars >= ord("0")) & (chars <= ord("9"))
+        costs = np.where(digit, chars.astype(np.int64) - ord("0"), 1)
+        for ch, name in ((ord("S"), "start"), (ord("G"), "goal")):
+            hits = np.flatnonzero(chars.ravel() == ch)
+            if hits.size:
+                # the last one wins, as in the cell-by-cell loader
+                cell = tuple(int(v) for v in divmod(int(hits[-1]), cols))
+                start, goal = (cell, goal) if name == "start" else (start, cell)
+        return blocked, costs, start, goal, stations
+    # multi-character tokens (costs >= 10): plain per-line parsing
+    lines = [line.split() for line in block.decode().splitlines() if line.strip()][:max_rows]
+    blocked = np.zeros((len(lines), cols), dtype=bool)
+    costs = np.ones((len(lines), cols), dtype=np.int64)
+    stations = []
+    for r, tokens in enumerate(lines):
+        for c, ch in enumerate(tokens[:cols]):
             if ch == "#":
-                grid.add_obstacle(r-1, c)
+                blocked[r, c] = True
             elif ch == "S":
-                start = (r-1, c)
+                start = (r, c)
             elif ch == "G":
-                goal = (r-1, c)
+                goal = (r, c)
+            elif ch == "F":
+                stations.append((r, c))
             elif ch.isdigit():
-                grid.add_cost(r-1, c, int(ch))  # terrain cost if number
+                costs[r, c] = int(ch)
+    return blocked, costs, start, goal, stations
+
+
+def load_text_map(path, compact=False, chunk_size=1 << 24):
+    """
+    Streaming parser for the text format: reads chunk_size bytes at a time,
+    cuts at the last newline and tokenizes the whole lines with numpy, so
+    memory stays at a chunk plus the grid itself.
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        while header and not header.strip():
+            header = f.readline()
+        # first line: rows cols
+        rows, cols = map(int, header.split()[:2])
+        grid = ArrayGrid(rows, cols)
+        blocked, costs = grid.obstacle_view(), grid.cost_view()
+        start, goal = None, None
+        r, rest = 0, b""
+        while r < rows:
+            chunk = f.read(chunk_size)
+            data = rest + chunk
+            if chunk:
+                cut = data.rfind(b"\n") + 1
+                data, rest = data[:cut], data[cut:]
+                if not data:
+                    continue
+            b, c, s, g, st = _parse_block(data, cols, rows - r)
+            n = len(b)
+            blocked[r:r + n] = b
+            costs[r:r + n] = c
+            grid.stations.update((r + sr, sc) for sr, sc in st)
+            if s is not None:
+                start = (r + s[0], s[1])
+            if g is not None:
+                goal = (r + g[0], g[1])
+            r += n
+            if not chunk:
+                break
+    grid.touch()
+    return (grid if compact else _to_grid(grid)), start, goal
+
+
+def _to_grid(agrid):
+    """Dict-backed Grid with the same cells as an ArrayGrid."""
+    grid = Grid(agrid.rows, agrid.cols)
+    for r, c in np.argwhere(agrid.obstacle_view() != 0).tolist():
+        grid.add_obstacle(r, c)
+    cost = agrid.cost_view()
+    rs, cs = np.nonzero(cost != 1)
+    for r, c, v in zip(rs.tolist(), cs.tolist(), cost[rs, cs].tolist()):
+        grid.add_cost(r, c, v)
+    grid.stations = set(agrid.stations)
+    return grid
+
+
+def load_map_from_file(path, compact=False):
+    """Text or binary map, told apart by the file's first bytes."""
+    # compact=True gives the numpy-backed ArrayGrid (same API)
+    if is_binary_map(path):
+        return load_binary_map(path, compact=compact)
+    return load_text_map(path, compact=compact)
+
+
+def convert_to_binary(src, dst=None):
+    """maps/city.txt -> maps/city.bmap (or dst)."""
+    dst = dst or Path(src).with_suffix(BINARY_SUFFIX)
+    grid, start, goal = load_text_map(src, compact=True)
+    save_binary_map(dst, grid, start, goal)
+    return dst
+
+
+def main():
+    p = argparse.ArgumentParser(description="convert text maps to the binary format")
+    p.add_argument("maps", nargs="+", help="text map files")
+    p.add_argument("--out", default=None, help="output file (single input only; default <map>.bmap)")
+    args = p.parse_args()
+    if args.out and len(args.maps) > 1:
+        p.error("--out needs a single input map")
+    for m in args.maps:
+        print("wrote", convert_to_binary(m, args.out))
+
 
-    return grid, start, goal
+if __name__ == "__main__":
+    main()
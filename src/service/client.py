@@ -0,0 +1,66 @@
+# src/service/client.py
+# asyncio client for the planning service (src/service/server.py)
+import asyncio
+import itertools
+import json
+
+
+class PlanningClient:
+    """
+    One connection, many requests in flight: each request carries an id
+    and a reader task hands every response to the call waiting for it.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.waiting = {}
+        self._reader_task = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, unix=None):
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _read(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                res = json.loads(line)
+                fut = self.waiting.pop(res.get("id"), None)
+                if fut is not None and not fut.done():
+                    fut.set_result(res)
+        finally:
+            for fut in self.waiting.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("planning service closed the connection"))
+            self.waiting.clear()
+
+    async def request(self, op, **fields):
+        rid = next(self.ids)
+        fut = asyncio.get_running_loop().create_future()
+        self.waiting[rid] = fut
+        self.writer.write(json.dumps({"op": op, "id": rid, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        return await fut
+
+    async def plan(self, name, start, goal, algo="astar", **limits):
+        return await self.request("plan", map=name, start=list(start), goal=list(goal), algo=algo, **limits)
+
+    async def update(self, name, add=(), remove=()):
+        return await self.request("update", map=name, add=[list(c) for c in add],
+                                  remove=[list(c) for c in remove])
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._reader_task.cancel()
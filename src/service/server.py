@@ -0,0 +1,336 @@
+# src/service/server.py
+# long-running planning service: grids stay in memory, queries come in as
+# JSON lines over TCP or a unix socket, identical in-flight queries share
+# one search and the searches run on a process pool
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.models.replanner import Replanner
+from src.preprocessing.map_generator import generate
+from src.preprocessing.map_loader import load_binary_map, load_map_from_file, save_binary_map
+
+# planners whose answer only depends on the grid (no per-agent state)
+SERVICE_ALGOS = ("bfs", "ucs", "astar", "jps", "jps_plus", "hpa", "wastar", "ara")
+
+
+# ---------------- worker side ----------------
+# name -> resident map in this process, see _run_batch
+_resident = {}
+
+
+class _Resident:
+    def __init__(self, grid, snap_path):
+        self.grid = grid
+        self.snap_path = snap_path
+        self.applied = 0
+        self.repl = Replanner(grid)
+
+
+def _run_batch(job):
+    """
+    Plan a batch of queries on one map. job = (name, snap_path, deltas,
+    queries): the worker reloads the snapshot only when the file is new
+    to it, then applies the deltas it has not seen yet. New obstacles go
+    in cell by cell, so the Replanner cache drops only the paths they
+    touch; removals are one bulk edit, which clears the cache, since a
+    cached path may no longer be the shortest once a cell opens up.
+    Returns one (path, cost, nodes) per query.
+    """
+    name, snap_path, deltas, queries = job
+    m = _resident.get(name)
+    if m is None or m.snap_path != snap_path:
+        grid, _, _ = load_binary_map(snap_path, compact=True)
+        m = _resident[name] = _Resident(grid, snap_path)
+    for add, remove in deltas[m.applied:]:
+        if remove:
+            m.grid.remove_obstacles(remove)
+        for cell in add:
+            m.grid.add_obstacle(*cell)
+    m.applied = len(deltas)
+    out = []
+    for start, goal, algo, fuel, time_limit, max_nodes in queries:
+        path, cost, nodes, _ = m.repl.plan_path(start, goal, algo=algo, fuel_limit=fuel,
+                                                time_limit=time_limit, max_nodes=max_nodes)
+        out.append((path, cost, nodes))
+    return out
+
+
+# ---------------- service side ----------------
+class MapEntry:
+    """
+    The service's copy of one map. Updates go to the grid here and to a
+    delta list; workers rebuild from the last binary snapshot plus the
+    deltas. Past compact_every deltas a fresh snapshot is written.
+    """
+
+    def __init__(self, name, grid, snap_dir, compact_every=256):
+        self.name = name
+        self.grid = grid
+        self.snap_dir = snap_dir
+        self.compact_every = compact_every
+        self.version = 0
+        self.snap_id = 0
+        self.snap_path = None
+        self.old_snap = None
+        self.deltas = []
+        self._snapshot()
+
+    def _snapshot(self):
+        self.snap_id += 1
+        path = os.path.join(self.snap_dir, f"{self.name}.{self.snap_id}.bmap")
+        save_binary_map(path, self.grid, None, None)
+        # batches already sent may still read the previous file
+        if self.old_snap:
+            os.remove(self.old_snap)
+        self.old_snap, self.snap_path = self.snap_path, path
+        self.deltas = []
+
+    def update(self, add=(), remove=()):
+        add = [tuple(c) for c in add if self.grid.in_bounds(*c)]
+        remove = [tuple(c) for c in remove if self.grid.in_bounds(*c)]
+        for cell in remove:
+            self.grid.remove_obstacle(*cell)
+        for cell in add:
+            self.grid.add_obstacle(*cell)
+        self.deltas.append((add, remove))
+        self.version += 1
+        if len(self.deltas) > self.compact_every:
+            self._snapshot()
+        return self.version
+
+
+class PlanningService:
+    """
+    asyncio front end over a pool of planner processes.
+
+    Each plan request is keyed on (map, version, query); a request whose
+    key is already in flight waits on the same future instead of
+    searching again. Queued queries are drained in batches, grouped per
+    map and sent to the pool as one job each; at most 2 x workers jobs
+    are out at a time, so under load the queue fills and batches grow.
+    workers=0 runs the batches in the event loop itself (tests, tiny maps).
+    """
+
+    def __init__(self, workers=1, batch_size=64, compact_every=256):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.compact_every = compact_every
+        self.maps = {}
+        self.snap_dir = tempfile.mkdtemp(prefix="planning_service_")
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+        self.inflight = {}
+        self.queue = None
+        self.counts = {"requests": 0, "plans": 0, "coalesced": 0, "searches": 0, "batches": 0,
+                       "updates": 0, "errors": 0}
+        self._dispatcher = None
+        self._server = None
+        self._conns = {}
+
+    # ---- maps ----
+    def load(self, name, path=None, kind=None, size=100, seed=0):
+        if path is not None:
+            grid, _, _ = load_map_from_file(path, compact=True)
+        else:
+            grid, _, _ = generate(kind, size, seed=seed)
+        self.maps[name] = MapEntry(name, grid, self.snap_dir, self.compact_every)
+        return self.maps[name]
+
+    def _entry(self, name):
+        if name not in self.maps:
+            raise KeyError(f"no map named {name!r}")
+        return self.maps[name]
+
+    # ---- queries ----
+    async def plan(self, name, start, goal, algo="astar", fuel=None, time_limit=None, max_nodes=None):
+        """Returns (path, cost, nodes, version, shared); shared is True if
+        the answer came from an identical query already in flight."""
+        if algo not in SERVICE_ALGOS:
+            raise ValueError(f"algo must be one of {', '.join(SERVICE_ALGOS)}")
+        m = self._entry(name)
+        start, goal = tuple(start), tuple(goal)
+        query = (start, goal, algo, fuel, time_limit, max_nodes)
+        key = (name, m.version) + query
+        self.counts["plans"] += 1
+        fut = self.inflight.get(key)
+        if fut is not None:
+            self.counts["coalesced"] += 1
+            path, cost, nodes = await asyncio.shield(fut)
+            return path, cost, nodes, key[1], True
+        fut = asyncio.get_running_loop().create_future()
+        self.inflight[key] = fut
+        fut.add_done_callback(lambda _: self.inflight.pop(key, None))
+        await self.queue.put((m, m.snap_id, len(m.deltas), query, fut))
+        path, cost, nodes = await asyncio.shield(fut)
+        return path, cost, nodes, key[1], False
+
+    async def _dispatch(self):
+        slots = asyncio.Semaphore(max(self.workers, 1) * 2)
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            groups = {}
+            for m, snap_id, n, query, fut in batch:
+                groups.setdefault((m.name, snap_id, n), (m, []))[1].append((query, fut))
+            for (name, snap_id, n), (m, items) in groups.items():
+                if m.snap_id != snap_id:
+                    # compacted since it was queued: its deltas are in the new snapshot
+                    snap_id, n = m.snap_id, len(m.deltas)
+                job = (name, m.snap_path, m.deltas[:n], [q for q, _ in items])
+                self.counts["batches"] += 1
+                self.counts["searches"] += len(items)
+                if self.pool is None:
+                    self._deliver(items, job)
+                    continue
+                await slots.acquire()
+                task = loop.run_in_executor(self.pool, _run_batch, job)
+                task.add_done_callback(lambda t, items=items: (slots.release(), self._finish(items, t)))
+
+    def _deliver(self, items, job):
+        try:
+            results = _run_batch(job)
+        except Exception as e:
+            for _, fut in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), res in zip(items, results):
+            if not fut.done():
+                fut.set_result(res)
+
+    def _finish(self, items, task):
+        exc = asyncio.CancelledError() if task.cancelled() else task.exception()
+        for k, (_, fut) in enumerate(items):
+            if fut.done():
+                continue
+            if exc is not None:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(task.result()[k])
+
+    # ---- protocol ----
+    async def handle(self, req):
+        """One request dict -> one response dict (both JSON-able)."""
+        self.counts["requests"] += 1
+        op = req.get("op")
+        try:
+            if op == "plan":
+                path, cost, nodes, version, shared = await self.plan(
+                    req["map"], req["start"], req["goal"], algo=req.get("algo", "astar"),
+                    fuel=req.get("fuel"), time_limit=req.get("time_limit"), max_nodes=req.get("max_nodes"))
+                return {"ok": True, "path": path, "cost": None if cost == float("inf") else cost,
+                        "nodes": nodes, "version": version, "shared": shared}
+            if op == "update":
+                self.counts["updates"] += 1
+                version = self._entry(req["map"]).update(req.get("add", ()), req.get("remove", ()))
+                return {"ok": True, "version": version}
+            if op == "load":
+                m = self.load(req["name"], path=req.get("path"), kind=req.get("kind", "random"),
+                              size=req.get("size", 100), seed=req.get("seed", 0))
+                return {"ok": True, "rows": m.grid.rows, "cols": m.grid.cols, "version": m.version}
+            if op == "stats":
+                return {"ok": True, "counts": dict(self.counts), "queued": self.queue.qsize(),
+                        "inflight": len(self.inflight),
+                        "maps": {n: m.version for n, m in self.maps.items()}}
+            raise ValueError(f"unknown op {op!r}")
+        except Exception as e:
+            # bad requests and planner errors go back to the caller, the service keeps running
+            self.counts["errors"] += 1
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    async def _client(self, reader, writer):
+        # requests on one connection are answered as they finish; "id" ties them up
+        pending = set()
+        self._conns[asyncio.current_task()] = writer
+
+        async def answer(req):
+            res = await self.handle(req)
+            if "id" in req:
+                res["id"] = req["id"]
+            writer.write(json.dumps(res).encode() + b"\n")
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                except json.JSONDecodeError:
+                    writer.write(b'{"ok": false, "error": "bad json"}\n')
+                    continue
+                task = asyncio.create_task(answer(req))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                await writer.drain()
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._conns.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0, unix=None):
+        """Start listening; returns the (host, port) or unix path bound."""
+        self.queue = asyncio.Queue()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        if unix:
+            self._server = await asyncio.start_unix_server(self._client, path=unix)
+            return unix
+        self._server = await asyncio.start_server(self._client, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # end open connections the normal way: their next read sees EOF
+            tasks = list(self._conns)
+            for writer in self._conns.values():
+                writer.transport.abort()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._server.wait_closed()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+        shutil.rmtree(self.snap_dir, ignore_errors=True)
+
+
+async def serve(args):
+    svc = PlanningService(workers=args.workers, batch_size=args.batch_size)
+    for m in args.map:
+        svc.load(Path(m).stem, path=m)
+    where = await svc.start(args.host, args.port, unix=args.unix)
+    print(f"planning service on {where}, maps: {', '.join(svc.maps) or '-'}, {args.workers} workers")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await svc.close()
+
+
+def main():
+    p = argparse.ArgumentParser(description="planning service: JSON lines over TCP or a unix socket")
+    p.add_argument("--map", nargs="*", default=[], help="maps to keep resident (named by file stem)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--unix", default=None, help="listen on this unix socket path instead")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="planner processes (0 = in the loop)")
+    p.add_argument("--batch_size", type=int, default=64)
+    args = p.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
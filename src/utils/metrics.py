@@ -1,6 +1,10 @@
 # src/utils/metrics.py
 import time
 import csv
+import json
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
 
 def timeit(fn):
@@ -21,8 +25,22 @@ class CSVLogger:
             self.w.writerow(["map","algo","rows","cols","start","goal","cost","length","nodes","time_s","seed","notes"])
             self.f.flush()
 
-    def log(self, rowdict):
-        row = [
+    def log(self, rowdict, stats=None):
+        """stats: optional SearchStats, summarised into the notes column."""
+        if stats is not None:
+            notes = rowdict.get("notes") or ""
+            rowdict = dict(rowdict, notes=f"{notes} {stats.summary()}".strip())
+        self.w.writerow(self._row(rowdict))
+        self.f.flush()
+
+    def log_many(self, rowdicts):
+        """Write a batch of rows with a single flush."""
+        self.w.writerows(self._row(r) for r in rowdicts)
+        self.f.flush()
+
+    @staticmethod
+    def _row(rowdict):
+        return [
             rowdict.get("map"),
             rowdict.get("algo"),
             rowdict.get("rows"),
@@ -36,8 +54,110 @@ class CSVLogger:
             rowdict.get("seed"),
             rowdict.get("notes","")
         ]
-        self.w.writerow(row)
+
+    def close(self):
+        self.f.close()
+
+
+class JSONLLogger:
+    """One JSON object per line: the result row plus the full stats."""
+
+    def __init__(self, path):
+        self.f = open(path, "a")
+
+    def log(self, rowdict, stats=None):
+        rec = dict(rowdict)
+        if stats is not None:
+            rec["stats"] = stats.as_dict()
+        # tuples (start / goal) become lists, inf becomes a string
+        self.f.write(json.dumps(rec, default=str) + "\n")
         self.f.flush()
 
     def close(self):
         self.f.close()
+
+
+class SearchStats:
+    """
+    Opt-in search counters: pass stats=SearchStats() to a planner (or to
+    Replanner.plan_path) and it is filled in the same way by all of them.
+    Without one the planners run their plain loops, so the counters cost
+    nothing when unused. One object can collect several searches; the
+    counts add up and the peaks keep the maximum.
+
+    trace  : optional callable trace(cell, g), called on every expansion
+    memory : also record the tracemalloc peak of each timed phase (slow)
+    """
+
+    def __init__(self, trace=None, memory=False):
+        self.trace = trace
+        self.memory = memory
+        self.searches = 0
+        self.expansions = 0
+        self.pushes = 0          # frontier insertions
+        self.stale_pops = 0      # popped entries already expanded / outdated
+        self.peak_frontier = 0
+        self.peak_memory = 0     # bytes, only with memory=True
+        self.phases = Counter()  # phase name -> seconds
+        self.replans = 0
+        self.replan_reasons = Counter()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block under `name` (and trace its memory if asked)."""
+        token = self.start_phase(name)
+        try:
+            yield self
+        finally:
+            self.end_phase(token)
+
+    def start_phase(self, name):
+        """phase() for loops that can't sit inside a with block."""
+        traced = self.memory and not tracemalloc.is_tracing()
+        if traced:
+            tracemalloc.start()
+        return name, traced, time.perf_counter()
+
+    def end_phase(self, token):
+        name, traced, t0 = token
+        self.phases[name] += time.perf_counter() - t0
+        if self.memory and tracemalloc.is_tracing():
+            self.peak_memory = max(self.peak_memory, tracemalloc.get_traced_memory()[1])
+        if traced:
+            tracemalloc.stop()
+
+    def add_search(self, expansions, pushes, stale_pops=0, peak_frontier=0):
+        self.searches += 1
+        self.expansions += expansions
+        self.pushes += pushes
+        self.stale_pops += stale_pops
+        self.peak_frontier = max(self.peak_frontier, peak_frontier)
+
+    def replan(self, reason):
+        self.replans += 1
+        self.replan_reasons[reason] += 1
+
+    def as_dict(self):
+        return {
+            "searches": self.searches,
+            "expansions": self.expansions,
+            "pushes": self.pushes,
+            "stale_pops": self.stale_pops,
+            "peak_frontier": self.peak_frontier,
+            "peak_memory": self.peak_memory,
+            "phases": dict(self.phases),
+            "replans": self.replans,
+            "replan_reasons": dict(self.replan_reasons),
+        }
+
+    def summary(self):
+        """Short key=value form for the CSV notes column."""
+        parts = [f"expansions={self.expansions}", f"pushes={self.pushes}",
+                 f"stale_pops={self.stale_pops}", f"peak_frontier={self.peak_frontier}"]
+        if self.memory:
+            parts.append(f"peak_memory={self.peak_memory}")
+        parts += [f"{k}_s={v:.6f}" for k, v in self.phases.items()]
+        if self.replans:
+            parts.append(f"replans={self.replans}")
+            parts += [f"replan_{k}={v}" for k, v in self.replan_reasons.items()]
+        return " ".join(parts)
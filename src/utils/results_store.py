@@ -0,0 +1,286 @@
+# src/utils/results_store.py
+# experiment results in SQLite: typed rows, batched inserts and per
+# (map, algo) aggregates kept up to date on every insert
+import csv
+import math
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+METRICS = ("cost", "nodes", "time_s")
+PERCENTILES = (50, 90, 99)
+# log-spaced histogram buckets for the percentiles: BUCKETS per doubling,
+# so a reported percentile is within ~4.4% of the true one
+BUCKETS = 8
+ZERO = -(1 << 30)  # bucket for values <= 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    map TEXT NOT NULL,
+    algo TEXT NOT NULL,
+    rows INTEGER,
+    cols INTEGER,
+    start_r INTEGER, start_c INTEGER,
+    goal_r INTEGER, goal_c INTEGER,
+    cost REAL,              -- NULL when the run failed
+    status TEXT NOT NULL,   -- '' or FAIL / FAIL_TIME / FAIL_FUEL
+    length INTEGER,
+    nodes INTEGER,
+    time_s REAL,
+    seed INTEGER,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_map_algo_seed ON runs (map, algo, seed);
+CREATE INDEX IF NOT EXISTS runs_algo ON runs (algo);
+CREATE INDEX IF NOT EXISTS runs_seed ON runs (seed);
+CREATE TABLE IF NOT EXISTS groups (
+    map TEXT, algo TEXT, runs INTEGER, failures INTEGER,
+    PRIMARY KEY (map, algo)
+);
+CREATE TABLE IF NOT EXISTS agg (
+    map TEXT, algo TEXT, metric TEXT,
+    n INTEGER, mean REAL, m2 REAL, lo REAL, hi REAL,
+    PRIMARY KEY (map, algo, metric)
+);
+CREATE TABLE IF NOT EXISTS hist (
+    map TEXT, algo TEXT, metric TEXT, bucket INTEGER, n INTEGER,
+    PRIMARY KEY (map, algo, metric, bucket)
+);
+"""
+
+
+def _cell(v):
+    # (r, c) from a tuple / list or its CSV text "(r, c)"
+    if v is None or v == "":
+        return None, None
+    if isinstance(v, str):
+        v = v.strip("()[] ").split(",")
+    return int(v[0]), int(v[1])
+
+
+def _num(v, kind=float):
+    if v is None or v == "":
+        return None
+    try:
+        x = kind(float(v))
+    except (TypeError, ValueError):
+        return None
+    return None if kind is float and math.isinf(x) else x
+
+
+def _bucket(x):
+    return ZERO if x <= 0 else math.floor(math.log2(x) * BUCKETS)
+
+
+def _bucket_value(b):
+    # geometric middle of the bucket
+    return 0.0 if b == ZERO else 2 ** ((b + 0.5) / BUCKETS)
+
+
+class ResultsStore:
+    """
+    Results rows in a SQLite file (default outputs/results.db).
+
+    Rows are the same dicts CSVLogger takes; cost is stored as a number,
+    with failure strings like FAIL_TIME moved to the status column. Every
+    log_many call is one transaction that inserts the rows and folds them
+    into the aggregates: per (map, algo) run / failure counts, and per
+    metric (cost of the successful runs, nodes, time_s) count, mean and
+    M2 (merged with Chan's formula, so std stays exact) plus a log-bucket
+    histogram for percentiles. summary() reads only those tables, never
+    the runs themselves.
+    """
+
+    def __init__(self, path="outputs/results.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(SCHEMA)
+
+    # ---- writing ----
+    def log(self, rowdict, stats=None):
+        """Like CSVLogger.log: stats (SearchStats) is summarised into notes."""
+        if stats is not None:
+            notes = rowdict.get("notes") or ""
+            rowdict = dict(rowdict, notes=f"{notes} {stats.summary()}".strip())
+        self.log_many([rowdict])
+
+    def log_many(self, rowdicts):
+        rows = [self._row(r) for r in rowdicts]
+        if not rows:
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO runs (map, algo, rows, cols, start_r, start_c, goal_r, goal_c, cost, status, "
+                "length, nodes, time_s, seed, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._fold(rows)
+
+    @staticmethod
+    def _row(r):
+        cost = r.get("cost")
+        status = ""
+        if isinstance(cost, str) and _num(cost) is None:
+            status, cost = cost, None
+        else:
+            cost = _num(cost)
+            if cost is None:
+                status = "FAIL"
+        sr, sc = _cell(r.get("start"))
+        gr, gc = _cell(r.get("goal"))
+        return (r.get("map"), r.get("algo"), _num(r.get("rows"), int), _num(r.get("cols"), int),
+                sr, sc, gr, gc, cost, status, _num(r.get("length"), int), _num(r.get("nodes"), int),
+                _num(r.get("time_s")), _num(r.get("seed"), int), r.get("notes") or "")
+
+    def _fold(self, rows):
+        # group the batch, then merge each group into the stored aggregates
+        groups = {}
+        for row in rows:
+            g = groups.setdefault((row[0], row[1]),
+                                  {"runs": 0, "failures": 0, "cost": [], "nodes": [], "time_s": []})
+            g["runs"] += 1
+            if row[9]:
+                g["failures"] += 1
+            for metric, v in (("cost", row[8]), ("nodes", row[11]), ("time_s", row[12])):
+                if v is not None:
+                    g[metric].append(v)
+        cur = self.db.cursor()
+        for (m, a), g in groups.items():
+            cur.execute("INSERT INTO groups VALUES (?, ?, ?, ?) ON CONFLICT (map, algo) DO UPDATE SET "
+                        "runs = runs + excluded.runs, failures = failures + excluded.failures",
+                        (m, a, g["runs"], g["failures"]))
+            for metric in METRICS:
+                xs = np.asarray(g[metric], dtype=float)
+                if not len(xs):
+                    continue
+                n_b, mean_b = len(xs), float(xs.mean())
+                m2_b = float(((xs - mean_b) ** 2).sum())
+                old = cur.execute("SELECT n, mean, m2, lo, hi FROM agg WHERE map = ? AND algo = ? AND metric = ?",
+                                  (m, a, metric)).fetchone()
+                lo, hi = float(xs.min()), float(xs.max())
+                if old is None:
+                    n, mean, m2 = n_b, mean_b, m2_b
+                else:
+                    n_a, mean_a, m2_a, lo_a, hi_a = old
+                    n = n_a + n_b
+                    delta = mean_b - mean_a
+                    mean = mean_a + delta * n_b / n
+                    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+                    lo, hi = min(lo, lo_a), max(hi, hi_a)
+                cur.execute("INSERT OR REPLACE INTO agg VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (m, a, metric, n, mean, m2, lo, hi))
+                buckets, counts = np.unique([_bucket(x) for x in xs], return_counts=True)
+                cur.executemany("INSERT INTO hist VALUES (?, ?, ?, ?, ?) ON CONFLICT (map, algo, metric, bucket) "
+                                "DO UPDATE SET n = n + excluded.n",
+                                [(m, a, metric, int(b), int(c)) for b, c in zip(buckets, counts)])
+
+    def import_csv(self, path, chunk=5000):
+        """Load an existing results.csv, chunk rows per transaction."""
+        with open(path, newline="") as f:
+            batch = []
+            for row in csv.DictReader(f):
+                batch.append(row)
+                if len(batch) >= chunk:
+                    self.log_many(batch)
+                    batch = []
+            self.log_many(batch)
+
+    # ---- reading ----
+    def runs(self, map=None, algo=None, seed=None):
+        """Raw rows (as dicts) filtered on the indexed columns."""
+        where, args = [], []
+        for col, v in (("map", map), ("algo", algo), ("seed", seed)):
+            if v is not None:
+                where.append(f"{col} = ?")
+                args.append(v)
+        sql = "SELECT * FROM runs" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id"
+        cur = self.db.execute(sql, args)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, r)) for r in cur]
+
+    def summary(self):
+        """
+        One dict per (map, algo), sorted: runs, failures and for each
+        metric <metric>_mean / _std (sample std) / _min / _max / _p50 /
+        _p90 / _p99, None where there is nothing to aggregate.
+        """
+        out = {}
+        for m, a, runs, failures in self.db.execute("SELECT map, algo, runs, failures FROM groups"):
+            out[(m, a)] = dict(dict.fromkeys(summary_columns()), map=m, algo=a, runs=runs, failures=failures)
+        for m, a, metric, n, mean, m2, lo, hi in self.db.execute("SELECT * FROM agg"):
+            row = out[(m, a)]
+            row[f"{metric}_mean"] = mean
+            row[f"{metric}_std"] = math.sqrt(m2 / (n - 1)) if n > 1 else None
+            row[f"{metric}_min"] = lo
+            row[f"{metric}_max"] = hi
+        hist = {}
+        for m, a, metric, b, n in self.db.execute("SELECT * FROM hist ORDER BY map, algo, metric, bucket"):
+            hist.setdefault((m, a, metric), []).append((b, n))
+        for (m, a, metric), bins in hist.items():
+            row = out[(m, a)]
+            total = sum(n for _, n in bins)
+            for p in PERCENTILES:
+                need, seen = p / 100 * total, 0
+                for b, n in bins:
+                    seen += n
+                    if seen >= need:
+                        break
+                row[f"{metric}_p{p}"] = min(max(_bucket_value(b), row[f"{metric}_min"]), row[f"{metric}_max"])
+        return [out[k] for k in sorted(out)]
+
+    def close(self):
+        self.db.close()
+
+
+def summary_columns():
+    cols = ["map", "algo", "runs", "failures"]
+    for metric in METRICS:
+        cols += [f"{metric}_{s}" for s in ("mean", "std", "min", "max")]
+        cols += [f"{metric}_p{p}" for p in PERCENTILES]
+    return cols
+
+
+def write_summary_csv(summary, path):
+    cols = summary_columns()
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(cols)
+        for row in summary:
+            w.writerow(["" if row.get(c) is None else row.get(c) for c in cols])
+
+
+# display names for the LaTeX table
+ALGO_NAMES = {"astar": "A*", "bfs": "BFS", "ucs": "UCS", "replanner": "Replanner", "jps": "JPS",
+              "jps_plus": "JPS+", "bi_ucs": "Bi-UCS", "bi_astar": "Bi-A*", "hpa": "HPA*", "dstar": "D* Lite",
+              "spacetime": "Space-time A*", "wastar": "Weighted A*", "ara": "ARA*", "fuel": "Fuel A*",
+              "tour": "Tour"}
+
+
+def _tex(s):
+    return str(s).replace("_", r"\_").replace("%", r"\%").replace("&", r"\&")
+
+
+def write_latex(summary, path):
+    """The results table: one block of rows per map, means with their std."""
+    def cell(row, metric, fmt):
+        mean, std = row.get(f"{metric}_mean"), row.get(f"{metric}_std")
+        if mean is None:
+            return "--"
+        return fmt.format(mean) + ("" if std is None else r" $\pm$ " + fmt.format(std))
+
+    lines = [r"\begin{table}[H]", r"\centering",
+             r"\caption{Summary of Experimental Results across Maps and Algorithms}", r"\label{tab:results}",
+             r"\begin{tabular}{|c|c|c|c|c|c|}", r"\hline",
+             r"\textbf{Map} & \textbf{Algorithm} & \textbf{Runs (failed)} & \textbf{Cost} & "
+             r"\textbf{Nodes Expanded} & \textbf{Time (s)} \\", r"\hline"]
+    last = None
+    for row in summary:
+        if last is not None and row["map"] != last:
+            lines.append(r"\hline")
+        last = row["map"]
+        lines.append(f"{_tex(row['map'])} & {_tex(ALGO_NAMES.get(row['algo'], row['algo']))} & "
+                     f"{row['runs']} ({row['failures']}) & {cell(row, 'cost', '{:.1f}')} & "
+                     f"{cell(row, 'nodes', '{:.1f}')} & {cell(row, 'time_s', '{:.2e}')} \\\\")
+    lines += [r"\hline", r"\end{tabular}", r"\end{table}"]
+    Path(path).write_text("\n".join(lines) + "\n")
@@ -1,29 +1,138 @@
+import math
+
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
 
-def plot_grid(grid, path=None, start=None, goal=None, title=None, save=None):
-    plt.figure(figsize=(6,6))
-    for r in range(grid.rows):
-        for c in range(grid.cols):
-            if grid.is_obstacle(r, c):
-                plt.plot(c, r, "ks")  # black square
-    if path:
-        xs = [p[1] for p in path]
-        ys = [p[0] for p in path]
-        plt.plot(xs, ys, "r-", linewidth=2)
+
+def grid_layers(grid):
+    """(blocked, cost) as (rows, cols) arrays, for ArrayGrid or Grid."""
+    if hasattr(grid, "obstacle_view"):
+        return grid.obstacle_view() != 0, grid.cost_view()
+    blocked = np.zeros((grid.rows, grid.cols), dtype=bool)
+    cost = np.ones((grid.rows, grid.cols), dtype=np.int64)
+    if grid.obstacles:
+        cells = np.array(list(grid.obstacles)).reshape(-1, 2)
+        blocked[cells[:, 0], cells[:, 1]] = True
+    if grid.costs:
+        cells = np.array(list(grid.costs)).reshape(-1, 2)
+        cost[cells[:, 0], cells[:, 1]] = list(grid.costs.values())
+    return blocked, cost
+
+
+def raster(grid):
+    """
+    One RGB image for the whole map: white free cells, terrain cost as
+    darker shades of tan, obstacles black. Colours come from a lookup
+    table indexed by cost, so this is a couple of numpy passes.
+    """
+    blocked, cost = grid_layers(grid)
+    top = int(cost.max()) if cost.size else 1
+    lut = np.empty((top + 1, 3), dtype=np.uint8)
+    lut[:] = 255
+    if top > 1:
+        # cost 1 -> white, the dearest cell -> dark tan
+        t = (np.arange(top + 1) - 1).clip(0) / (top - 1)
+        lut[:, 0] = 255 - 95 * t
+        lut[:, 1] = 255 - 140 * t
+        lut[:, 2] = 255 - 200 * t
+    img = lut[cost]
+    img[blocked] = 0
+    return img
+
+
+def _segments(paths):
+    # (r, c) cells -> (x, y) = (c, r) polylines
+    return [np.asarray(p, dtype=float)[:, ::-1] for p in paths if p and len(p) > 1]
+
+
+def draw_grid(ax, grid, paths=(), start=None, goal=None, title=None, colors="r"):
+    """
+    Draw the map as one imshow raster and all paths as one LineCollection.
+    Returns (image, lines) so callers can update them in place.
+    """
+    image = ax.imshow(raster(grid), interpolation="nearest", origin="upper")
+    lines = LineCollection(_segments(paths), colors=colors, linewidths=2)
+    ax.add_collection(lines)
     if start:
-        plt.plot(start[1], start[0], "go", markersize=12, label="Start")
+        ax.plot(start[1], start[0], "go", markersize=12, label="Start")
     if goal:
-        plt.plot(goal[1], goal[0], "bo", markersize=12, label="Goal")
-    plt.gca().invert_yaxis()
-    plt.axis("equal")
-    plt.title(title)
-    
+        ax.plot(goal[1], goal[0], "bo", markersize=12, label="Goal")
+    ax.set_xlim(-0.5, grid.cols - 0.5)
+    ax.set_ylim(grid.rows - 0.5, -0.5)
+    ax.set_aspect("equal")
+    if title:
+        ax.set_title(title)
+    return image, lines
+
+
+def plot_grid(grid, path=None, start=None, goal=None, title=None, save=None):
+    fig, ax = plt.subplots(figsize=(6, 6))
+    draw_grid(ax, grid, [path] if path else (), start, goal, title)
+
     if save:   #  single save mechanism
-        plt.savefig(save)
+        fig.savefig(save)
     else:
         plt.show()
-    
-    plt.close()
+
+    plt.close(fig)
+
+
+def plot_batch(runs, save=None, ncols=3, size=4):
+    """
+    Many runs in one figure, one subplot each.
+    runs: dicts with grid and optionally path, start, goal, title.
+    """
+    nrows = max(math.ceil(len(runs) / ncols), 1)
+    ncols = min(ncols, max(len(runs), 1))
+    fig, axes = plt.subplots(nrows, ncols, figsize=(size * ncols, size * nrows), squeeze=False)
+    for ax, run in zip(axes.flat, runs):
+        path = run.get("path")
+        draw_grid(ax, run["grid"], [path] if path else (), run.get("start"), run.get("goal"), run.get("title"))
+    for ax in list(axes.flat)[len(runs):]:
+        ax.set_axis_off()
+    fig.tight_layout()
+    if save:
+        fig.savefig(save)
+    else:
+        plt.show()
+    plt.close(fig)
+
+
+class FrameWriter:
+    """
+    PNG frames of a dynamic episode from one figure: each frame only swaps
+    the raster data, the path segments and the agent marker.
+    """
+
+    def __init__(self, grid, start, goal, prefix, title=None):
+        self.prefix = prefix
+        self.title = title
+        self.fig, self.ax = plt.subplots(figsize=(6, 6))
+        self.image, self.lines = draw_grid(self.ax, grid, (), start, goal, title)
+        self.agent, = self.ax.plot([], [], "mo", markersize=9)
+        self.version = getattr(grid, "version", None)
+        self.count = 0
+
+    def frame(self, grid, path=None, agent=None, t=None):
+        """Save <prefix>_<n>.png; returns its file name."""
+        version = getattr(grid, "version", None)
+        if version is None or version != self.version:
+            self.image.set_data(raster(grid))
+            self.version = version
+        self.lines.set_segments(_segments([path] if path else ()))
+        self.agent.set_data([agent[1]] if agent else [], [agent[0]] if agent else [])
+        if t is not None:
+            self.ax.set_title(f"{self.title or ''} t={t}".strip())
+        name = f"{self.prefix}_{self.count:04d}.png"
+        self.fig.savefig(name)
+        self.count += 1
+        return name
+
+    def close(self):
+        plt.close(self.fig)
+
+
 def save_original_and_dynamic(grid, path, start, goal, block_cell, outdir="results"):
     # original plan
     plot_grid(grid, path, start, goal,
@@ -35,4 +144,3 @@ def save_original_and_dynamic(grid, path, start, goal, block_cell, outdir="resul
     plot_grid(grid, None, start, goal,
               save=f"{outdir}/dynamic_map.png",
               title="Dynamic Map (after obstacle injected)")
-
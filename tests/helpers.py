@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.data.grid import ArrayGrid, Grid
+
+
+def random_grid(n, seed, density=0.25, max_cost=5, cls=ArrayGrid, clear=True):
+    """
+    n x n map: each cell blocked with probability density, entry costs
+    drawn from 1..max_cost (max_cost=1 keeps unit costs). clear keeps the
+    corners (0, 0) and (n-1, n-1) free. cls=Grid gives the dict-backed grid.
+    """
+    rng = np.random.default_rng(seed)
+    g = ArrayGrid(n, n)
+    blocked = rng.random((n, n)) < density
+    if clear:
+        blocked[0, 0] = blocked[-1, -1] = False
+    g.set_obstacle_mask(blocked)
+    if max_cost > 1:
+        g.set_costs(rng.integers(1, max_cost + 1, size=(n, n)))
+    if cls is ArrayGrid:
+        return g
+    plain = Grid(n, n)
+    for r, c in g.obstacles:
+        plain.add_obstacle(r, c)
+    for (r, c), cost in g.costs.items():
+        plain.add_cost(r, c, cost)
+    return plain
+
+
+def path_cost(g, path):
+    return sum(g.get_cost(*p) for p in path[1:])
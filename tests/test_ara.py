@@ -0,0 +1,71 @@
+import unittest
+
+from src.data.grid import ArrayGrid, Grid
+from src.models.ara import ara_star, weighted_astar
+from src.models.replanner import Replanner
+from src.models.ucs import ucs
+from src.utils.metrics import SearchStats
+
+from helpers import path_cost, random_grid
+
+
+class AraTests(unittest.TestCase):
+    def test_weighted_astar_within_weight(self):
+        for seed in range(20):
+            g = random_grid(25, seed)
+            best = ucs(g, (0, 0), (24, 24))[1]
+            for w in (1.0, 1.5, 3.0):
+                path, cost, _ = weighted_astar(g, (0, 0), (24, 24), weight=w)
+                if best == float("inf"):
+                    self.assertEqual(path, [])
+                    continue
+                self.assertEqual(cost, path_cost(g, path))
+                self.assertLessEqual(cost, w * best)
+                if w == 1.0:
+                    self.assertEqual(cost, best)
+
+    def test_ara_ends_optimal_without_deadline(self):
+        for seed in range(20):
+            g = random_grid(25, seed)
+            best = ucs(g, (0, 0), (24, 24))[1]
+            path, cost, _, bound = ara_star(g, (0, 0), (24, 24), weight=3.0)
+            if best == float("inf"):
+                self.assertEqual(bound, float("inf"))
+                continue
+            self.assertEqual(cost, best)
+            self.assertEqual(bound, 1.0)
+
+    def test_deadline_keeps_first_path_and_bound(self):
+        g = random_grid(120, 4)
+        best = ucs(g, (0, 0), (119, 119))[1]
+        # expansion cap stands in for a short deadline: stops mid-way
+        path, cost, nodes, bound = ara_star(g, (0, 0), (119, 119), weight=3.0, max_nodes=1500)
+        self.assertTrue(path)
+        self.assertEqual(nodes, 1501)
+        self.assertLessEqual(bound, 3.0)
+        self.assertLessEqual(cost, bound * best)
+        self.assertGreater(bound, 1.0)
+        # nothing found before a zero deadline on a big search
+        self.assertEqual(ara_star(ArrayGrid(200, 200), (0, 0), (199, 199), weight=1.0, time_limit=0)[3],
+                         float("inf"))
+
+    def test_stats_and_plain_grid(self):
+        g = Grid(6, 6)
+        g.add_obstacle(2, 2)
+        st = SearchStats()
+        path, cost, nodes, bound = ara_star(g, (0, 0), (5, 5), stats=st)
+        self.assertEqual(cost, 10)
+        self.assertEqual(st.expansions, nodes)
+
+    def test_replanner_algos(self):
+        g = random_grid(30, 1)
+        repl = Replanner(g, weight=2.5)
+        path, cost, _, _ = repl.plan_path((0, 0), (29, 29), "wastar")
+        self.assertEqual(repl.bound, 2.5)
+        path, cost, _, _ = repl.plan_path((0, 0), (29, 29), "ara", time_limit=5)
+        self.assertEqual(repl.bound, 1.0)
+        self.assertEqual(cost, ucs(g, (0, 0), (29, 29))[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
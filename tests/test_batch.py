@@ -0,0 +1,30 @@
+import csv
+import tempfile
+import unittest
+from src.experiments.run_experiment import run_batch
+from src.utils.results_store import ResultsStore
+
+class BatchTests(unittest.TestCase):
+    def test_every_case_is_written_once(self):
+        with tempfile.TemporaryDirectory() as out:
+            n = run_batch(["maps/small.txt", "maps/medium.txt"], ["bfs", "astar"], seeds=[0, 1],
+                          fuels=[None, 4], outdir=out, workers=2)
+            with open(f"{out}/results.csv") as f:
+                rows = list(csv.DictReader(f))
+            store = ResultsStore(f"{out}/results.db")
+            stored = store.runs()
+            summary = store.summary()
+            store.close()
+        self.assertEqual(n, 16)
+        self.assertEqual(len(rows), 16)
+        keys = {(r["map"], r["algo"], r["seed"], r["notes"]) for r in rows}
+        self.assertEqual(len(keys), 16)
+        # fuel=4 can't reach the goal on either map
+        self.assertTrue(all(r["cost"] == "FAIL_FUEL" for r in rows if "fuel=4 " in r["notes"]))
+        # the same rows in the store, failures as a status with no cost
+        self.assertEqual(len(stored), 16)
+        self.assertTrue(all(r["status"] == "FAIL_FUEL" and r["cost"] is None for r in stored if "fuel=4 " in r["notes"]))
+        self.assertEqual(sum(s["runs"] for s in summary), 16)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from src.data.grid import ArrayGrid, Grid
+from src.models.bidirectional import bi_astar, bi_ucs
+from src.models.ucs import ucs
+from src.utils.metrics import SearchStats
+
+
+def check_path(test, g, path, start, goal, cost):
+    test.assertEqual(path[0], start)
+    test.assertEqual(path[-1], goal)
+    for a, b in zip(path, path[1:]):
+        test.assertEqual(abs(a[0] - b[0]) + abs(a[1] - b[1]), 1)
+        test.assertFalse(g.is_obstacle(*b))
+    test.assertEqual(sum(g.get_cost(*p) for p in path[1:]), cost)
+
+
+class BidirectionalTests(unittest.TestCase):
+    def test_matches_ucs_on_weighted_grids(self):
+        for seed in range(60):
+            rng = np.random.default_rng(seed)
+            n, m = (int(v) for v in rng.integers(2, 25, size=2))
+            g = ArrayGrid(n, m)
+            g.set_obstacle_mask(rng.random((n, m)) < 0.3)
+            # zero-cost cells too: the heuristic then drops to 0
+            g.set_costs(rng.integers(0 if seed % 3 == 0 else 1, 9, size=(n, m)))
+            start = (int(rng.integers(n)), int(rng.integers(m)))
+            goal = (int(rng.integers(n)), int(rng.integers(m)))
+            g.remove_obstacles({start})
+            best = ucs(g, start, goal)[1]
+            for fn in (bi_ucs, bi_astar):
+                path, cost, _ = fn(g, start, goal)
+                self.assertEqual(cost, best, (seed, fn.__name__))
+                if path:
+                    check_path(self, g, path, start, goal, cost)
+
+    def test_entry_cost_is_asymmetric(self):
+        # 1 x 3 corridor, costs 1 5 2: left to right pays 5 + 2,
+        # right to left 5 + 1
+        g = Grid(1, 3)
+        g.add_cost(0, 1, 5)
+        g.add_cost(0, 2, 2)
+        for fn in (bi_ucs, bi_astar):
+            self.assertEqual(fn(g, (0, 0), (0, 2))[1], 7)
+            self.assertEqual(fn(g, (0, 2), (0, 0))[1], 6)
+
+    def test_fewer_expansions_on_long_queries(self):
+        n = 120
+        rng = np.random.default_rng(0)
+        g = ArrayGrid(n, n)
+        g.set_costs(rng.integers(1, 6, size=(n, n)))
+        start, goal = (n // 2, 2), (n // 2, n - 3)
+        one_way = ucs(g, start, goal)
+        both = bi_ucs(g, start, goal)
+        self.assertEqual(both[1], one_way[1])
+        self.assertLess(both[2], one_way[2])
+
+    def test_limits_and_stats(self):
+        g = ArrayGrid(40, 40)
+        self.assertEqual(bi_ucs(g, (0, 0), (39, 39), fuel_limit=10)[0], [])
+        path, _, nodes = bi_astar(g, (20, 0), (20, 39), max_nodes=5)
+        self.assertEqual((path, nodes), ([], 6))
+        st = SearchStats()
+        _, _, nodes = bi_astar(g, (0, 0), (39, 39), stats=st)
+        self.assertEqual(st.expansions, nodes)
+        self.assertGreaterEqual(st.pushes, nodes)
+        self.assertEqual(bi_ucs(g, (3, 3), (3, 3)), ([(3, 3)], 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import random
+import time
+import unittest
+
+import numpy as np
+
+from src.data.dynamic_obstacles import DynamicObstacles, MovingObstacleManager
+
+SCHEDULE = [
+    {"id": 1, "trajectory": [[2, 2], [2, 3], [2, 4]], "start": 2, "loop": True},
+    {"id": 2, "trajectory": [[5, 7], [5, 6], [5, 5], [5, 4]], "start": 1, "loop": True},
+    {"id": 3, "trajectory": [[0, 0], [0, 1]], "start": 3, "loop": False},
+    {"id": 4, "trajectory": [[2, 3], [2, 3]], "start": 0, "loop": True},
+]
+
+def brute_force(mgr, t):
+    return {tuple(o.position_at(t)) for o in mgr.obstacles if o.position_at(t)}
+
+class TimelineTests(unittest.TestCase):
+    def test_matches_position_at_well_past_the_period(self):
+        mgr = MovingObstacleManager.load_from_list(SCHEDULE)
+        for t in range(60):
+            self.assertEqual(mgr.occupied_at(t), brute_force(mgr, t))
+
+    def test_changes_are_consecutive_diffs(self):
+        mgr = MovingObstacleManager.load_from_list(SCHEDULE)
+        prev = set()
+        for t in range(60):
+            cur = brute_force(mgr, t)
+            added, removed = mgr.changes(t)
+            self.assertEqual(added, cur - prev)
+            self.assertEqual(removed, prev - cur)
+            prev = cur
+
+    def test_thousands_of_looping_movers(self):
+        # lengths 5..20 make the hyperperiod astronomically long; nothing
+        # may be enumerated over it
+        rng = random.Random(0)
+        sched = []
+        for i in range(3000):
+            r, c = rng.randrange(200), rng.randrange(200)
+            sched.append({"id": i, "trajectory": [(r, (c + k) % 200) for k in range(rng.randint(5, 20))],
+                          "start": rng.randrange(10), "loop": True})
+        t0 = time.perf_counter()
+        mgr = MovingObstacleManager.load_from_list(sched)
+        for t in (0, 7, 10 ** 6, 10 ** 9):
+            self.assertEqual(mgr.occupied_at(t), brute_force(mgr, t))
+            added, removed = mgr.changes(t)
+            prev = brute_force(mgr, t - 1)
+            self.assertEqual(added, brute_force(mgr, t) - prev)
+            self.assertEqual(removed, prev - brute_force(mgr, t))
+        tl = mgr.timeline
+        ids = tl.occupied_ids(10 ** 9)
+        self.assertEqual(tl.coords(ids), mgr.occupied_at(10 ** 9))
+        self.assertTrue(np.all(np.diff(ids) > 0))
+        self.assertLess(time.perf_counter() - t0, 5.0)
+
+    def test_dynamic_obstacles_still_one_shot(self):
+        dyn = DynamicObstacles.load_from_list(SCHEDULE)
+        self.assertEqual(dyn.position_at(1, 2), (2, 2))
+        self.assertIsNone(dyn.position_at(1, 5))
+        self.assertEqual(dyn.occupied_at(4), {(2, 4), (5, 4), (0, 1)})
+
+if __name__ == "__main__":
+    unittest.main()
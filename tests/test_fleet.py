@@ -0,0 +1,87 @@
+import unittest
+
+from src.data.dynamic_obstacles import MovingObstacleManager
+from src.data.grid import ArrayGrid
+from src.experiments.run_fleet import fleet_tasks
+from src.models.fleet import ReservationTable, find_conflicts, plan_fleet
+from src.preprocessing.map_generator import generate
+
+
+def clashes(grid, paths):
+    return find_conflicts({a: [grid.index(*c) for c in p] for a, p in enumerate(paths) if p})
+
+
+def pocket_corridor():
+    # one-wide corridor along row 0 with a single pocket at (1, 1)
+    g = ArrayGrid(2, 5)
+    g.add_obstacles({(1, c) for c in range(5) if c != 1})
+    return g
+
+
+class FleetTests(unittest.TestCase):
+    def test_many_agents_without_conflicts(self):
+        g, _, _ = generate("random", 40, seed=2)
+        tasks = fleet_tasks(g, 60, seed=2)
+        for mode in ("prioritized", "cbs"):
+            paths, rep = plan_fleet(g, tasks, mode=mode)
+            self.assertEqual(clashes(g, paths), [])
+            self.assertEqual(rep["planned"] + rep["failed"], 60)
+            self.assertGreater(rep["planned"], 50)
+            for (s, t), p in zip(tasks, paths):
+                if p:
+                    self.assertEqual((p[0], p[-1]), (s, t))
+                    for a, b in zip(p, p[1:]):
+                        self.assertLessEqual(abs(a[0] - b[0]) + abs(a[1] - b[1]), 1)
+                        self.assertFalse(g.is_obstacle(*b))
+            self.assertEqual(rep["makespan"], max(len(p) - 1 for p in paths if p))
+
+    def test_cbs_solves_what_priority_order_cannot(self):
+        g = pocket_corridor()
+        # agent 0 parks in the corridor before agent 1 can get by
+        tasks = [((1, 1), (0, 2)), ((0, 4), (0, 0))]
+        paths, rep = plan_fleet(g, tasks)
+        self.assertEqual(rep["failed"], 1)
+        paths, rep = plan_fleet(g, tasks, mode="cbs")
+        self.assertEqual(rep["failed"], 0)
+        self.assertEqual(rep["cbs_groups"], 1)
+        # agent 1 walks straight through, agent 0 waits in the pocket
+        self.assertEqual(rep["sum_of_costs"], 4 + 5)
+        self.assertEqual(clashes(g, paths), [])
+
+    def test_goal_not_taken_before_others_pass(self):
+        g = pocket_corridor()
+        # the first agent reserved (0, 2) at t = 2; the second may not park there earlier
+        table = ReservationTable()
+        table.reserve(0, [g.index(0, 4), g.index(0, 3), g.index(0, 2), g.index(0, 1)], park=False)
+        self.assertFalse(table.free([g.index(0, 3), g.index(0, 2)]))
+        paths, _ = plan_fleet(g, [((0, 4), (0, 0)), ((1, 1), (0, 2))])
+        self.assertGreater(len(paths[1]), 3)
+        self.assertEqual(clashes(g, paths), [])
+
+    def test_keeps_clear_of_movers(self):
+        g = ArrayGrid(3, 6)
+        movers = MovingObstacleManager.load_from_list(
+            [{"id": 1, "trajectory": [[1, 2], [1, 3], [1, 4], [1, 3]], "start": 0, "loop": True}])
+        tasks = [((1, 0), (1, 5)), ((0, 5), (2, 0))]
+        paths, rep = plan_fleet(g, tasks, movers=movers)
+        self.assertEqual(rep["failed"], 0)
+        for p in paths:
+            for t, cell in enumerate(p):
+                self.assertNotIn(cell, movers.occupied_at(t))
+                if t:
+                    # no swapping places with the mover either
+                    self.assertFalse(cell in movers.occupied_at(t - 1) and p[t - 1] in movers.occupied_at(t))
+
+    def test_unreachable_goal_fails_alone(self):
+        g = ArrayGrid(5, 5)
+        g.add_obstacles({(3, 4), (4, 3)})
+        paths, rep = plan_fleet(g, [((0, 0), (4, 4)), ((0, 4), (4, 0))])
+        self.assertEqual(paths[0], [])
+        self.assertEqual(len(paths[1]), 9)
+        self.assertEqual(rep["failed"], 1)
+        with self.assertRaises(ValueError):
+            plan_fleet(g, [], mode="swarm")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.data.grid import Grid
+from src.models.flow_field import FlowField, FlowFields
+from src.models.search_core import UNREACHED
+from src.models.ucs import ucs
+
+from helpers import random_grid
+
+
+def check(test, f, g):
+    fresh = FlowField(g, f.goal_cell)
+    test.assertEqual(list(f.dist), list(fresh.dist))
+    for i, d in enumerate(f.dist):
+        if d not in (0, UNREACHED):
+            path = f.path(g.coord(i))
+            test.assertEqual(sum(g.get_cost(*p) for p in path[1:]), d)
+
+
+class FlowFieldTests(unittest.TestCase):
+    def test_matches_ucs(self):
+        g = random_grid(16, 0, clear=False)
+        rnd = random.Random(0)
+        free = [tuple(c) for c in np.argwhere(g.obstacle_view() == 0).tolist()]
+        goal = free[0]
+        f = FlowField(g, goal)
+        for s in rnd.sample(free, 30):
+            self.assertEqual(f.cost_to_go(s), ucs(g, s, goal)[1])
+            nxt = f.next_step(s)
+            if s != goal and nxt is not None:
+                self.assertEqual(f.cost_to_go(s), f.cost_to_go(nxt) + g.get_cost(*nxt))
+
+    def test_repair_equals_rebuild(self):
+        for seed in range(12):
+            g = random_grid(16, seed, max_cost=5 if seed % 2 == 0 else 1, clear=False)
+            rnd = random.Random(seed)
+            cells = [(r, c) for r in range(16) for c in range(16)]
+            goal = rnd.choice([c for c in cells if not g.is_obstacle(*c)])
+            f = FlowField(g, goal)
+            for _ in range(15):
+                changed = set(rnd.sample(cells, rnd.randint(1, 6)))
+                for cell in changed:
+                    if rnd.random() < 0.2:
+                        g.add_cost(*cell, rnd.randint(1, 6))
+                    elif g.is_obstacle(*cell):
+                        g.remove_obstacle(*cell)
+                    else:
+                        g.add_obstacle(*cell)
+                f.update(changed)
+                check(self, f, g)
+            # the goal itself blocked, then freed again
+            g.add_obstacle(*goal)
+            f.sync()
+            self.assertTrue(all(d == UNREACHED for d in f.dist))
+            g.remove_obstacle(*goal)
+            f.sync()
+            check(self, f, g)
+
+    def test_plain_grid_and_lru(self):
+        g = Grid(5, 5)
+        for r in range(4):
+            g.add_obstacle(r, 2)
+        fields = FlowFields(g, capacity=2)
+        self.assertEqual(fields.field((0, 4)).cost_to_go((0, 0)), 12)
+        self.assertEqual(fields.next_step((3, 1), (0, 4)), (4, 1))
+        g.remove_obstacle(0, 2)
+        # picked up from the grid's change log, no rebuild
+        self.assertEqual(fields.field((0, 4)).path((0, 0)), [(0, 0), (0, 1), (0, 2), (0, 3), (0, 4)])
+        fields.field((4, 4))
+        fields.field((0, 0))
+        info = fields.info()
+        self.assertEqual((info["builds"], info["hits"], info["evictions"], info["size"]), (3, 2, 1, 2))
+        self.assertNotIn((0, 4), fields._fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import heapq
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.data.grid import ArrayGrid, Grid
+from src.experiments.run_experiment import solve
+from src.models.fuel import fuel_astar, refuel_stops
+from src.models.ucs import ucs
+from src.preprocessing.map_generator import generate, place_stations, save_map
+from src.preprocessing.map_loader import load_map_from_file, save_binary_map
+
+from helpers import random_grid
+
+
+def brute(g, s, t, cap, stations):
+    # Dijkstra over every (cell, fuel) state
+    dist = {(s, cap): 0}
+    heap = [(0, s, cap)]
+    while heap:
+        d, c, f = heapq.heappop(heap)
+        if d > dist[(c, f)]:
+            continue
+        if c == t:
+            return d
+        for n in g.neighbors(*c):
+            k = g.get_cost(*n)
+            if k > f:
+                continue
+            nf = cap if n in stations else f - k
+            if d + k < dist.get((n, nf), float("inf")):
+                dist[(n, nf)] = d + k
+                heapq.heappush(heap, (d + k, n, nf))
+    return float("inf")
+
+
+class FuelTests(unittest.TestCase):
+    def test_matches_exhaustive_search(self):
+        rnd = random.Random(1)
+        for seed in range(60):
+            n = 10
+            g = random_grid(n, seed, max_cost=4, clear=False)
+            free = [tuple(x) for x in np.argwhere(g.obstacle_view() == 0).tolist()]
+            s, t = rnd.sample(free, 2)
+            stations = set(rnd.sample(free, 3))
+            cap = rnd.randint(3, 20)
+            path, cost, _ = fuel_astar(g, s, t, cap, stations=stations)
+            self.assertEqual(cost, brute(g, s, t, cap, stations))
+            if path:
+                f = cap
+                for cell in path[1:]:
+                    f -= g.get_cost(*cell)
+                    self.assertGreaterEqual(f, 0)
+                    if cell in stations:
+                        f = cap
+
+    def test_refuel_beats_fuel_limit(self):
+        g = Grid(1, 10)
+        g.add_station(0, 5)
+        self.assertEqual(ucs(g, (0, 0), (0, 9), fuel_limit=6)[0], [])
+        path, cost, _ = fuel_astar(g, (0, 0), (0, 9), 6)
+        self.assertEqual(cost, 9)
+        self.assertEqual(refuel_stops(g, path), [(0, 5)])
+        # starting half empty it can't make the station
+        self.assertEqual(fuel_astar(g, (0, 0), (0, 9), 6, fuel=4)[1], float("inf"))
+        # without stations it is the fuel_limit query
+        self.assertEqual(fuel_astar(g, (0, 0), (0, 9), 9, stations=())[1], 9)
+        path, cost, nodes, _, reason, _ = solve(g, (0, 0), (0, 9), "fuel", fuel=6)
+        self.assertEqual((cost, reason), (9, ""))
+        self.assertEqual(solve(g, (0, 0), (0, 9), "fuel", fuel=4)[4], "FAIL_FUEL")
+
+    def test_detour_to_station(self):
+        # the station sits off the straight line; the tank can't do it direct
+        g = ArrayGrid(3, 8)
+        g.add_station(2, 3)
+        path, cost, _ = fuel_astar(g, (0, 0), (0, 7), 6)
+        self.assertEqual(cost, 11)
+        self.assertIn((2, 3), path)
+
+    def test_stations_in_map_files(self):
+        g, s, t = generate("random", 30, seed=3)
+        placed = place_stations(g, 5, seed=3, avoid=(s, t))
+        self.assertEqual(len(placed), 5)
+        with tempfile.TemporaryDirectory() as d:
+            for name, save in (("m.txt", save_map), ("m.bmap", save_binary_map)):
+                path = os.path.join(d, name)
+                save(path, g, s, t)
+                for compact in (True, False):
+                    loaded, ls, lt = load_map_from_file(path, compact=compact)
+                    self.assertEqual(loaded.stations, set(placed))
+                    self.assertEqual((ls, lt), (s, t))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.data.grid import Grid
+from src.data.grid import Grid, ArrayGrid
 
 class GridTests(unittest.TestCase):
     def test_put_obstacle(self):
@@ -19,5 +19,60 @@ class GridTests(unittest.TestCase):
         # if this fails, cost system is broken
         self.assertEqual(g.get_cost(0, 0), 5)
 
+    def test_cells_are_read_only(self):
+        # writes have to go through the methods so the version moves
+        g = Grid(3, 3)
+        g.add_obstacle(1, 1)
+        g.add_cost(0, 1, 2)
+        with self.assertRaises(AttributeError):
+            g.obstacles.add((2, 2))
+        with self.assertRaises(TypeError):
+            g.costs[(0, 1)] = 50
+        with self.assertRaises(AttributeError):
+            g.costs = {}
+        self.assertEqual(g.obstacles, {(1, 1)})
+        self.assertEqual(dict(g.costs), {(0, 1): 2})
+
+
+class ArrayGridTests(unittest.TestCase):
+    def test_same_answers_as_grid(self):
+        g, a = Grid(4, 5), ArrayGrid(4, 5)
+        for grid in (g, a):
+            grid.add_obstacle(1, 1)
+            grid.add_obstacle(3, 4)
+            grid.add_cost(0, 2, 7)
+        for r in range(-1, 5):
+            for c in range(-1, 6):
+                self.assertEqual(g.is_obstacle(r, c), a.is_obstacle(r, c))
+                self.assertEqual(g.neighbors(r, c), a.neighbors(r, c))
+        self.assertEqual(a.get_cost(0, 2), 7)
+        self.assertEqual(a.obstacles, g.obstacles)
+
+    def test_views_share_memory(self):
+        a = ArrayGrid(3, 3)
+        a.obstacle_view()[2, 0] = 1
+        self.assertTrue(a.is_obstacle(2, 0))
+        a.remove_obstacles([(2, 0)])
+        self.assertFalse(a.obstacle_view().any())
+
+    def test_from_grid_copies_costs(self):
+        g = Grid(3, 3)
+        g.add_obstacle(0, 1)
+        g.add_cost(2, 2, 4)
+        a = ArrayGrid.from_grid(g)
+        self.assertTrue(a.is_obstacle(0, 1))
+        self.assertEqual(a.costs, {(2, 2): 4})
+
+    def test_change_log(self):
+        for g in (Grid(3, 3), ArrayGrid(3, 3)):
+            v = g.version
+            g.add_obstacle(0, 1)
+            g.add_cost(2, 2, 5)
+            self.assertEqual(g.changed_since(v), {(0, 1), (2, 2)})
+            self.assertEqual(g.changed_since(g.version), set())
+        g.set_costs([[1] * 3] * 3)
+        # bulk writes aren't logged cell by cell
+        self.assertIsNone(g.changed_since(v))
+
 if __name__ == "__main__":
     unittest.main()
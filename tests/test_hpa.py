@@ -0,0 +1,53 @@
+import unittest
+from src.data.grid import ArrayGrid
+from src.models.hpa import HPAStar
+from src.models.replanner import Replanner
+from src.models.ucs import ucs
+
+from helpers import random_grid
+
+class HPATests(unittest.TestCase):
+    def check(self, g, hpa, a, b):
+        _, want, _ = ucs(g, a, b)
+        path, cost, _ = hpa.plan(a, b)
+        if want == float("inf"):
+            self.assertEqual(path, [])
+            return
+        self.assertGreaterEqual(cost, want)
+        self.assertEqual((path[0], path[-1]), (a, b))
+        for x, y in zip(path, path[1:]):
+            self.assertEqual(abs(x[0] - y[0]) + abs(x[1] - y[1]), 1)
+            self.assertFalse(g.is_obstacle(*y))
+        self.assertEqual(sum(g.get_cost(*x) for x in path[1:]), cost)
+
+    def test_paths_are_valid_and_near_optimal(self):
+        for seed in range(10):
+            g = random_grid(24, seed, density=0.2)
+            hpa = HPAStar(g, cluster_size=6)
+            self.check(g, hpa, (0, 0), (23, 23))
+            self.check(g, hpa, (23, 23), (0, 0))
+
+    def test_update_only_rebuilds_touched_clusters(self):
+        g = random_grid(24, 1, density=0.2)
+        hpa = HPAStar(g, cluster_size=6)
+        g.add_obstacle(9, 9)    # middle of cluster (1, 1)
+        self.assertEqual(hpa.update_cells([(9, 9)]), 1)
+        fresh = HPAStar(g, cluster_size=6)
+        self.assertEqual(hpa.intra, fresh.intra)
+        self.assertEqual(hpa.plan((0, 0), (23, 23))[1], fresh.plan((0, 0), (23, 23))[1])
+
+    def test_replanner_feeds_changes(self):
+        g = ArrayGrid(12, 12)
+        repl = Replanner(g, cluster_size=4)
+        path, cost, _, _ = repl.plan_path((0, 0), (0, 11), algo="hpa")
+        self.assertTrue(path)
+        wall = [(r, 6) for r in range(11)]
+        for cell in wall:
+            g.add_obstacle(*cell)
+        path, cost, _, _ = repl.replan_if_needed(path, (0, 0), (0, 11), algo="hpa", changed=set(wall))
+        self.assertNotIn((0, 6), path)
+        self.assertGreaterEqual(cost, ucs(g, (0, 0), (0, 11))[1])
+        self.assertLess(repl.hpa.report()["clusters_rebuilt"], 9)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from src.data.grid import ArrayGrid, Grid
+from src.models.jps import jps, jps_plus, jump_table_for
+from src.models.astar import astar
+from src.models.ucs import ucs
+
+from helpers import random_grid
+
+class JPSTests(unittest.TestCase):
+    def check(self, g, a, b):
+        _, want, _ = ucs(g, a, b)
+        for fn in (jps, jps_plus):
+            path, cost, _ = fn(g, a, b)
+            self.assertEqual(cost, want)
+            if path:
+                self.assertEqual((path[0], path[-1]), (a, b))
+                for x, y in zip(path, path[1:]):
+                    self.assertEqual(abs(x[0] - y[0]) + abs(x[1] - y[1]), 1)
+                self.assertEqual(sum(g.get_cost(*x) for x in path[1:]), cost)
+
+    def test_matches_ucs_with_weighted_terrain(self):
+        for seed in range(30):
+            self.check(random_grid(16, seed, density=0.2, cls=Grid if seed % 2 else ArrayGrid), (0, 0), (15, 15))
+
+    def test_expands_fewer_nodes_in_open_space(self):
+        g = ArrayGrid(40, 40)
+        for r in range(5, 35):
+            g.add_obstacle(r, 20)
+        _, c1, n1 = astar(g, (20, 0), (20, 39))
+        _, c2, n2 = jps_plus(g, (20, 0), (20, 39))
+        self.assertEqual(c1, c2)
+        self.assertLess(n2, n1)
+
+    def test_tables_follow_obstacle_changes(self):
+        g = random_grid(16, 3, density=0.2, max_cost=1)
+        first = jump_table_for(g)
+        self.assertIs(jump_table_for(g), first)
+        g.add_obstacle(7, 7)
+        self.assertIsNot(jump_table_for(g), first)
+        g.remove_obstacle(7, 7)
+        self.check(g, (0, 0), (15, 15))
+
+if __name__ == "__main__":
+    unittest.main()
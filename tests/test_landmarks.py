@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.data.grid import ArrayGrid
+from src.models.astar import astar
+from src.models.ucs import ucs
+from src.models import landmarks
+from src.models.landmarks import Landmarks
+
+class LandmarkTests(unittest.TestCase):
+    def setUp(self):
+        self.g = ArrayGrid(12, 12)
+        for r in range(10):
+            self.g.add_obstacle(r, 6)
+        for c in range(12):
+            self.g.add_cost(11, c, 4)
+        self.lm = Landmarks.build(self.g, k=4)
+
+    def test_alt_stays_optimal_and_expands_less(self):
+        _, c_ucs, _ = ucs(self.g, (0, 0), (0, 11))
+        _, c_man, n_man = astar(self.g, (0, 0), (0, 11))
+        _, c_alt, n_alt = astar(self.g, (0, 0), (0, 11), heuristic=self.lm)
+        self.assertEqual(c_alt, c_ucs)
+        self.assertLessEqual(n_alt, n_man)
+
+    def test_saved_tables_round_trip(self):
+        with tempfile.TemporaryDirectory() as d:
+            mapfile = os.path.join(d, "city.txt")
+            Landmarks.for_map(mapfile, self.g, k=4)
+            self.assertTrue(Landmarks.path_for(mapfile).exists())
+            again = Landmarks.for_map(mapfile, self.g, k=4)
+            self.assertEqual(again.cells, self.lm.cells)
+
+    def test_edited_grid_falls_back_to_manhattan(self):
+        self.g.add_obstacle(10, 6)
+        self.assertIsNone(self.lm.estimator(self.g, (0, 11)))
+        # still finds the (now longer) way round
+        self.assertEqual(astar(self.g, (0, 0), (0, 11), heuristic=self.lm)[1],
+                         ucs(self.g, (0, 0), (0, 11))[1])
+
+    def test_edits_are_checked_without_rehashing(self):
+        with mock.patch.object(landmarks, "grid_digest", side_effect=AssertionError("hashed")):
+            self.g.add_obstacle(10, 6)
+            self.assertIsNone(self.lm.estimator(self.g, (0, 11)))
+            self.assertIsNone(self.lm.estimator(self.g, (0, 11)))
+            # taking the wall out again puts the map back as it was built
+            self.g.remove_obstacle(10, 6)
+            self.assertIsNotNone(self.lm.estimator(self.g, (0, 11)))
+
+    def test_fewer_landmarks_than_asked_are_not_rebuilt(self):
+        g = ArrayGrid(1, 2)
+        with tempfile.TemporaryDirectory() as d:
+            mapfile = os.path.join(d, "tiny.txt")
+            first = Landmarks.for_map(mapfile, g, k=8)
+            self.assertLess(len(first.cells), 8)
+            with mock.patch.object(Landmarks, "build", side_effect=AssertionError("rebuilt")):
+                again = Landmarks.for_map(mapfile, g, k=8)
+            self.assertEqual(again.cells, first.cells)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from src.data.grid import ArrayGrid
+from src.experiments.lockstep import COLLISION, GOAL, NO_PATH, make_episodes, run_episode, run_lockstep
+from src.preprocessing.map_generator import generate
+
+
+class LockstepTests(unittest.TestCase):
+    def test_matches_one_episode_at_a_time(self):
+        for kind, seed in (("urban", 0), ("random", 1), ("terrain", 2)):
+            grid, _, _ = generate(kind, 40, seed=seed)
+            eps = make_episodes(grid, 60, movers=25, pairs=10 if seed else 0, seed=seed)
+            res = run_lockstep(grid, eps, max_steps=200)
+            for e, (s, g, m) in enumerate(eps):
+                got = tuple(int(res[k][e]) for k in ("status", "steps", "cost", "replans"))
+                self.assertEqual(got, run_episode(grid, s, g, m, max_steps=200))
+            self.assertEqual(res["goal"] + res["collision"] + res["no_path"] + res["max_steps"], 60)
+            self.assertGreater(res["goal"], 0)
+
+    def test_replans_collisions_and_dead_ends(self):
+        g = ArrayGrid(3, 6)
+        g.add_obstacles([(1, c) for c in range(1, 5)])
+        # parks on the top corridor from t=1: the agent backs up and goes round the bottom
+        park = [{"trajectory": [(0, 3)], "start": 1, "loop": True}]
+        # drops onto the cell the agent has just stepped into
+        ram = [{"trajectory": [(0, 1)], "start": 1, "loop": False}]
+        # shuts the only way out of the start
+        wall = [{"trajectory": [(1, 0)], "start": 0, "loop": True},
+                {"trajectory": [(0, 1)], "start": 0, "loop": True}]
+        eps = [((0, 0), (0, 5), park), ((0, 0), (0, 5), ram), ((0, 0), (0, 5), wall), ((0, 0), (0, 5), None)]
+        res = run_lockstep(g, eps)
+        self.assertEqual(res["status"].tolist(), [GOAL, COLLISION, NO_PATH, GOAL])
+        self.assertEqual(res["steps"].tolist(), [11, 1, 0, 5])
+        self.assertEqual(res["replans"].tolist()[0], 1)
+        # the grid is left as it was
+        self.assertEqual(g.obstacles, {(1, c) for c in range(1, 5)})
+
+
+if __name__ == "__main__":
+    unittest.main()
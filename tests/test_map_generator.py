@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+from src.preprocessing.map_generator import KINDS, generate, generate_schedule, save_map
+from src.preprocessing.map_loader import load_map_from_file
+from src.models.ucs import ucs
+from src.experiments.benchmark import compare, measure
+
+class MapGeneratorTests(unittest.TestCase):
+    def test_seeded_and_connected(self):
+        for kind in KINDS:
+            for n in (5, 40):
+                g, s, t = generate(kind, n, seed=3)
+                g2, _, _ = generate(kind, n, seed=3)
+                self.assertTrue((g.mask == g2.mask).all() and (g.cost == g2.cost).all(), kind)
+                self.assertNotEqual(s, t)
+                self.assertTrue(ucs(g, s, t)[0], f"{kind} {n}: goal unreachable")
+
+    def test_text_round_trip(self):
+        for kind in KINDS:
+            g, s, t = generate(kind, 30, 45, seed=1)
+            with tempfile.TemporaryDirectory() as d:
+                path = os.path.join(d, "m.txt")
+                save_map(path, g, s, t)
+                g2, s2, t2 = load_map_from_file(path, compact=True)
+            self.assertEqual((s2, t2), (s, t))
+            self.assertTrue((g2.mask == g.mask).all() and (g2.cost == g.cost).all(), kind)
+
+    def test_schedule_moves_one_step_on_free_cells(self):
+        g, s, t = generate("urban", 50, seed=2)
+        sched = generate_schedule(g, 8, length=15, seed=2, avoid=(s, t))
+        json.dumps(sched)
+        self.assertEqual(len(sched), 8)
+        for m in sched:
+            traj = [tuple(p) for p in m["trajectory"]]
+            self.assertTrue(all(not g.is_obstacle(*p) and p not in (s, t) for p in traj))
+            # looping back to the first cell is a single step too
+            for a, b in zip(traj, traj[1:] + traj[:1]):
+                self.assertLessEqual(abs(a[0] - b[0]) + abs(a[1] - b[1]), 1)
+
+class BenchmarkTests(unittest.TestCase):
+    def test_compare_flags_regressions(self):
+        g, s, t = generate("random", 30, seed=0)
+        r = measure(g, s, t, "astar", warmup=0, repeats=1)
+        self.assertGreater(r["nodes"], 0)
+        self.assertEqual(compare({"k": r}, {"k": dict(r)}), [])
+        slow = dict(r, median_s=r["median_s"] * 0.5)
+        other = dict(r, nodes=r["nodes"] + 1)
+        self.assertEqual(len(compare({"k": r}, {"k": slow})), 1)
+        self.assertEqual(len(compare({"k": r}, {"k": other})), 1)
+        # a goal that wasn't reached fails even against a baseline that agrees
+        lost = dict(r, cost=None)
+        self.assertEqual(compare({"k": lost}, {"k": dict(lost)}), ["k: goal not reached"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from src.preprocessing.map_loader import (convert_to_binary, is_binary_map, load_map_from_file,
+                                          load_text_map)
+
+MAP = """3 4
+S . 7 #
+
+# 12 . G
+. . 3 .
+"""
+
+class MapLoaderTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.txt = os.path.join(self.dir.name, "m.txt")
+        with open(self.txt, "w") as f:
+            f.write(MAP)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_text_cells(self):
+        # blank lines are skipped, multi-digit costs still parse
+        g, s, t = load_map_from_file(self.txt)
+        self.assertEqual((s, t), ((0, 0), (1, 3)))
+        self.assertEqual(g.obstacles, {(0, 3), (1, 0)})
+        self.assertEqual((g.get_cost(0, 2), g.get_cost(1, 1), g.get_cost(2, 2), g.get_cost(2, 0)), (7, 12, 3, 1))
+
+    def test_small_chunks_match(self):
+        a, s, t = load_text_map(self.txt, compact=True)
+        for size in (1, 5, 13):
+            b, s2, t2 = load_text_map(self.txt, compact=True, chunk_size=size)
+            self.assertEqual((s, t), (s2, t2))
+            self.assertTrue((a.mask == b.mask).all() and (a.cost == b.cost).all())
+
+    def test_binary_round_trip_is_detected(self):
+        a, s, t = load_map_from_file(self.txt, compact=True)
+        path = convert_to_binary(self.txt)
+        self.assertTrue(str(path).endswith(".bmap") and is_binary_map(path))
+        self.assertFalse(is_binary_map(self.txt))
+        b, s2, t2 = load_map_from_file(path, compact=True)
+        self.assertEqual((s, t), (s2, t2))
+        self.assertTrue((a.mask == b.mask).all() and (a.cost == b.cost).all())
+        self.assertEqual(load_map_from_file(path)[0].obstacles, {(0, 3), (1, 0)})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from src.data.grid import ArrayGrid, Grid
+from src.models.one_to_many import many_to_one, one_to_many
+from src.models.search_core import dijkstra_many
+from src.models.ucs import ucs
+from src.utils.metrics import SearchStats
+
+from helpers import path_cost, random_grid
+
+
+def weighted_grid(n, seed):
+    # unit costs on even seeds
+    return random_grid(n, seed, density=0.3, max_cost=5 if seed % 2 else 1, clear=False)
+
+
+class OneToManyTests(unittest.TestCase):
+    def test_matches_ucs_both_ways(self):
+        for seed in range(12):
+            g = weighted_grid(15, seed)
+            cells = [(r, c) for r in range(0, 15, 3) for c in range(0, 15, 4)]
+            depot = cells.pop(seed % len(cells))
+            out = one_to_many(g, depot, cells)
+            back = many_to_one(g, cells, depot)
+            for t in cells:
+                self.assertEqual(out.cost(t), ucs(g, depot, t)[1])
+                self.assertEqual(back.cost(t), ucs(g, t, depot)[1])
+                p = out.path(t)
+                if p:
+                    self.assertEqual((p[0], p[-1]), (depot, t))
+                    self.assertEqual(path_cost(g, p), out.cost(t))
+                q = back.path(t)
+                if q:
+                    self.assertEqual((q[0], q[-1]), (t, depot))
+                    self.assertEqual(path_cost(g, q), back.cost(t))
+
+    def test_stops_once_targets_are_settled(self):
+        g = ArrayGrid(100, 100)
+        near = one_to_many(g, (0, 0), [(0, 1), (1, 0)])
+        self.assertLess(near.nodes, 10)
+        self.assertEqual(dijkstra_many(g, (0, 0), [(0, 1), (99, 99)]), {(0, 1): 1, (99, 99): 198})
+        # cut short by the budget: what was not settled stays unreached
+        short = one_to_many(g, (0, 0), [(0, 1), (99, 99)], max_nodes=50)
+        self.assertEqual(short.cost((0, 1)), 1)
+        self.assertEqual(short.path((99, 99)), [])
+
+    def test_blocked_and_unknown_cells(self):
+        g = Grid(5, 5)
+        g.add_obstacle(0, 0)
+        g.add_obstacle(4, 4)
+        # a start on an obstacle can still leave it, a goal there can't be reached
+        back = many_to_one(g, [(0, 0), (4, 4), (9, 9)], (2, 2))
+        self.assertEqual(back.cost((0, 0)), ucs(g, (0, 0), (2, 2))[1])
+        self.assertEqual(back.cost((4, 4)), 4)
+        self.assertEqual(back.cost((9, 9)), float("inf"))
+        self.assertEqual(one_to_many(g, (2, 2), [(4, 4)]).cost((4, 4)), float("inf"))
+        out = one_to_many(g, (0, 0), [(4, 4), (2, 2)], fuel_limit=3)
+        self.assertEqual(out.cost((4, 4)), float("inf"))
+        self.assertEqual(out.cost((2, 2)), float("inf"))
+        self.assertEqual(dict(out.paths()), {})
+
+    def test_stats(self):
+        g = weighted_grid(30, 1)
+        st = SearchStats()
+        tree = one_to_many(g, (0, 0), [(29, 29), (15, 3)], stats=st)
+        self.assertEqual(st.expansions, tree.nodes)
+        self.assertEqual(st.searches, 1)
+        self.assertIn("search", st.phases)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+from src.data.grid import Grid, ArrayGrid
+from src.models.astar import astar
+from src.models.replanner import Replanner
+from src.models.dstar_lite import DStarLite
+
+class DStarLiteTests(unittest.TestCase):
+    def setUp(self):
+        self.g = ArrayGrid(6, 6)
+        for r in range(5):
+            self.g.add_obstacle(r, 3)
+
+    def test_first_plan_matches_astar(self):
+        d = DStarLite(self.g, (0, 0), (0, 5))
+        path, cost, _ = d.plan()
+        self.assertEqual(cost, astar(self.g, (0, 0), (0, 5))[1])
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(path[-1], (0, 5))
+
+    def test_repair_after_wall_opens(self):
+        d = DStarLite(self.g, (0, 0), (0, 5))
+        d.plan()
+        self.g.remove_obstacle(0, 3)
+        d.update_cells([(0, 3)])
+        path, cost, nodes = d.plan()
+        # straight along the top row now
+        self.assertEqual(cost, 5)
+        self.assertLess(nodes, 36)
+
+    def test_moving_start_and_plain_grid(self):
+        g = Grid(4, 4)
+        d = DStarLite(g, (0, 0), (3, 3))
+        d.plan()
+        g.add_obstacle(1, 1)
+        d.update_start((0, 1))
+        d.update_cells([(1, 1)])
+        self.assertEqual(d.plan()[1], astar(g, (0, 1), (3, 3))[1])
+
+class ReplannerTests(unittest.TestCase):
+    def test_dstar_replans_around_new_obstacle(self):
+        g = ArrayGrid(5, 5)
+        repl = Replanner(g)
+        path, _, _, _ = repl.plan_path((0, 0), (0, 4), algo="dstar")
+        g.add_obstacle(0, 2)
+        path, cost, _, _ = repl.replan_if_needed(path, (0, 0), (0, 4), algo="dstar",
+                                                 changed={(0, 2)})
+        self.assertNotIn((0, 2), path)
+        self.assertEqual(cost, 6)
+
+class PathCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.g = ArrayGrid(8, 8)
+        self.repl = Replanner(self.g, cache_size=2)
+
+    def test_repeat_and_subpath_hits(self):
+        path, cost, _, _ = self.repl.plan_path((0, 0), (7, 7))
+        again = self.repl.plan_path((0, 0), (7, 7))
+        self.assertEqual(again[:3], (path, cost, 0))
+        mid = path[5]
+        sub, sub_cost, _, _ = self.repl.plan_path(mid, (7, 7))
+        self.assertEqual(sub, path[5:])
+        self.assertEqual(sub_cost, cost - 5)
+        info = self.repl.cache_info()
+        self.assertEqual((info["hits"], info["subpath_hits"], info["misses"]), (1, 1, 1))
+
+    def test_only_changes_on_the_path_invalidate(self):
+        path, _, _, _ = self.repl.plan_path((0, 0), (7, 7))
+        off = next((r, c) for r in range(8) for c in range(8) if (r, c) not in path)
+        self.g.add_obstacle(*off)
+        self.repl.plan_path((0, 0), (7, 7))
+        self.assertEqual(self.repl.cache_info()["hits"], 1)
+        self.g.add_obstacle(*path[3])
+        new, _, _, _ = self.repl.plan_path((0, 0), (7, 7))
+        self.assertNotIn(path[3], new)
+        self.assertEqual(self.repl.cache_info()["invalidations"], 1)
+
+    def test_lru_eviction(self):
+        # no query lies along another's path, so all three are misses
+        for start, goal in (((0, 0), (7, 7)), ((7, 7), (0, 0)), ((7, 0), (0, 7))):
+            self.repl.plan_path(start, goal)
+        info = self.repl.cache_info()
+        self.assertEqual((info["size"], info["evictions"]), (2, 1))
+
+class PlanCheckTests(unittest.TestCase):
+    def setUp(self):
+        # wall down the middle of row 0 and 1: (0, 1) -> (0, 3) goes via row 2
+        self.g = ArrayGrid(4, 5)
+        self.g.add_obstacles([(0, 2), (1, 2)])
+        self.repl = Replanner(self.g, cache_size=0)
+        self.path = self.repl.plan_path((0, 1), (0, 3))[0]
+        self.assertEqual(self.repl.replan_if_needed(self.path, (0, 1), (0, 3))[0], self.path)
+
+    def test_only_deltas_are_checked(self):
+        rest = self.path[1:]
+        self.g.add_obstacle(3, 0)
+        same, _, n, _ = self.repl.replan_if_needed(rest, rest[0], (0, 3), changed={(3, 0)})
+        self.assertIs(same, rest)
+        # no changed cells given: the grid's change log is used
+        self.g.add_obstacle(*rest[2])
+        new, cost, _, _ = self.repl.replan_if_needed(rest, rest[0], (0, 3))
+        self.assertNotIn(rest[2], new)
+        self.assertEqual(cost, astar(self.g, rest[0], (0, 3))[1])
+        info = self.repl.replan_info()
+        # only the very first check in setUp scanned the path
+        self.assertEqual((info["rescans"], info["skipped"], info["blocked"]), (1, 2, 1))
+
+    def test_freed_cell_opens_a_shortcut(self):
+        # a cell freed away from the plan: nothing to gain
+        self.g.add_obstacle(3, 0)
+        self.repl.replan_if_needed(self.path, (0, 1), (0, 3), changed={(3, 0)})
+        self.g.remove_obstacle(3, 0)
+        same = self.repl.replan_if_needed(self.path, (0, 1), (0, 3), changed={(3, 0)})[0]
+        self.assertIs(same, self.path)
+        self.g.remove_obstacle(0, 2)
+        new, cost, _, _ = self.repl.replan_if_needed(self.path, (0, 1), (0, 3), changed={(0, 2)})
+        self.assertEqual((new, cost), ([(0, 1), (0, 2), (0, 3)], 2))
+        self.assertEqual(self.repl.replan_info()["shortcut"], 1)
+        # switched off, the longer plan is kept
+        self.g.add_obstacle(0, 2)
+        repl = Replanner(self.g, cache_size=0, shortcuts=False)
+        path = repl.plan_path((0, 1), (0, 3))[0]
+        repl.replan_if_needed(path, (0, 1), (0, 3))
+        self.g.remove_obstacle(0, 2)
+        self.assertIs(repl.replan_if_needed(path, (0, 1), (0, 3), changed={(0, 2)})[0], path)
+
+    def test_shortcut_skips_the_cached_detour(self):
+        g = ArrayGrid(4, 5)
+        g.add_obstacles([(0, 2), (1, 2)])
+        repl = Replanner(g)
+        path = repl.plan_path((0, 0), (0, 4))[0]
+        self.assertEqual(len(path), 9)
+        repl.replan_if_needed(path, (0, 0), (0, 4))
+        g.remove_obstacle(0, 2)
+        new, cost, nodes, _ = repl.replan_if_needed(path, (0, 0), (0, 4), changed={(0, 2)})
+        self.assertEqual((new, cost), ([(0, c) for c in range(5)], 4))
+        self.assertGreater(nodes, 0)
+        self.assertEqual(repl.replan_info()["shortcut"], 1)
+        self.assertEqual(repl.cache_info()["hits"], 0)
+        # the shorter plan is what the cache keeps now
+        self.assertEqual(repl.plan_path((0, 0), (0, 4))[0], new)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.experiments.plot_results import report
+from src.utils.results_store import ResultsStore
+
+
+def fake_rows(rng, n, seed=0):
+    rows = []
+    for k in range(n):
+        algo = ("astar", "ucs")[k % 2]
+        failed = rng.random() < 0.1
+        rows.append({"map": ("a.txt", "b.txt")[k % 3 == 0], "algo": algo, "rows": 10, "cols": 10,
+                     "start": (0, 0), "goal": "(9, 9)", "cost": "FAIL_TIME" if failed else int(rng.integers(5, 500)),
+                     "length": 10, "nodes": int(rng.integers(1, 10 ** 5)), "time_s": float(rng.exponential(0.01)),
+                     "seed": seed, "notes": ""})
+    return rows
+
+
+class ResultsStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.dir.name, "results.db")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_incremental_aggregates_match_the_raw_rows(self):
+        rng = np.random.default_rng(0)
+        store = ResultsStore(self.db)
+        rows = []
+        for seed in range(5):
+            batch = fake_rows(rng, 400, seed)
+            store.log_many(batch)
+            rows += batch
+        store.log(rows[0])
+        rows.append(rows[0])
+        summary = {(r["map"], r["algo"]): r for r in store.summary()}
+        self.assertEqual(len(summary), 4)
+        for (m, a), s in summary.items():
+            mine = [r for r in rows if r["map"] == m and r["algo"] == a]
+            ok = [r for r in mine if not isinstance(r["cost"], str)]
+            self.assertEqual((s["runs"], s["failures"]), (len(mine), len(mine) - len(ok)))
+            for metric, xs in (("cost", [r["cost"] for r in ok]), ("nodes", [r["nodes"] for r in mine]),
+                               ("time_s", [r["time_s"] for r in mine])):
+                xs = np.array(xs, dtype=float)
+                self.assertAlmostEqual(s[f"{metric}_mean"], xs.mean(), delta=1e-9 * xs.mean())
+                self.assertAlmostEqual(s[f"{metric}_std"], xs.std(ddof=1), delta=1e-9 * xs.mean())
+                for p in (50, 90):
+                    self.assertLess(abs(s[f"{metric}_p{p}"] / np.percentile(xs, p) - 1), 0.1)
+        self.assertEqual(len(store.runs(map="a.txt", algo="ucs", seed=2)),
+                         sum(r["map"] == "a.txt" and r["algo"] == "ucs" for r in rows if r["seed"] == 2))
+        run = store.runs(seed=0)[0]
+        self.assertEqual((run["start_r"], run["goal_c"]), (0, 9))
+        store.close()
+
+    def test_csv_import_and_report(self):
+        path = os.path.join(self.dir.name, "results.csv")
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["map", "algo", "rows", "cols", "start", "goal", "cost", "length", "nodes", "time_s",
+                        "seed", "notes"])
+            w.writerow(["s.txt", "astar", 5, 5, "(0, 0)", "(3, 2)", 5, 6, 9, 2e-5, 0, ""])
+            w.writerow(["s.txt", "astar", 5, 5, "(0, 0)", "(3, 2)", 7, 6, 11, 4e-5, 1, ""])
+            w.writerow(["s.txt", "ucs", 5, 5, "(0, 0)", "(3, 2)", "FAIL_FUEL", 0, 3, 1e-5, 0, "fuel=1"])
+        store = ResultsStore(self.db)
+        store.import_csv(path)
+        store.close()
+        summary = report(self.db, self.dir.name)
+        astar, ucs = summary
+        self.assertEqual((astar["cost_mean"], astar["nodes_mean"], astar["runs"]), (6, 10, 2))
+        self.assertEqual((ucs["failures"], ucs["cost_mean"], ucs["nodes_mean"]), (1, None, 3))
+        with open(os.path.join(self.dir.name, "summary_stats.csv")) as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 2)
+        with open(os.path.join(self.dir.name, "tables.latex")) as f:
+            self.assertIn("A*", f.read())
+        self.assertTrue(os.path.exists(os.path.join(self.dir.name, "plot_cost_s.txt.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.data.grid import Grid
+from src.data.grid import Grid, ArrayGrid
 from src.models.bfs import bfs
 from src.models.ucs import ucs
 from src.models.astar import astar
@@ -26,5 +26,27 @@ class SearchAlgoTests(unittest.TestCase):
         self.assertTrue(isinstance(path, list))
         self.assertGreaterEqual(cost, 0)
 
+    def test_weighted_costs_agree(self):
+        # expensive column in the middle, ucs and astar must both go around
+        g = Grid(5, 5)
+        for r in range(4):
+            g.add_cost(r, 2, 9)
+        _, c1, _ = ucs(g, (0, 0), (0, 4))
+        _, c2, _ = astar(g, (0, 0), (0, 4))
+        self.assertEqual(c1, c2)
+        self.assertEqual(c1, 12)
+
+    def test_fuel_limit_blocks_long_paths(self):
+        path, cost, _ = astar(self.g, (0, 0), (4, 4), fuel_limit=3)
+        self.assertEqual(path, [])
+        self.assertEqual(cost, float("inf"))
+
+    def test_workspace_reused_between_queries(self):
+        a = ArrayGrid.from_grid(self.g)
+        first = ucs(a, (0, 0), (4, 4))
+        ucs(a, (4, 0), (0, 4))
+        # stale entries from the second query must not leak into a repeat
+        self.assertEqual(ucs(a, (0, 0), (4, 4))[:2], first[:2])
+
 if __name__ == "__main__":
     unittest.main()
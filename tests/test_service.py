@@ -0,0 +1,104 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from src.data.grid import ArrayGrid
+from src.experiments.load_test import run_load
+from src.models.astar import astar
+from src.preprocessing.map_generator import save_map
+from src.service.client import PlanningClient
+from src.service.server import PlanningService
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def with_service(body, workers=0, **opts):
+    svc = PlanningService(workers=workers, **opts)
+    host, port = await svc.start()
+    client = await PlanningClient.connect(host, port)
+    try:
+        return await body(svc, client)
+    finally:
+        await client.close()
+        await svc.close()
+
+
+class ServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.map = os.path.join(self.dir.name, "open.txt")
+        save_map(self.map, ArrayGrid(20, 20), (0, 0), (19, 19))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_plan_and_update(self):
+        async def body(svc, c):
+            await c.request("load", name="open", path=self.map)
+            res = await c.plan("open", (0, 0), (0, 9))
+            self.assertTrue(res["ok"])
+            self.assertEqual(res["cost"], 9)
+            self.assertEqual(res["version"], 0)
+            # wall across row 0..18 at column 5: the path has to go round
+            wall = [(r, 5) for r in range(19)]
+            up = await c.update("open", add=wall)
+            self.assertEqual(up["version"], 1)
+            res = await c.plan("open", (0, 0), (0, 9))
+            g = ArrayGrid(20, 20)
+            g.add_obstacles(wall)
+            self.assertEqual(res["cost"], astar(g, (0, 0), (0, 9))[1])
+            self.assertEqual(res["version"], 1)
+            self.assertTrue(all(tuple(p) not in wall for p in res["path"]))
+            # removing one wall cell opens the short way again
+            await c.update("open", remove=[(0, 5)])
+            self.assertEqual((await c.plan("open", (0, 0), (0, 9)))["cost"], 9)
+        run(with_service(body))
+
+    def test_identical_queries_share_a_search(self):
+        async def body(svc, c):
+            await c.request("load", name="maze", kind="maze", size=40, seed=1)
+            same = [c.plan("maze", (0, 0), (39, 39)) for _ in range(10)]
+            other = c.plan("maze", (0, 0), (39, 38))
+            res = await asyncio.gather(*same, other)
+            self.assertEqual(len({r["cost"] for r in res[:10]}), 1)
+            self.assertEqual(sum(r["shared"] for r in res), 9)
+            stats = (await c.request("stats"))["counts"]
+            self.assertEqual(stats["coalesced"], 9)
+            self.assertEqual(stats["searches"], 2)
+        run(with_service(body))
+
+    def test_errors_do_not_stop_the_service(self):
+        async def body(svc, c):
+            self.assertFalse((await c.plan("nowhere", (0, 0), (1, 1)))["ok"])
+            await c.request("load", name="open", path=self.map)
+            self.assertFalse((await c.plan("open", (0, 0), (1, 1), algo="dstar"))["ok"])
+            self.assertFalse((await c.request("fly"))["ok"])
+            self.assertTrue((await c.plan("open", (0, 0), (1, 1)))["ok"])
+        run(with_service(body))
+
+    def test_worker_pool_sees_deltas_and_snapshots(self):
+        async def body(svc, c):
+            await c.request("load", name="open", path=self.map)
+            self.assertEqual((await c.plan("open", (0, 0), (0, 2)))["cost"], 2)
+            # three single-cell deltas, the last two past compact_every=1
+            for r in (1, 0, 2):
+                await c.update("open", add=[(r, 1)])
+            res = await c.plan("open", (0, 0), (0, 2))
+            self.assertEqual(res["cost"], 8)
+            self.assertEqual(res["version"], 3)
+
+            async def factory():
+                return await PlanningClient.connect(*svc._server.sockets[0].getsockname()[:2])
+
+            free = [(r, c_) for r in range(10, 20) for c_ in range(20)]
+            out = await run_load(factory, "open", free, queries=40, clients=4, update_every=10)
+            self.assertEqual((out["queries"], out["failed"]), (40, 0))
+            self.assertLessEqual(out["p50_ms"], out["p99_ms"])
+        run(with_service(body, workers=1, compact_every=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from src.data.grid import Grid
+from src.data.dynamic_obstacles import MovingObstacleManager
+from src.experiments.run_experiment import run_dynamic
+from src.models.spacetime_astar import spacetime_astar
+
+class SpaceTimeTests(unittest.TestCase):
+    def test_waits_for_blocker_to_leave(self):
+        # 1x4 corridor, a mover parks on (0,2) for timesteps 0..2
+        g = Grid(1, 4)
+        movers = MovingObstacleManager.load_from_list(
+            [{"id": 1, "trajectory": [(0, 2)] * 3, "start": 0, "loop": False}])
+        path, cost, _ = spacetime_astar(g, (0, 0), (0, 3), movers)
+        for t, cell in enumerate(path):
+            self.assertNotEqual(cell, movers.obstacles[0].position_at(t))
+        self.assertEqual(path[-1], (0, 3))
+        self.assertEqual(len(path), 5)   # one wait somewhere
+        self.assertEqual(cost, 4)
+
+    def test_no_swapping_through_a_mover(self):
+        # mover walks (0,3)->(0,0) and back forever; agent must step aside
+        g = Grid(2, 4)
+        traj = [(0, 3), (0, 2), (0, 1), (0, 0), (0, 1), (0, 2)]
+        movers = MovingObstacleManager.load_from_list([{"id": 1, "trajectory": traj}])
+        path, _, _ = spacetime_astar(g, (0, 0), (0, 3), movers)
+        self.assertTrue(path)
+        for t in range(len(path) - 1):
+            a, b = path[t], path[t + 1]
+            m0 = movers.obstacles[0].position_at(t)
+            m1 = movers.obstacles[0].position_at(t + 1)
+            self.assertNotEqual(b, m1)
+            self.assertFalse(a == m1 and b == m0)
+
+    def test_unreachable_goal_terminates(self):
+        # looping blocker sits on the only exit forever: cyclic folding
+        # keeps the state space finite, so we get a clean failure
+        g = Grid(1, 3)
+        movers = MovingObstacleManager.load_from_list([{"id": 1, "trajectory": [(0, 1)]}])
+        path, cost, _ = spacetime_astar(g, (0, 0), (0, 2), movers)
+        self.assertEqual(path, [])
+        self.assertEqual(cost, float("inf"))
+
+    def test_timed_run_replans_at_the_horizon(self):
+        # planned only two steps ahead, a five-step walk needs a fresh
+        # plan at t = 2 and t = 4
+        traj = [(0, 4), (0, 3), (0, 2), (0, 1), (0, 2), (0, 3)]
+        with tempfile.TemporaryDirectory() as d:
+            mapfile, sched = os.path.join(d, "corridor.txt"), os.path.join(d, "movers.json")
+            with open(mapfile, "w") as f:
+                f.write("2 5\nS . . . .\n. . . . G\n")
+            with open(sched, "w") as f:
+                json.dump([{"id": 1, "trajectory": traj, "loop": True}], f)
+            with redirect_stdout(StringIO()):
+                run_dynamic(mapfile, "spacetime", outdir=d, schedule_file=sched, horizon=2, stats=True)
+            with open(os.path.join(d, "stats.jsonl")) as f:
+                rec = json.loads(f.readline())
+        self.assertEqual(rec["cost"], 6)
+        self.assertEqual(rec["stats"]["replan_reasons"], {"horizon": 2})
+
+    def test_moved_spots_swaps(self):
+        movers = MovingObstacleManager.load_from_list([{"id": 1, "trajectory": [(0, 3), (0, 2)]}])
+        self.assertTrue(movers.moved(0, (0, 3), (0, 2)))
+        self.assertTrue(movers.moved(1, (0, 2), (0, 3)))
+        self.assertFalse(movers.moved(0, (0, 2), (0, 3)))
+        self.assertFalse(movers.moved(0, (5, 5), (0, 2)))
+
+if __name__ == "__main__":
+    unittest.main()
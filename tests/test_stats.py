@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.data.grid import ArrayGrid
+from src.models.astar import astar
+from src.models.bfs import bfs
+from src.models.dstar_lite import DStarLite
+from src.models.hpa import HPAStar
+from src.models.jps import jps
+from src.models.replanner import Replanner
+from src.models.ucs import ucs
+from src.utils.metrics import CSVLogger, JSONLLogger, SearchStats
+
+from helpers import random_grid
+
+
+class SearchStatsTests(unittest.TestCase):
+    def test_same_result_with_and_without_stats(self):
+        g = random_grid(30, 1, max_cost=3)
+        goal = (g.rows - 1, g.cols - 1)
+        for fn in (bfs, ucs, astar, jps):
+            plain = fn(g, (0, 0), goal)
+            st = SearchStats()
+            self.assertEqual(fn(g, (0, 0), goal, stats=st), plain)
+            self.assertEqual(st.expansions, plain[2])
+            self.assertGreaterEqual(st.pushes, st.expansions)
+            self.assertGreater(st.peak_frontier, 0)
+            self.assertIn("search", st.phases)
+
+    def test_trace_sees_every_expansion(self):
+        g = random_grid(30, 1, max_cost=3)
+        seen = []
+        st = SearchStats(trace=lambda cell, g_: seen.append(cell))
+        _, _, nodes = astar(g, (0, 0), (29, 29), stats=st)
+        self.assertEqual(len(seen), nodes)
+        self.assertEqual(seen[0], (0, 0))
+        self.assertEqual(seen[-1], (29, 29))
+
+    def test_stats_add_up_over_searches(self):
+        g = random_grid(30, 1, max_cost=3)
+        st = SearchStats()
+        n1 = ucs(g, (0, 0), (29, 29), stats=st)[2]
+        n2 = astar(g, (0, 0), (29, 29), stats=st)[2]
+        self.assertEqual(st.searches, 2)
+        self.assertEqual(st.expansions, n1 + n2)
+
+    def test_max_nodes_and_time_limit(self):
+        g = ArrayGrid(60, 60)
+        path, cost, nodes = ucs(g, (0, 0), (59, 59), max_nodes=50)
+        self.assertEqual(path, [])
+        self.assertEqual(nodes, 51)
+        # time_limit is seconds now: a generous one changes nothing
+        self.assertEqual(astar(g, (0, 0), (59, 59), time_limit=60), astar(g, (0, 0), (59, 59)))
+        # the clock is read every few hundred expansions, ucs needs thousands here
+        self.assertEqual(ucs(g, (0, 0), (59, 59), time_limit=0)[0], [])
+
+    def test_hpa_and_dstar_fill_stats(self):
+        g = random_grid(40, 2, max_cost=3)
+        self.assertTrue(astar(g, (0, 0), (39, 39))[0])
+        st = SearchStats()
+        self.assertTrue(HPAStar(g, cluster_size=10).plan((0, 0), (39, 39), stats=st)[0])
+        self.assertEqual(st.searches, 1)
+        for name in ("connect", "abstract", "refine"):
+            self.assertIn(name, st.phases)
+        st = SearchStats()
+        d = DStarLite(g, (0, 0), (39, 39))
+        _, cost, nodes = d.plan(stats=st)
+        self.assertEqual(cost, astar(g, (0, 0), (39, 39))[1])
+        self.assertEqual(st.expansions, nodes)
+
+    def test_replanner_reports_expansions_and_reasons(self):
+        g = ArrayGrid(10, 10)
+        # wall with a gap at the bottom: astar has to look around
+        g.add_obstacles({(r, 5) for r in range(9)})
+        repl = Replanner(g, cache_size=0)
+        st = SearchStats()
+        path, _, nodes, _ = repl.plan_path((0, 0), (0, 9), "astar", stats=st)
+        self.assertEqual(nodes, st.expansions)
+        self.assertNotEqual(nodes, len(path))
+        # still clear: no search
+        same, _, n, _ = repl.replan_if_needed(path, (0, 0), (0, 9), stats=st)
+        self.assertIs(same, path)
+        self.assertEqual(n, 0)
+        g.add_obstacle(*path[3])
+        repl.replan_if_needed(path, (0, 0), (0, 9), stats=st)
+        repl.replan_if_needed([], (0, 0), (0, 9), stats=st)
+        self.assertEqual(st.replans, 2)
+        self.assertEqual(dict(st.replan_reasons), {"blocked": 1, "no_path": 1})
+
+    def test_export(self):
+        g = random_grid(30, 1, max_cost=3)
+        st = SearchStats()
+        astar(g, (0, 0), (29, 29), stats=st)
+        row = {"map": "m", "algo": "astar", "start": (0, 0), "cost": float("inf"), "notes": ""}
+        with tempfile.TemporaryDirectory() as d:
+            jl = JSONLLogger(os.path.join(d, "stats.jsonl"))
+            jl.log(row, stats=st)
+            jl.close()
+            with open(os.path.join(d, "stats.jsonl")) as f:
+                rec = json.loads(f.readline())
+            self.assertEqual(rec["stats"]["expansions"], st.expansions)
+            self.assertEqual(rec["start"], [0, 0])
+            csv = CSVLogger(os.path.join(d, "results.csv"))
+            csv.log(row, stats=st)
+            csv.close()
+            with open(os.path.join(d, "results.csv")) as f:
+                self.assertIn(f"expansions={st.expansions}", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
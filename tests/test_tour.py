@@ -0,0 +1,72 @@
+import itertools
+import unittest
+from src.data.grid import ArrayGrid
+from src.models.astar import astar
+from src.models.tour import DistanceMatrix, plan_tour
+
+class TourTests(unittest.TestCase):
+    def setUp(self):
+        self.g = ArrayGrid(8, 8)
+        for r in range(1, 7):
+            self.g.add_obstacle(r, 4)
+        self.g.add_cost(3, 2, 5)
+        self.drops = [(7, 7), (0, 6), (5, 1), (2, 2)]
+
+    def test_matches_brute_force_on_small_instance(self):
+        path, cost, order = plan_tour(self.g, (0, 0), self.drops)
+        best = min(
+            sum(astar(self.g, a, b)[1] for a, b in zip(((0, 0),) + perm, perm))
+            for perm in itertools.permutations(self.drops))
+        self.assertEqual(cost, best)
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(set(order[1:]), set(self.drops))
+
+    def test_pickups_come_before_drops(self):
+        pkgs = [((7, 7), (0, 1)), ((0, 7), (7, 0))]
+        _, _, order = plan_tour(self.g, (0, 0), pkgs, return_to_depot=True)
+        self.assertLess(order.index((7, 7)), order.index((0, 1)))
+        self.assertLess(order.index((0, 7)), order.index((7, 0)))
+        self.assertEqual(order[-1], (0, 0))
+
+    def test_cyclic_pickup_chain_still_gets_a_tour(self):
+        # (7, 7) must precede (0, 7) and the other way round: no order
+        # honours both, but every stop is still visited
+        pkgs = [((7, 7), (0, 7)), ((0, 7), (7, 7)), (5, 1)]
+        path, cost, order = plan_tour(self.g, (0, 0), pkgs)
+        self.assertEqual(order[0], (0, 0))
+        self.assertEqual(sorted(order[1:]), [(0, 7), (5, 1), (7, 7)])
+        self.assertEqual(path[-1], order[-1])
+        self.assertLess(cost, float("inf"))
+
+    def test_matrix_is_reused_until_the_grid_changes(self):
+        m = DistanceMatrix(self.g)
+        plan_tour(self.g, (0, 0), self.drops, matrix=m)
+        self.assertEqual(m.searches, 5)
+        # one more package costs one more search
+        plan_tour(self.g, (0, 0), self.drops + [(6, 6)], matrix=m)
+        self.assertEqual(m.searches, 6)
+        self.assertEqual(m.dist((6, 6), (0, 0)), astar(self.g, (6, 6), (0, 0))[1])
+        self.assertEqual(m.dist((0, 0), (6, 6)), astar(self.g, (0, 0), (6, 6))[1])
+        self.g.add_obstacle(0, 4)
+        plan_tour(self.g, (0, 0), self.drops, matrix=m)
+        self.assertEqual(m.searches, 11)
+
+    def test_pool_lives_as_long_as_the_matrix(self):
+        serial = DistanceMatrix(self.g)
+        with DistanceMatrix(self.g, workers=2) as m:
+            m.add_stops(self.drops)
+            pool = m.pool
+            self.assertIsNotNone(pool)
+            # one stop at a time stays in-process, a batch reuses the pool
+            m.add_stops([(6, 6)])
+            m.add_stops([(0, 3), (1, 1), (7, 3), (6, 0)])
+            self.assertIs(m.pool, pool)
+            cells = self.drops + [(6, 6), (0, 3), (1, 1), (7, 3), (6, 0)]
+            serial.add_stops(cells)
+            for a in cells:
+                for b in cells:
+                    self.assertEqual(m.dist(a, b), serial.dist(a, b))
+        self.assertIsNone(m.pool)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+import matplotlib
+matplotlib.use("Agg")
+from src.data.grid import Grid, ArrayGrid
+from src.utils.visualize import FrameWriter, plot_batch, plot_grid, raster
+
+class VisualizeTests(unittest.TestCase):
+    def setUp(self):
+        self.g, self.a = Grid(4, 6), ArrayGrid(4, 6)
+        for grid in (self.g, self.a):
+            grid.add_obstacle(1, 2)
+            grid.add_cost(3, 5, 9)
+
+    def test_raster_same_for_both_grids(self):
+        img = raster(self.a)
+        self.assertEqual(img.shape, (4, 6, 3))
+        self.assertEqual(img[1, 2].tolist(), [0, 0, 0])
+        self.assertEqual(img[0, 0].tolist(), [255, 255, 255])
+        self.assertLess(int(img[3, 5].sum()), 3 * 255)
+        self.assertTrue((raster(self.g) == img).all())
+
+    def test_plot_and_frames_write_files(self):
+        path = [(0, 0), (0, 1), (1, 1), (2, 1)]
+        with tempfile.TemporaryDirectory() as d:
+            plot_grid(self.a, path, (0, 0), (2, 1), "t", save=os.path.join(d, "one.png"))
+            plot_batch([{"grid": self.a, "path": path}, {"grid": self.g, "title": "g"}],
+                       save=os.path.join(d, "batch.png"), ncols=3)
+            fw = FrameWriter(self.a, (0, 0), (2, 1), os.path.join(d, "ep"))
+            for t, cell in enumerate(path):
+                self.a.add_obstacle(3, t)
+                fw.frame(self.a, path[t:], cell, t=t)
+            fw.close()
+            self.assertEqual(sorted(os.listdir(d)),
+                             ["batch.png", "ep_0000.png", "ep_0001.png", "ep_0002.png", "ep_0003.png", "one.png"])
+
+if __name__ == "__main__":
+    unittest.main()